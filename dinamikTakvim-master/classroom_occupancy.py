@@ -0,0 +1,160 @@
+# classroom_occupancy.py
+# Derslik x sınav dilimi doluluk matrisi: tek toplu sorgu, program sürümüne göre önbellek.
+
+import threading
+from database import get_db_connection
+
+_lock = threading.Lock()
+# Bölüm -> program sürümü (sınav, derslik veya koltuk ataması yazan her işlemde artar)
+_versions = {}
+# Bölüm -> (sürüm, matris)
+_cache = {}
+
+
+def schedule_changed(department_id):
+    """Sınav programı veya oturma planı yazıldıktan sonra çağrılır; bölümün matrisi yeniden yüklenir."""
+    with _lock:
+        _versions[department_id] = _versions.get(department_id, 0) + 1
+
+
+def get_occupancy(department_id, refresh=False):
+    """
+    Bölümün doluluk matrisini döndürür. Program sürümü değişmediyse önbellekteki matris
+    kullanılır; refresh=True her durumda yeniden yükler (başka oturumdaki değişiklikler için).
+    """
+    with _lock:
+        version = _versions.get(department_id, 0)
+        cached = _cache.get(department_id)
+    if cached and cached[0] == version and not refresh:
+        return cached[1]
+
+    matrix = OccupancyMatrix.load(department_id)
+    if matrix is None:
+        return OccupancyMatrix({}, {})
+    with _lock:
+        # Yükleme sırasında program değiştiyse eski sonuç önbelleğe yazılmaz
+        if _versions.get(department_id, 0) == version:
+            _cache[department_id] = (version, matrix)
+    return matrix
+
+
+class OccupancyMatrix:
+    """
+    Derslik x (tarih, saat) hücrelerinde sınavlar ve yerleştirilen öğrenci sayıları.
+
+    rooms: derslik id -> {'id', 'code', 'name', 'capacity'} (derslik koduna göre sıralı)
+    cells: (derslik id, (tarih, saat)) -> [{'exam_id', 'exam_type', 'course_code', 'course_name', 'seated'}]
+    """
+
+    def __init__(self, rooms, cells):
+        self.rooms = rooms
+        self.cells = cells
+        self.slots = sorted({slot for _, slot in cells})
+
+    @classmethod
+    def load(cls, department_id):
+        """
+        Matrisi tek sorguyla oluşturur. Koltuklar (sınav, derslik) başına bir kez sayılır
+        (unique_seat_per_exam indeksi üzerinden); bölüm sınavı olmayan bölüm derslikleri de listelenir.
+        """
+        connection = get_db_connection()
+        if not connection:
+            return None
+
+        try:
+            cursor = connection.cursor()
+            query = """
+                SELECT cl.id, cl.code, cl.name, cl.capacity,
+                       x.exam_id, x.exam_date, x.start_time, x.exam_type,
+                       x.course_code, x.course_name, x.seated
+                FROM classrooms cl
+                LEFT JOIN (
+                    SELECT ea.classroom_id, e.id as exam_id, e.exam_date, e.start_time, e.exam_type,
+                           c.code as course_code, c.name as course_name,
+                           COALESCE(seat.seated, 0) as seated
+                    FROM exam_assignments ea
+                    JOIN exams e ON ea.exam_id = e.id
+                    JOIN courses c ON e.course_id = c.id
+                    LEFT JOIN (
+                        SELECT sa.exam_id, sa.classroom_id, COUNT(*) as seated
+                        FROM seating_assignments sa
+                        JOIN exams ex ON sa.exam_id = ex.id
+                        JOIN courses co ON ex.course_id = co.id
+                        WHERE co.department_id = %s
+                        GROUP BY sa.exam_id, sa.classroom_id
+                    ) seat ON seat.exam_id = ea.exam_id AND seat.classroom_id = ea.classroom_id
+                    WHERE c.department_id = %s
+                ) x ON x.classroom_id = cl.id
+                WHERE cl.department_id = %s OR x.exam_id IS NOT NULL
+                ORDER BY cl.code, x.exam_date, x.start_time, x.exam_id
+            """
+            cursor.execute(query, (department_id,) * 3)
+
+            rooms = {}
+            cells = {}
+            for (room_id, code, name, capacity, exam_id, exam_date, start_time,
+                 exam_type, course_code, course_name, seated) in cursor.fetchall():
+                if room_id not in rooms:
+                    rooms[room_id] = {'id': room_id, 'code': code, 'name': name, 'capacity': capacity}
+                if exam_id is None:
+                    continue
+                cells.setdefault((room_id, (exam_date, start_time)), []).append({
+                    'exam_id': exam_id,
+                    'exam_type': exam_type,
+                    'course_code': course_code,
+                    'course_name': course_name,
+                    'seated': int(seated)
+                })
+            return cls(rooms, cells)
+        except Exception as e:
+            print(f"Derslik doluluğu alınırken hata: {e}")
+            return None
+        finally:
+            connection.close()
+
+    def utilization(self, room_id, seated):
+        """Yerleştirilen öğrencilerin derslik kapasitesine oranı (%)."""
+        capacity = self.rooms[room_id]['capacity']
+        return seated / capacity * 100 if capacity > 0 else 0
+
+    def assignments(self, classroom_id=None):
+        """
+        Derslik-sınav satırları (derslik kodu, tarih, saat sırasıyla); classroom_id verilirse
+        yalnızca o derslik.
+        """
+        rows = []
+        for (room_id, (exam_date, start_time)), exams in self.cells.items():
+            if classroom_id is not None and room_id != classroom_id:
+                continue
+            room = self.rooms[room_id]
+            for exam in exams:
+                rows.append({
+                    'exam_id': exam['exam_id'],
+                    'classroom_id': room_id,
+                    'classroom_code': room['code'],
+                    'capacity': room['capacity'],
+                    'exam_date': exam_date,
+                    'start_time': start_time,
+                    'exam_type': exam['exam_type'],
+                    'course_code': exam['course_code'],
+                    'course_name': exam['course_name'],
+                    'student_count': exam['seated'],
+                    'utilization': self.utilization(room_id, exam['seated'])
+                })
+        return rows
+
+    def room_summaries(self):
+        """
+        Derslik başına özet: sınav sayısı, dolu dilim sayısı, toplam öğrenci ve ortalama doluluk (%).
+        """
+        summaries = {room_id: {**room, 'exam_count': 0, 'slot_count': 0, 'seated': 0}
+                     for room_id, room in self.rooms.items()}
+        for (room_id, _), exams in self.cells.items():
+            summary = summaries[room_id]
+            summary['slot_count'] += 1
+            summary['exam_count'] += len(exams)
+            summary['seated'] += sum(exam['seated'] for exam in exams)
+        for summary in summaries.values():
+            seats = summary['capacity'] * summary['exam_count']
+            summary['utilization'] = summary['seated'] / seats * 100 if seats > 0 else 0
+        return list(summaries.values())
@@ -447,6 +447,21 @@ def get_student_courses(student_no):
             connection.close()
     return []
 
+def get_all_students():
+    """Arama indeksi için tüm öğrencileri (numara, ad soyad, sınıf) getirir."""
+    connection = get_db_connection()
+    if connection:
+        try:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute("SELECT student_no, full_name, class_level FROM students ORDER BY student_no")
+            return cursor.fetchall()
+        except Error as e:
+            print(f"Öğrenci listesi alınırken hata: {e}")
+            return []
+        finally:
+            connection.close()
+    return []
+
 def get_all_courses_by_department(department_id):
     """Bölüme ait tüm dersleri getirir."""
     connection = get_db_connection()
@@ -491,3 +506,161 @@ def get_course_students(course_id):
             connection.close()
     return []
 
+# Yönetici tablolarında sunucudan tek seferde istenen satır sayısı
+PAGE_SIZE = 200
+
+# Sayfalı sorgularda sıralanabilir sütunlar: satır anahtarı -> [(SQL ifadesi, satır anahtarı)].
+# Kullanıcının seçtiği sütun SQL'e yalnızca bu eşlemeler üzerinden girer.
+CLASSROOM_SORT_COLUMNS = {
+    'id': [],
+    'department_name': [('d.name', 'department_name'), ('cl.code', 'code')],
+    'code': [('cl.code', 'code')],
+    'name': [('cl.name', 'name')],
+    'capacity': [('cl.capacity', 'capacity')],
+    'seating_type': [('cl.seating_type', 'seating_type')]
+}
+COURSE_SORT_COLUMNS = {
+    'id': [],
+    'department_name': [('d.name', 'department_name'), ('c.code', 'code')],
+    'code': [('c.code', 'code')],
+    'name': [('c.name', 'name')],
+    'course_type': [('c.course_type', 'course_type')],
+    'class_level': [('c.class_level', 'class_level')],
+    'instructor_name': [('i.full_name', 'instructor_name')]
+}
+EXAM_SORT_COLUMNS = {
+    'id': [],
+    'department_name': [('d.name', 'department_name')],
+    'course_code': [('c.code', 'course_code')],
+    'exam_type': [('e.exam_type', 'exam_type')],
+    'exam_date': [('e.exam_date', 'exam_date'), ('e.start_time', 'start_time')],
+    'start_time': [('e.start_time', 'start_time')],
+    'instructor_name': [('i.full_name', 'instructor_name')]
+}
+
+def _like_pattern(text):
+    """Arama metnini 'içerir' LIKE desenine çevirir (%, _ ve \\ kaçışlanır)."""
+    escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+def _fetch_keyset_page(select, conditions, params, sort_columns, id_column, after, descending, limit):
+    """
+    Anahtar kümesi (keyset) sayfalamasıyla tek sayfa satır getirir.
+    Sıralama her zaman id ile tamamlanır; 'after' imleci önceki sayfanın son satırının
+    sıralama değerleri ve id'sidir, böylece sonraki sayfa OFFSET taraması yapmadan başlar.
+    (satırlar, sonraki_imleç) döndürür; son sayfada imleç None'dır.
+    """
+    expressions = [expression for expression, _ in sort_columns] + [id_column]
+    conditions = list(conditions)
+    params = list(params)
+    if after is not None:
+        placeholders = ', '.join(['%s'] * len(expressions))
+        conditions.append(f"({', '.join(expressions)}) {'<' if descending else '>'} ({placeholders})")
+        params.extend(after)
+
+    direction = 'DESC' if descending else 'ASC'
+    query = select
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY " + ", ".join(f"{expression} {direction}" for expression in expressions)
+    # Bir satır fazla istenir: gelirse sonraki sayfa vardır
+    query += " LIMIT %s"
+    params.append(limit + 1)
+
+    connection = get_db_connection()
+    if not connection:
+        return [], None
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute(query, tuple(params))
+        rows = cursor.fetchall()
+    except Error as e:
+        print(f"Sayfa alınırken hata: {e}")
+        return [], None
+    finally:
+        connection.close()
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, tuple(last[key] for _, key in sort_columns) + (last['id'],)
+
+def get_classrooms_page(search='', department_id=None, sort='department_name', descending=False,
+                        after=None, limit=PAGE_SIZE):
+    """
+    Tüm bölümlerin dersliklerini sayfa sayfa getirir.
+    search: derslik kodu veya adında aranan metin; department_id: yalnızca bu bölüm.
+    """
+    conditions, params = [], []
+    if search:
+        conditions.append("(cl.code LIKE %s OR cl.name LIKE %s)")
+        params += [_like_pattern(search)] * 2
+    if department_id:
+        conditions.append("cl.department_id = %s")
+        params.append(department_id)
+    select = """
+        SELECT cl.id, d.name as department_name, cl.code, cl.name,
+               cl.capacity, cl.seating_type
+        FROM classrooms cl
+        JOIN departments d ON cl.department_id = d.id
+    """
+    return _fetch_keyset_page(select, conditions, params, CLASSROOM_SORT_COLUMNS.get(sort, []),
+                              'cl.id', after, descending, limit)
+
+def get_courses_page(search='', department_id=None, class_level=None, sort='department_name',
+                     descending=False, after=None, limit=PAGE_SIZE):
+    """
+    Tüm bölümlerin derslerini sayfa sayfa getirir.
+    search: ders kodu, adı veya öğretim üyesinde aranan metin; class_level: yalnızca bu sınıf.
+    """
+    conditions, params = [], []
+    if search:
+        conditions.append("(c.code LIKE %s OR c.name LIKE %s OR i.full_name LIKE %s)")
+        params += [_like_pattern(search)] * 3
+    if department_id:
+        conditions.append("c.department_id = %s")
+        params.append(department_id)
+    if class_level:
+        conditions.append("c.class_level = %s")
+        params.append(class_level)
+    select = """
+        SELECT c.id, d.name as department_name, c.code, c.name,
+               c.course_type, c.class_level, i.full_name as instructor_name
+        FROM courses c
+        JOIN departments d ON c.department_id = d.id
+        JOIN instructors i ON c.instructor_id = i.id
+    """
+    return _fetch_keyset_page(select, conditions, params, COURSE_SORT_COLUMNS.get(sort, []),
+                              'c.id', after, descending, limit)
+
+def get_exams_page(search='', department_id=None, class_level=None, sort='exam_date',
+                   descending=False, after=None, limit=PAGE_SIZE):
+    """
+    Tüm bölümlerin sınavlarını sayfa sayfa getirir.
+    Derslikler yalnızca sayfadaki sınavlar için alt sorguyla birleştirilir (GROUP BY yok).
+    """
+    conditions, params = [], []
+    if search:
+        conditions.append("(c.code LIKE %s OR c.name LIKE %s OR i.full_name LIKE %s)")
+        params += [_like_pattern(search)] * 3
+    if department_id:
+        conditions.append("c.department_id = %s")
+        params.append(department_id)
+    if class_level:
+        conditions.append("c.class_level = %s")
+        params.append(class_level)
+    select = """
+        SELECT e.id, d.name as department_name, c.code as course_code,
+               e.exam_type, e.exam_date, e.start_time, i.full_name as instructor_name,
+               (SELECT GROUP_CONCAT(cl.code ORDER BY cl.code SEPARATOR ', ')
+                FROM exam_assignments ea
+                JOIN classrooms cl ON ea.classroom_id = cl.id
+                WHERE ea.exam_id = e.id) as classrooms
+        FROM exams e
+        JOIN courses c ON e.course_id = c.id
+        JOIN departments d ON c.department_id = d.id
+        JOIN instructors i ON c.instructor_id = i.id
+    """
+    return _fetch_keyset_page(select, conditions, params, EXAM_SORT_COLUMNS.get(sort, []),
+                              'e.id', after, descending, limit)
@@ -3,8 +3,12 @@
 
 from datetime import datetime, timedelta, date, time
 from database import get_db_connection
+from classroom_occupancy import schedule_changed
 import random
 
+# İlerleme bildirimlerinin yaklaşık sayısı (her derste bildirim yapılmaz)
+PROGRESS_STEPS = 200
+
 class ExamScheduler:
     """Sınav zamanlama algoritmasını yöneten sınıf."""
     
@@ -20,7 +24,8 @@ class ExamScheduler:
         self.exam_duration = 120  # 2 saat
         self.course_students_cache = {}  # Performans için önbellek
         
-    def generate_exam_schedule(self, start_date, end_date, exam_types=['Vize', 'Final'], constraints=None):
+    def generate_exam_schedule(self, start_date, end_date, exam_types=['Vize', 'Final'], constraints=None,
+                               progress_callback=None, cancel_event=None):
         """
         Sınav programını oluşturur.
         
@@ -29,11 +34,30 @@ class ExamScheduler:
             end_date: Sınav döneminin bitiş tarihi
             exam_types: Sınav türleri listesi
             constraints: Kısıtlar sözlüğü (ders seçimi, süreler, vb.)
+            progress_callback: {'phase', 'current', 'total', 'placed'} sözlüğüyle çağrılır
+            cancel_event: set() edilirse zamanlama bir sonraki derste durur; mevcut program
+                değişmeden kalır ve sonuçta 'cancelled': True döner
+
+        Yeni program önce bellekte oluşturulur; eski programın silinmesi ve yeni sınavların
+        yazılması en sonda tek işlemde yapılır. İptal veya hata durumunda eski program korunur.
         """
+        def report(phase, current=0, total=0, placed=0):
+            if progress_callback:
+                progress_callback({'phase': phase, 'current': current, 'total': total, 'placed': placed})
+        
+        def cancelled():
+            return cancel_event is not None and cancel_event.is_set()
+        
+        def cancelled_result():
+            self.course_students_cache = {}
+            return {
+                'success': False,
+                'cancelled': True,
+                'message': "⏹️ Sınav zamanlama iptal edildi. Mevcut program değiştirilmedi.",
+                'scheduled_count': 0
+            }
+        
         try:
-            # Mevcut sınavları temizle
-            self.clear_existing_exams()
-            
             # Kısıtları işle
             if constraints is None:
                 constraints = {}
@@ -74,16 +98,28 @@ class ExamScheduler:
             # PERFORMANS İYİLEŞTİRMESİ: Tüm ders-öğrenci eşleşmelerini önceden yükle
             print("Ders-öğrenci eşleşmeleri yükleniyor...")
             self.course_students_cache = {}
-            for course in courses:
+            step = max(1, len(courses) // PROGRESS_STEPS)
+            for index, course in enumerate(courses, 1):
+                if cancelled():
+                    return cancelled_result()
                 self.course_students_cache[course['id']] = self._get_course_students(course['id'])
+                if index % step == 0 or index == len(courses):
+                    report('load', index, len(courses))
             
             # Sınavları zamanla
             scheduled_exams = []
             warnings = []
             errors = []
+            total = len(exam_types) * len(courses)
+            step = max(1, total // PROGRESS_STEPS)
+            processed = 0
             
             for exam_type in exam_types:
+                if cancelled():
+                    break
                 for course in courses:
+                    if cancelled():
+                        break
                     # Ders için süre belirle
                     exam_duration = course_durations.get(course['id'], default_duration)
                     
@@ -94,30 +130,42 @@ class ExamScheduler:
                     )
                     
                     if exam_slot:
-                        exam_id = self._create_exam(course, exam_type, exam_slot, exam_duration)
-                        if exam_id:
-                            # Dersliklere atama yap
-                            assignment_success = self._assign_to_classrooms(exam_id, course['student_count'])
-                            if not assignment_success:
-                                warnings.append(f"⚠️ {course['code']} dersi için yeterli derslik bulunamadı")
-                            
-                            scheduled_exams.append({
-                                'exam_id': exam_id,
-                                'course_id': course['id'],
-                                'course_code': course['code'],
-                                'class_level': course['class_level'],
-                                'date': exam_slot['date'],
-                                'time': exam_slot['time'],
-                                'student_count': course['student_count']
-                            })
-                        else:
-                            errors.append(f"❌ {course['code']} dersi için sınav oluşturulamadı")
+                        # Sınav yalnızca bellekte tutulur; veritabanına en sonda yazılır
+                        scheduled_exams.append({
+                            'course_id': course['id'],
+                            'course_code': course['code'],
+                            'class_level': course['class_level'],
+                            'exam_type': exam_type,
+                            'date': exam_slot['date'],
+                            'time': exam_slot['time'],
+                            'duration': exam_duration,
+                            'student_count': course['student_count']
+                        })
                     else:
                         errors.append(f"❌ {course['code']} - {exam_type} için uygun zaman bulunamadı (çakışma var)")
+                    
+                    processed += 1
+                    if processed % step == 0 or processed == total:
+                        report('schedule', processed, total, len(scheduled_exams))
+            
+            if cancelled():
+                return cancelled_result()
             
             # Cache'i temizle
             self.course_students_cache = {}
             
+            # Eski programı yenisiyle tek işlemde değiştir
+            report('save')
+            saved, error = self._save_schedule(scheduled_exams)
+            if not saved:
+                return {
+                    'success': False,
+                    'message': f"❌ Sınav programı kaydedilemedi, mevcut program korundu: {error}",
+                    'scheduled_count': 0,
+                    'warnings': warnings,
+                    'errors': errors
+                }
+            
             return {
                 'success': True,
                 'message': f"✅ {len(scheduled_exams)} sınav başarıyla zamanlandı.",
@@ -280,98 +328,77 @@ class ExamScheduler:
         
         return True
     
-    def _create_exam(self, course, exam_type, exam_slot, exam_duration=None):
-        """Veritabanına sınav kaydı oluşturur."""
-        if exam_duration is None:
-            exam_duration = self.exam_duration
-        
-        connection = get_db_connection()
-        if not connection:
-            return None
-        
-        try:
-            cursor = connection.cursor(dictionary=True)
-            query = """
-                INSERT INTO exams (course_id, exam_type, exam_date, start_time, duration_minutes)
-                VALUES (%s, %s, %s, %s, %s)
-            """
-            cursor.execute(query, (
-                course['id'], exam_type, exam_slot['date'], 
-                exam_slot['time'], exam_duration
-            ))
-            connection.commit()
-            return cursor.lastrowid
-        except Exception as e:
-            print(f"Sınav oluşturulurken hata: {e}")
-            return None
-        finally:
-            connection.close()
-    
-    def _assign_to_classrooms(self, exam_id, student_count):
-        """Sınavı uygun dersliklere atar."""
+    def _save_schedule(self, scheduled_exams):
+        """
+        Bölümün mevcut sınavlarını (oturma planları ve derslik atamalarıyla) siler ve bellekte
+        oluşturulan sınavları dersliklere atayarak yazar. Hepsi tek işlemdir; hata olursa
+        geri alınır ve eski program korunur. (başarılı mı, hata mesajı) döndürür.
+        """
         connection = get_db_connection()
         if not connection:
-            return False
+            return False, "Veritabanı bağlantısı kurulamadı."
         
         try:
-            cursor = connection.cursor(dictionary=True)
+            cursor = connection.cursor()
+            self._delete_exams(cursor)
             
-            # Bölüme ait derslikleri kapasiteye göre sırala
-            query = """
+            # Bölüme ait derslikleri kapasiteye göre sırala (tüm sınavlar için bir kez)
+            cursor.execute("""
                 SELECT id, capacity FROM classrooms 
                 WHERE department_id = %s 
                 ORDER BY capacity DESC
-            """
-            cursor.execute(query, (self.department_id,))
+            """, (self.department_id,))
             classrooms = cursor.fetchall()
             
-            remaining_students = student_count
-            assigned_classrooms = []
-
-            # Dağıtımı çeşitlendirmek için başlangıç indeksini döndür (her sınav farklı dersten başlasın)
-            start_index = 0
-            try:
-                # exam_id ile döndürme, aynı kapasite sırasına takılmayı azaltır
-                start_index = exam_id % len(classrooms) if classrooms else 0
-            except Exception:
-                start_index = 0
-
-            # Sıralı listeyi rotate et
-            rotated_classrooms = classrooms[start_index:] + classrooms[:start_index]
-
-            # Öğrencileri dersliklere dağıt
-            for classroom in rotated_classrooms:
-                if remaining_students <= 0:
-                    break
-                
-                # Bu dersliğe kaç öğrenci sığar
-                # Destek: tuple veya dict gelebilir
-                capacity = classroom['capacity'] if isinstance(classroom, dict) else classroom[1]
-                classroom_id = classroom['id'] if isinstance(classroom, dict) else classroom[0]
-                students_in_this_classroom = min(remaining_students, capacity)
-                
-                # Sınav-derslik atamasını oluştur
-                cursor.execute(
-                    "INSERT INTO exam_assignments (exam_id, classroom_id) VALUES (%s, %s)",
-                    (exam_id, classroom_id)
-                )
-                
-                assigned_classrooms.append({
-                    'classroom_id': classroom_id,
-                    'student_count': students_in_this_classroom
-                })
-                
-                remaining_students -= students_in_this_classroom
+            for exam in scheduled_exams:
+                cursor.execute("""
+                    INSERT INTO exams (course_id, exam_type, exam_date, start_time, duration_minutes)
+                    VALUES (%s, %s, %s, %s, %s)
+                """, (exam['course_id'], exam['exam_type'], exam['date'], exam['time'], exam['duration']))
+                exam['exam_id'] = cursor.lastrowid
+                assignments = self._classroom_assignments(exam['exam_id'], exam['student_count'], classrooms)
+                if assignments:
+                    cursor.executemany(
+                        "INSERT INTO exam_assignments (exam_id, classroom_id) VALUES (%s, %s)",
+                        assignments
+                    )
             
             connection.commit()
-            return True
-            
+            schedule_changed(self.department_id)
+            return True, None
         except Exception as e:
-            print(f"Derslik ataması yapılırken hata: {e}")
-            return False
+            connection.rollback()
+            print(f"Sınav programı kaydedilirken hata: {e}")
+            return False, str(e)
         finally:
             connection.close()
     
+    def _classroom_assignments(self, exam_id, student_count, classrooms):
+        """
+        Sınavın (exam_id, classroom_id) derslik atamalarını döndürür. Dağıtımı çeşitlendirmek
+        için derslik listesi exam_id'ye göre döndürülür (her sınav farklı derslikten başlar).
+        """
+        if not classrooms:
+            return []
+        start_index = exam_id % len(classrooms)
+        rotated_classrooms = classrooms[start_index:] + classrooms[:start_index]
+        
+        # Öğrencileri dersliklere dağıt
+        assignments = []
+        remaining_students = student_count
+        for classroom_id, capacity in rotated_classrooms:
+            if remaining_students <= 0:
+                break
+            assignments.append((exam_id, classroom_id))
+            remaining_students -= min(remaining_students, capacity)
+        return assignments
+    
+    def _delete_exams(self, cursor):
+        """Bölümün sınavlarını, derslik atamalarını ve oturma planlarını siler (commit edilmez)."""
+        cursor.execute("DELETE FROM seating_assignments WHERE exam_id IN (SELECT id FROM exams WHERE course_id IN (SELECT id FROM courses WHERE department_id = %s))", (self.department_id,))
+        cursor.execute("DELETE FROM exam_assignments WHERE exam_id IN (SELECT id FROM exams WHERE course_id IN (SELECT id FROM courses WHERE department_id = %s))", (self.department_id,))
+        cursor.execute("DELETE FROM exams WHERE course_id IN (SELECT id FROM courses WHERE department_id = %s)", (self.department_id,))
+    
     def clear_existing_exams(self):
         """Mevcut sınavları temizler."""
         connection = get_db_connection()
@@ -382,11 +409,10 @@ class ExamScheduler:
             cursor = connection.cursor()
             
             # İlişkili tabloları temizle
-            cursor.execute("DELETE FROM seating_assignments WHERE exam_id IN (SELECT id FROM exams WHERE course_id IN (SELECT id FROM courses WHERE department_id = %s))", (self.department_id,))
-            cursor.execute("DELETE FROM exam_assignments WHERE exam_id IN (SELECT id FROM exams WHERE course_id IN (SELECT id FROM courses WHERE department_id = %s))", (self.department_id,))
-            cursor.execute("DELETE FROM exams WHERE course_id IN (SELECT id FROM courses WHERE department_id = %s)", (self.department_id,))
+            self._delete_exams(cursor)
             
             connection.commit()
+            schedule_changed(self.department_id)
             return True
         except Exception as e:
             print(f"Mevcut sınavlar temizlenirken hata: {e}")
@@ -394,25 +420,47 @@ class ExamScheduler:
         finally:
             connection.close()
     
-    def get_scheduled_exams(self):
-        """Zamanlanmış sınavları getirir."""
+    def get_scheduled_exams(self, include_classrooms=False):
+        """
+        Zamanlanmış sınavları getirir.
+        include_classrooms açıkken her sınavın derslikleri aynı sorguda toplanır ve
+        'classrooms' alanında "KOD(kapasite), ..." metni olarak döner.
+        """
         connection = get_db_connection()
         if not connection:
             return []
         
         try:
             cursor = connection.cursor(dictionary=True)
-            query = """
+            classroom_column = ""
+            classroom_join = ""
+            params = (self.department_id,)
+            if include_classrooms:
+                classroom_column = ", COALESCE(room.classrooms, '') as classrooms"
+                classroom_join = """
+                LEFT JOIN (
+                    SELECT ea.exam_id,
+                           GROUP_CONCAT(CONCAT(cl.code, '(', cl.capacity, ')')
+                                        ORDER BY cl.code SEPARATOR ', ') as classrooms
+                    FROM exam_assignments ea
+                    JOIN classrooms cl ON ea.classroom_id = cl.id
+                    JOIN exams ex ON ea.exam_id = ex.id
+                    JOIN courses co ON ex.course_id = co.id
+                    WHERE co.department_id = %s
+                    GROUP BY ea.exam_id
+                ) room ON room.exam_id = e.id"""
+                params = (self.department_id, self.department_id)
+            query = f"""
                 SELECT e.id, e.exam_type, e.exam_date, e.start_time, e.duration_minutes,
                        c.code as course_code, c.name as course_name, c.class_level,
-                       i.full_name as instructor_name
+                       i.full_name as instructor_name{classroom_column}
                 FROM exams e
                 JOIN courses c ON e.course_id = c.id
-                JOIN instructors i ON c.instructor_id = i.id
+                JOIN instructors i ON c.instructor_id = i.id{classroom_join}
                 WHERE c.department_id = %s
                 ORDER BY e.exam_date, e.start_time
             """
-            cursor.execute(query, (self.department_id,))
+            cursor.execute(query, params)
             return cursor.fetchall()
         except Exception as e:
             print(f"Sınavlar alınırken hata: {e}")
@@ -1,223 +1,564 @@
 # excel_processor.py
 # Excel dosyalarını okuma ve veritabanına aktarma işlemlerini yönetir.
 
+import itertools
+import os
 import pandas as pd
-import re
-from database import (add_instructor, add_course, add_student, add_enrollment, 
-                       get_course_by_code, get_student_by_no, get_db_connection)
+import time
+import import_cache
+from database import get_db_connection
 
-def process_courses_excel(file_path, department_id):
+# Büyük dosyalarda bellek kullanımını sabit tutmak için satırlar bu boyutta parçalar halinde işlenir
+IMPORT_CHUNK_SIZE = 5000
+
+COURSE_COLUMNS = ['DERS KODU', 'DERSİN ADI', 'DERSİ VEREN ÖĞR. ELEMANI']
+STUDENT_COLUMNS = ['Öğrenci No', 'Ad Soyad', 'Sınıf', 'Ders']
+
+# Normalize edilmiş satır sütunları (önbellek ve fark hesabı bu sırayı kullanır)
+COURSE_FIELDS = ['code', 'name', 'instructor', 'course_type', 'class_level']
+STUDENT_FIELDS = ['student_no', 'full_name', 'class_level', 'course_code']
+
+# Ayrıştırma önbelleğinin biçim sürümü: normalizasyon kuralları veya alanlar değiştiğinde
+# artırılır, böylece eski ayrıştırıcının önbelleğe aldığı satırlar kullanılmaz
+PARSE_CACHE_VERSION = 3
+
+# Veritabanı sütun uzunlukları (schema.sql); aşan satırlar hazırlık tablosuna yüklenmeden raporlanır
+COURSE_FIELD_LIMITS = {'code': ('Ders kodu', 50), 'name': ('Ders adı', 255), 'instructor': ('Öğretim üyesi adı', 255)}
+STUDENT_FIELD_LIMITS = {'student_no': ('Öğrenci no', 100), 'full_name': ('Ad soyad', 255), 'course_code': ('Ders', 255)}
+
+
+# Dosya biçimi uzantıdan seçilir
+CSV_EXTENSIONS = ('.csv', '.txt')
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+ARROW_EXTENSIONS = ('.arrow', '.feather', '.ipc', '.arrows')
+SUPPORTED_EXTENSIONS = ('.xlsx', '.xlsm', '.xls') + CSV_EXTENSIONS + PARQUET_EXTENSIONS + ARROW_EXTENSIONS
+
+# Türkçe karakterler için denenecek kodlamalar (sırasıyla)
+CSV_ENCODINGS = ('utf-8-sig', 'cp1254', 'iso-8859-9')
+
+
+def _detect_encoding(file_path, sample_size=64 * 1024):
     """
-    Ders listesi Excel dosyasını işler ve veritabanına aktarır.
-    Excel formatı: DERS KODU, DERSİN ADI, DERSİ VEREN ÖĞR. ELEMANI
-    Aralarda sınıf bilgileri var (örn: "1. Sınıf", "2. Sınıf" vb.)
+    CSV dosyasının kodlamasını dosyanın başından alınan örnekle tahmin eder.
+    UTF-8 geçerli değilse Windows Türkçe (cp1254) kabul edilir.
     """
+    with open(file_path, 'rb') as f:
+        sample = f.read(sample_size)
+    for encoding in CSV_ENCODINGS:
+        try:
+            sample.decode(encoding)
+            return encoding
+        except UnicodeDecodeError as e:
+            # Örnek çok baytlı bir karakterin ortasında kesilmiş olabilir
+            if encoding == 'utf-8-sig' and e.start >= len(sample) - 3 and len(sample) == sample_size:
+                return encoding
+    return CSV_ENCODINGS[-1]
+
+
+def _iter_csv_rows(file_path):
+    """CSV satırlarını kodlama ve ayırıcı tespitiyle akış halinde döndürür."""
+    import csv
+    encoding = _detect_encoding(file_path)
+    with open(file_path, 'r', encoding=encoding, newline='') as f:
+        sample = f.read(16 * 1024)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t|')
+        except csv.Error:
+            # Türkçe Excel CSV çıktısında ayırıcı genellikle ';' olur
+            delimiter = ';' if sample.count(';') > sample.count(',') else ','
+            dialect = type('ImportDialect', (csv.excel,), {'delimiter': delimiter})
+        for row in csv.reader(f, dialect):
+            yield tuple(row)
+
+
+def _iter_arrow_batches(batches, schema):
+    """Arrow kayıt yığınlarını başlık satırı + tuple satırlar olarak döndürür."""
+    yield tuple(schema.names)
+    for batch in batches:
+        columns = batch.to_pydict()
+        yield from zip(*columns.values())
+
+
+def _iter_parquet_rows(file_path):
+    """Parquet dosyasını satır grupları halinde (tamamını belleğe almadan) okur."""
     try:
-        # Excel dosyasını oku
-        df = pd.read_excel(file_path)
-        
-        # Sütun isimlerini standartlaştır
-        df.columns = df.columns.str.strip()
-        
-        # Sütun isimlerini kontrol et ve düzelt
-        expected_columns = ['DERS KODU', 'DERSİN ADI', 'DERSİ VEREN ÖĞR. ELEMANI']
-        if not all(col in df.columns for col in expected_columns):
-            # Alternatif sütun isimlerini dene (esnek eşleşme)
-            column_mapping = {}
-            for col in df.columns:
-                upper_col = str(col).upper().strip()
-                if ('DERS' in upper_col and 'KOD' in upper_col) or upper_col in ['KOD', 'KODU', 'DERS KODU']:
-                    column_mapping[col] = 'DERS KODU'
-                    continue
-                if ('DERS' in upper_col and ('AD' in upper_col or 'ADI' in upper_col)) or upper_col in ['DERS ADI', 'DERSİN ADI']:
-                    column_mapping[col] = 'DERSİN ADI'
-                    continue
-                if ('VEREN' in upper_col) or ('ÖĞRETİM' in upper_col) or ('OGRETIM' in upper_col) or ('ELEMAN' in upper_col):
-                    column_mapping[col] = 'DERSİ VEREN ÖĞR. ELEMANI'
-                    continue
-            
-            # Sütun isimlerini yeniden adlandır
-            if column_mapping:
-                df = df.rename(columns=column_mapping)
-            
-            # Hala gerekli sütunlar yoksa hata ver
-            if not all(col in df.columns for col in expected_columns):
-                # Header yanlış/hiç olmayabilir: header=None ile tekrar dene ve 3 sütunlu şablon olarak işle
-                df_no_header = pd.read_excel(file_path, header=None)
-                df_no_header.columns = ['C0', 'C1', 'C2'][: len(df_no_header.columns)]
-                # Bu formatta satırların bir kısmı "1. Sınıf" gibi sınıf belirteci, diğerleri [kod, ad, hoca]
-                results = {
-                    'success': 0,
-                    'errors': [],
-                    'warnings': []
-                }
-                current_class_level = None
-                for index, row in df_no_header.iterrows():
-                    try:
-                        val0 = str(row.get('C0', '')).strip()
-                        val1 = str(row.get('C1', '')).strip() if 'C1' in df_no_header.columns else ''
-                        val2 = str(row.get('C2', '')).strip() if 'C2' in df_no_header.columns else ''
-
-                        if not val0 and not val1 and not val2:
-                            continue
-
-                        # Sınıf satırı tespiti
-                        if 'sınıf' in val0.lower():
-                            class_match = re.search(r'(\d+)', val0)
-                            if class_match:
-                                current_class_level = int(class_match.group(1))
-                            continue
-
-                        course_code = val0
-                        course_name = val1
-                        instructor_name = val2
-
-                        # Geçersiz değerleri kontrol et ve atla
-                        invalid_values = ['nan', 'NaN', 'NAN', 'None', '', ' ']
-                        if (course_code in invalid_values or course_name in invalid_values or 
-                            instructor_name in invalid_values):
-                            continue
-
-                        if not course_code or not course_name or not instructor_name:
-                            continue
-
-                        # Başlık veya kategori satırlarını atla
-                        skip_keywords = ['DERS KODU', 'SEÇMELİ', 'ZORUNLU', 'SINIF', 'SEMESTR']
-                        course_code_upper = course_code.upper()
-                        course_name_upper = course_name.upper()
-                        
-                        should_skip = False
-                        for keyword in skip_keywords:
-                            if (keyword in course_code_upper and len(course_code) < 10) or \
-                               (keyword == course_name_upper) or \
-                               ('DERS' in course_code_upper and 'KOD' in course_code_upper):
-                                should_skip = True
-                                break
-                        
-                        if should_skip:
-                            continue
-                        
-                        # Çok kısa veya geçersiz ders kodlarını atla (en az 3 karakter olmalı)
-                        if len(course_code) < 3 or len(course_name) < 3:
-                            continue
-
-                        # Öğretim üyesi ekle/al
-                        instructor_id, instructor_msg = add_instructor(instructor_name)
-                        if not instructor_id:
-                            results['errors'].append(f"Satır {index+1}: {instructor_msg}")
-                            continue
-
-                        course_type = "Seçmeli" if "SEÇ" in course_code.upper() else "Zorunlu"
-                        # Ders kodundan sınıf seviyesi çıkar (örn: BLM1xx -> 1)
-                        code_level_match = re.search(r'(\d)', course_code)
-                        level_for_course = int(code_level_match.group(1)) if code_level_match else None
-                        effective_level = level_for_course if level_for_course is not None else (current_class_level or 1)
-
-                        course_id, course_msg = add_course(
-                            department_id, instructor_id, course_code, course_name, course_type, effective_level
-                        )
-                        if course_id:
-                            # Mevcut dersleri de başarı olarak say
-                            results['success'] += 1
-                        else:
-                            results['errors'].append(f"Satır {index+1}: {course_msg}")
-                    except Exception as e:
-                        results['errors'].append(f"Satır {index+1}: {str(e)}")
-
-                return results
-        
-        # Boş satırları agresif temizleme KALDIRILDI, satır içinde kontrol edeceğiz
-        
-        results = {
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet dosyaları için 'pyarrow' paketi gereklidir.")
+    parquet_file = pq.ParquetFile(file_path)
+    yield from _iter_arrow_batches(parquet_file.iter_batches(batch_size=IMPORT_CHUNK_SIZE),
+                                   parquet_file.schema_arrow)
+
+
+def _iter_arrow_rows(file_path):
+    """Arrow IPC (dosya veya akış biçimi / Feather v2) dosyasını yığın yığın okur."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("Arrow dosyaları için 'pyarrow' paketi gereklidir.")
+    with pa.memory_map(file_path, 'r') as source:
+        try:
+            reader = pa.ipc.open_file(source)
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        except pa.ArrowInvalid:
+            source.seek(0)
+            reader = pa.ipc.open_stream(source)
+            batches = iter(reader)
+        yield from _iter_arrow_batches(batches, reader.schema)
+
+
+def _iter_rows(file_path):
+    """
+    Dosyadaki satırları tembel olarak (tuple halinde) döndürür; biçim uzantıdan seçilir.
+    .xlsx dosyaları openpyxl read-only modunda okunur; tüm çalışma kitabı belleğe alınmaz.
+    .csv, .parquet ve Arrow IPC dosyaları Excel ayrıştırmasına girmeden aynı normalizasyona akar.
+    İlk satır her biçimde başlık satırıdır.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension in ('.xlsx', '.xlsm'):
+        from openpyxl import load_workbook
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            for row in workbook.active.iter_rows(values_only=True):
+                yield row
+        finally:
+            workbook.close()
+    elif extension in CSV_EXTENSIONS:
+        yield from _iter_csv_rows(file_path)
+    elif extension in PARQUET_EXTENSIONS:
+        yield from _iter_parquet_rows(file_path)
+    elif extension in ARROW_EXTENSIONS:
+        yield from _iter_arrow_rows(file_path)
+    else:
+        # Eski .xls biçimini openpyxl okuyamaz, pandas ile oku
+        df = pd.read_excel(file_path, header=None, dtype=str)
+        for row in df.itertuples(index=False, name=None):
+            yield row
+
+
+def _iter_chunks(iterable, size):
+    """Bir iterable'ı en fazla 'size' elemanlı listeler halinde döndürür."""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _cell_text(value):
+    """Hücre değerini kırpılmış metne çevirir (boş/NaN -> '')."""
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        if value != value:  # NaN
+            return ''
+        if value.is_integer():
+            return str(int(value))
+    return str(value).strip()
+
+
+def _map_course_columns(header):
+    """Ders listesi başlık satırındaki sütunları standart isimlere eşler (isim -> indeks)."""
+    columns = [_cell_text(col) for col in header]
+    mapping = {col: idx for idx, col in enumerate(columns) if col in COURSE_COLUMNS}
+    if all(col in mapping for col in COURSE_COLUMNS):
+        return mapping
+
+    # Alternatif sütun isimlerini dene (esnek eşleşme)
+    mapping = {}
+    for idx, col in enumerate(columns):
+        upper_col = col.upper()
+        if ('DERS' in upper_col and 'KOD' in upper_col) or upper_col in ['KOD', 'KODU', 'DERS KODU']:
+            mapping.setdefault('DERS KODU', idx)
+        elif ('DERS' in upper_col and ('AD' in upper_col or 'ADI' in upper_col)) or upper_col in ['DERS ADI', 'DERSİN ADI']:
+            mapping.setdefault('DERSİN ADI', idx)
+        elif ('VEREN' in upper_col) or ('ÖĞRETİM' in upper_col) or ('OGRETIM' in upper_col) or ('ELEMAN' in upper_col):
+            mapping.setdefault('DERSİ VEREN ÖĞR. ELEMANI', idx)
+    return mapping
+
+
+def _map_student_columns(header):
+    """Öğrenci listesi başlık satırındaki sütunları standart isimlere eşler (isim -> indeks)."""
+    columns = [_cell_text(col) for col in header]
+    mapping = {col: idx for idx, col in enumerate(columns) if col in STUDENT_COLUMNS}
+    if all(col in mapping for col in STUDENT_COLUMNS):
+        return mapping
+
+    # Alternatif sütun isimlerini dene
+    mapping = {}
+    for idx, col in enumerate(columns):
+        upper_col = col.upper()
+        if 'ÖĞRENCİ NO' in upper_col or 'NO' in upper_col:
+            mapping.setdefault('Öğrenci No', idx)
+        elif 'AD SOYAD' in upper_col or 'AD' in upper_col:
+            mapping.setdefault('Ad Soyad', idx)
+        elif 'SINIF' in upper_col:
+            mapping.setdefault('Sınıf', idx)
+        elif 'DERS' in upper_col:
+            mapping.setdefault('Ders', idx)
+    return mapping
+
+
+def _prepend(first, rows):
+    """Okunmuş ilk satırı tekrar satır akışının başına ekler."""
+    yield first
+    yield from rows
+
+
+def _rows_to_frame(rows, columns):
+    """
+    Ham satırlardan yalnızca istenen sütunları (isim -> indeks) içeren,
+    kırpılmış metin sütunlu bir DataFrame oluşturur.
+    """
+    raw = pd.DataFrame.from_records(list(rows))
+    frame = pd.DataFrame(index=raw.index)
+    for name, index in columns.items():
+        if index in raw.columns:
+            frame[name] = _clean_text(raw[index])
+        else:
+            frame[name] = ''
+    return frame
+
+
+def _clean_text(series):
+    """
+    Bir sütunu vektörel olarak kırpılmış metne çevirir (boş/NaN -> '', 123.0 -> '123').
+    Temizlik yalnızca benzersiz değerlere uygulanıp kodlarla geri yayılır; sınıf ve
+    ders gibi tekrar eden sütunlarda iş yükü satır sayısından bağımsızdır.
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        # Sayı olarak okunmuş sütunlar (örn: öğrenci no) '.0' sonekiyle metne dönmesin
+        numbers = series.astype(float)
+        if (numbers.dropna() % 1 == 0).all():
+            series = numbers.astype('Int64')
+        return series.astype(str).where(series.notna(), '')
+
+    codes, uniques = pd.factorize(series)
+    text = pd.Series(uniques, dtype=object)
+    if pd.api.types.infer_dtype(uniques, skipna=True) == 'string':
+        text = text.str.strip()
+    else:
+        text = text.astype(str).str.strip()
+        # Karışık sütunlarda tek tük float hücreler de '.0' ile bitebilir
+        float_like = text.str.endswith('.0')
+        if float_like.any():
+            trimmed = text[float_like].str[:-2]
+            text[float_like] = trimmed.where(trimmed.str.isdigit(), text[float_like])
+    values = text.to_numpy(dtype=object).take(codes) if len(text) else codes.astype(object)
+    values[codes < 0] = ''
+    return pd.Series(values, index=series.index, dtype=object)
+
+
+def _extract_number(series, pattern=r'(\d+)'):
+    """
+    Her değerden ilk sayıyı çıkarır (bulunamazsa NaN). Düzenli ifade yalnızca
+    benzersiz değerlere uygulanır; sınıf gibi az çeşitli sütunlarda çok hızlıdır.
+    """
+    codes, uniques = pd.factorize(series)
+    if not len(uniques):
+        # Tüm değerler boş (örn. dosyada hiç sınıf satırı yok)
+        return pd.Series(float('nan'), index=series.index)
+    extracted = pd.Series(uniques).str.extract(pattern, expand=False).astype(float).to_numpy()
+    values = extracted.take(codes)
+    values[codes < 0] = float('nan')
+    return pd.Series(values, index=series.index)
+
+
+def _normalize_course_rows(rows, indices):
+    """
+    Ders listesi satırlarını COURSE_FIELDS sütunlu bir DataFrame'e dönüştürür.
+    Sınıf belirteci satırları (örn: "1. Sınıf") sonraki satırların varsayılan sınıf seviyesini belirler.
+    Tüm doğrulama pandas string işlemleriyle vektörel yapılır.
+    """
+    frame = _rows_to_frame(rows, dict(zip(['code', 'name', 'instructor'], indices)))
+    if frame.empty:
+        return pd.DataFrame(columns=COURSE_FIELDS)
+    code, name, instructor = frame['code'], frame['name'], frame['instructor']
+    code_upper, name_upper = code.str.upper(), name.str.upper()
+
+    # Sınıf satırı tespiti ve seviyenin sonraki satırlara taşınması
+    code_marker = code.str.lower().str.contains('sınıf', regex=False)
+    instructor_marker = (code == '') & (name == '') & instructor.str.lower().str.contains('sınıf', regex=False)
+    level_marker = code_marker | instructor_marker
+    marker_text = code.where(code_marker, instructor)
+    marker_level = _extract_number(marker_text.where(level_marker))
+    current_class_level = marker_level.ffill()
+
+    # Geçersiz değerler, başlık/kategori satırları ve çok kısa kodlar
+    invalid_values = ['nan', 'NaN', 'NAN', 'None', '']
+    skip = level_marker | code.isin(invalid_values) | name.isin(invalid_values) | instructor.isin(invalid_values)
+    for keyword in ['DERS KODU', 'SEÇMELİ', 'ZORUNLU', 'SINIF', 'SEMESTR']:
+        skip |= (code_upper.str.contains(keyword, regex=False) & (code.str.len() < 10)) | (name_upper == keyword)
+    skip |= (code_upper.str.contains('DERS', regex=False) & code_upper.str.contains('KOD', regex=False))
+    skip |= code_upper.isin(['DERS KODU', 'KOD', 'KODU'])
+    skip |= (code.str.len() < 3) | (name.str.len() < 3)
+
+    courses = frame[~skip].copy()
+    if courses.empty:
+        return pd.DataFrame(columns=COURSE_FIELDS)
+    # Ders tipi (basit kural: kodda "SEÇ" varsa seçmeli)
+    courses['course_type'] = 'Zorunlu'
+    courses.loc[code_upper[~skip].str.contains('SEÇ', regex=False), 'course_type'] = 'Seçmeli'
+    # Sınıf seviyesi: öncelik ders kodundan, yoksa önceki bloktan
+    code_level = _extract_number(courses['code'], r'(\d)')
+    courses['class_level'] = code_level.fillna(current_class_level[~skip]).fillna(1).astype(int)
+    # Aynı kod birden fazla geçerse ilk satır geçerlidir
+    courses = courses.drop_duplicates(subset='code', keep='first')
+    return courses[COURSE_FIELDS].reset_index(drop=True)
+
+
+def _split_invalid_rows(frame, limits, label_field):
+    """
+    Sütun uzunluğu sınırını aşan satırları ayırır; tek hatalı satır tüm toplu işlemi
+    düşürmesin diye bu satırlar yazılmaz ve satır bazında hata olarak raporlanır.
+    (geçerli satırlar, hata mesajları) döndürür.
+    """
+    invalid = pd.Series(False, index=frame.index)
+    messages = pd.Series('', index=frame.index, dtype=object)
+    for field, (title, limit) in limits.items():
+        too_long = frame[field].fillna('').astype(str).str.len() > limit
+        messages[too_long & ~invalid] = f"{title} {limit} karakterden uzun"
+        invalid |= too_long
+    if not invalid.any():
+        return frame, []
+    errors = [f"'{str(label)[:40]}': {message}"
+              for label, message in zip(frame.loc[invalid, label_field], messages[invalid])]
+    return frame[~invalid], errors
+
+
+def _frame_rows(frame):
+    """DataFrame satırlarını veritabanına yazılacak tuple listesine çevirir."""
+    return list(frame.itertuples(index=False, name=None))
+
+
+def _rows_cache_key(mode, digest):
+    """Ayrıştırma önbelleği anahtarı: liste türü, ayrıştırıcı sürümü ve dosya özeti."""
+    return f"{mode}_v{PARSE_CACHE_VERSION}_{digest}"
+
+
+def _load_cached_rows(key, fields):
+    """Önbellekteki normalize satırları döndürür; sütunlar beklenen alanlar değilse None döndürür."""
+    frame = import_cache.load_rows(key)
+    if frame is None or list(frame.columns) != fields:
+        return None
+    return frame
+
+
+def _merge_courses(cursor, department_id, courses):
+    """
+    Normalize edilmiş ders DataFrame'ini geçici bir hazırlık tablosuna yükler ve öğretim üyeleri
+    ile dersleri küme tabanlı INSERT ... SELECT ifadeleriyle birleştirir.
+    Aynı kodlu mevcut dersler ve mevcut öğretim üyeleri olduğu gibi bırakılır.
+    Aşama sürelerini (saniye) döndürür.
+    """
+    timings = {}
+
+    # 1) Hazırlık tablosu
+    started = time.perf_counter()
+    cursor.execute("DROP TEMPORARY TABLE IF EXISTS import_courses")
+    cursor.execute("""
+        CREATE TEMPORARY TABLE import_courses (
+            code VARCHAR(50) NOT NULL PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            instructor_name VARCHAR(255) NOT NULL,
+            course_type VARCHAR(20) NOT NULL,
+            class_level INT NOT NULL
+        )
+    """)
+    cursor.executemany("""
+        INSERT IGNORE INTO import_courses (code, name, instructor_name, course_type, class_level)
+        VALUES (%s, %s, %s, %s, %s)
+    """, _frame_rows(courses))
+    timings['staging'] = time.perf_counter() - started
+
+    # 2) Öğretim üyeleri
+    started = time.perf_counter()
+    cursor.execute("""
+        INSERT INTO instructors (full_name)
+        SELECT DISTINCT instructor_name FROM import_courses
+        ON DUPLICATE KEY UPDATE full_name = instructors.full_name
+    """)
+    timings['instructors'] = time.perf_counter() - started
+
+    # 3) Dersler
+    started = time.perf_counter()
+    cursor.execute("""
+        INSERT INTO courses (department_id, instructor_id, code, name, course_type, class_level)
+        SELECT %s, i.id, r.code, r.name, r.course_type, r.class_level
+        FROM import_courses r
+        JOIN instructors i ON i.full_name = r.instructor_name
+        ON DUPLICATE KEY UPDATE code = courses.code
+    """, (department_id,))
+    cursor.execute("DROP TEMPORARY TABLE IF EXISTS import_courses")
+    timings['courses'] = time.perf_counter() - started
+
+    return timings
+
+
+def _course_fingerprint(cursor):
+    """
+    courses tablosunun (öğretim üyesi adlarıyla) parmak izini döndürür. Önceki aktarım kaydı
+    yalnızca parmak izi o aktarımdan sonraki değerle aynıysa kullanılır; başka bir aktarım,
+    ders silme veya temizleme gibi her değişiklik kaydı geçersiz kılar.
+    """
+    cursor.execute("""
+        SELECT COUNT(*), BIT_XOR(CRC32(CONCAT_WS('|', c.id, c.department_id, c.code, c.name,
+                                                  c.course_type, c.class_level, i.full_name)))
+        FROM courses c
+        LEFT JOIN instructors i ON i.id = c.instructor_id
+    """)
+    return ':'.join(str(value) for value in cursor.fetchone())
+
+
+def _read_course_frame(file_path):
+    """
+    Ders listesi dosyasını okuyup normalize eder.
+    (ders DataFrame'i, hata mesajı) döndürür; hata yoksa mesaj None'dır.
+    """
+    rows = _iter_rows(file_path)
+    header = next(rows, None)
+    if header is None:
+        return None, "Excel dosyası boş."
+
+    mapping = _map_course_columns(header)
+    if all(col in mapping for col in COURSE_COLUMNS):
+        indices = [mapping[col] for col in COURSE_COLUMNS]
+    else:
+        # Header yanlış/hiç olmayabilir: ilk satırı da veri olarak 3 sütunlu şablonla işle
+        indices = [0, 1, 2]
+        rows = _prepend(header, rows)
+
+    return _normalize_course_rows(rows, indices), None
+
+
+def parse_courses_file(file_path, use_cache=True):
+    """
+    Ders listesi dosyasını okuyup normalize eder; use_cache açıkken sonuç dosya özetiyle
+    önbelleğe alınır ve aynı dosya tekrar ayrıştırılmaz.
+    (ders DataFrame'i, önbellekten mi, hata mesajı) döndürür.
+    """
+    key = _rows_cache_key('courses', import_cache.file_hash(file_path)) if use_cache else None
+    courses = _load_cached_rows(key, COURSE_FIELDS) if key else None
+    if courses is not None:
+        return courses, True, None
+    courses, error = _read_course_frame(file_path)
+    if error:
+        return None, False, error
+    if key:
+        import_cache.save_rows(key, courses)
+    return courses, False, None
+
+
+def cache_courses_file(file_path):
+    """
+    Ders listesini ayrıştırıp normalize satırları önbelleğe yazar; paralel ayrıştırmada işlem
+    havuzunda çalışır ve satırların kendisini döndürmez.
+    (önbellek anahtarı, satır sayısı, önbellekten mi, hata mesajı) döndürür.
+    """
+    key = _rows_cache_key('courses', import_cache.file_hash(file_path))
+    courses, cache_hit, error = parse_courses_file(file_path)
+    if error:
+        return None, 0, False, error
+    return key, len(courses), cache_hit, None
+
+
+def load_cached_courses(key, file_path):
+    """
+    cache_courses_file ile önbelleğe yazılan dersleri okur; önbellek yazılamamış veya
+    tahliye edilmişse dosyayı yeniden ayrıştırır. (ders DataFrame'i, hata mesajı) döndürür.
+    """
+    courses = _load_cached_rows(key, COURSE_FIELDS) if key else None
+    if courses is not None:
+        return courses, None
+    return _read_course_frame(file_path)
+
+
+def import_course_rows(courses, department_id, use_cache=True, progress_callback=None):
+    """
+    Normalize edilmiş dersleri veritabanına yazar. use_cache açıkken bölümün önceki
+    aktarımlarında yazılan satırların özetleri saklanır; veritabanı o aktarımdan beri
+    değişmediyse (parmak izi aynıysa) yalnızca yeni/değişen satırlar yazılır, aksi halde tüm
+    satırlar küme tabanlı olarak birleştirilir. progress_callback(yazılan_satır) verilirse
+    yazma tamamlandığında çağrılır.
+    """
+    applied_key = f"courses_{department_id}" if use_cache else None
+    previous = import_cache.load_applied(applied_key) if applied_key else None
+    results = {
+        'success': 0,
+        'errors': [],
+        'warnings': [],
+        'timings': {},
+        'cache': {'hit': False, 'total_rows': len(courses), 'changed_rows': len(courses)}
+    }
+
+    connection = get_db_connection()
+    if not connection:
+        return {
             'success': 0,
-            'errors': [],
+            'errors': ["Veritabanı bağlantısı kurulamadı."],
             'warnings': []
         }
-        
-        current_class_level = None
-        
-        for index, row in df.iterrows():
-            try:
-                # Sınıf bilgisi kontrolü
-                if pd.isna(row['DERS KODU']) and pd.isna(row['DERSİN ADI']):
-                    # Bu satır sınıf bilgisi olabilir
-                    instructor_name = str(row['DERSİ VEREN ÖĞR. ELEMANI']).strip()
-                    if 'sınıf' in instructor_name.lower():
-                        # Sınıf numarasını çıkar (örn: "1. Sınıf" -> 1)
-                        class_match = re.search(r'(\d+)', instructor_name)
-                        if class_match:
-                            current_class_level = int(class_match.group(1))
-                    continue
-                
-                # Ders bilgilerini al (NaN güvenli)
-                course_code = str(row.get('DERS KODU', '')).strip() if pd.notna(row.get('DERS KODU', '')) else ''
-                course_name = str(row.get('DERSİN ADI', '')).strip() if pd.notna(row.get('DERSİN ADI', '')) else ''
-                instructor_name = str(row.get('DERSİ VEREN ÖĞR. ELEMANI', '')).strip() if pd.notna(row.get('DERSİ VEREN ÖĞR. ELEMANI', '')) else ''
-                
-                # Geçersiz değerleri kontrol et ve atla
-                invalid_values = ['nan', 'NaN', 'NAN', 'None', '', ' ']
-                if (course_code in invalid_values or course_name in invalid_values or 
-                    instructor_name in invalid_values):
-                    continue
-                
-                # Boş değerleri atla
-                if not course_code or not course_name or not instructor_name:
-                    continue
-                
-                # Başlık veya kategori satırlarını atla
-                skip_keywords = ['DERS KODU', 'SEÇMELİ', 'ZORUNLU', 'SINIF', 'SEMESTR']
-                course_code_upper = course_code.upper()
-                course_name_upper = course_name.upper()
-                
-                should_skip = False
-                for keyword in skip_keywords:
-                    if (keyword in course_code_upper and len(course_code) < 10) or \
-                       (keyword == course_name_upper):
-                        should_skip = True
-                        break
-                
-                if should_skip:
-                    continue
-                
-                # Çok kısa veya geçersiz ders kodlarını atla (en az 3 karakter olmalı)
-                if len(course_code) < 3 or len(course_name) < 3:
-                    continue
-                
-                # Öğretim üyesini ekle/al
-                instructor_id, instructor_msg = add_instructor(instructor_name)
-                if not instructor_id:
-                    results['errors'].append(f"Satır {index+2}: {instructor_msg}")
-                    continue
-                
-                # Ders tipini belirle (basit kural: kodda "SEÇ" varsa seçmeli)
-                course_type = "Seçmeli" if "SEÇ" in course_code.upper() else "Zorunlu"
-                
-                # Sınıf seviyesi: öncelik ders kodundan, yoksa önceki bloktan
-                code_level_match = re.search(r'(\d)', course_code)
-                level_for_course = int(code_level_match.group(1)) if code_level_match else None
-                effective_level = level_for_course if level_for_course is not None else (current_class_level or 1)
-                
-                # Dersi ekle
-                # Başlık satırı benzeri durumları atla
-                if ('DERS' in course_code.upper() and 'KOD' in course_code.upper()) or course_code.upper() in ['DERS KODU', 'KOD', 'KODU']:
-                    continue
-
-                course_id, course_msg = add_course(
-                    department_id, instructor_id, course_code, 
-                    course_name, course_type, effective_level
-                )
-                
-                if course_id:
-                    # Mevcut dersleri de başarı olarak say
-                    results['success'] += 1
-                else:
-                    results['errors'].append(f"Satır {index+2}: {course_msg}")
-                    
-            except Exception as e:
-                results['errors'].append(f"Satır {index+2}: {str(e)}")
-        
+    try:
+        valid, results['errors'] = _split_invalid_rows(courses, COURSE_FIELD_LIMITS, 'code')
+        cursor = connection.cursor()
+        changed = valid
+        if applied_key:
+            applied = import_cache.row_hashes(valid)
+            if previous is not None and previous[1] == _course_fingerprint(cursor):
+                # Veritabanı önceki aktarımdan beri değişmedi: o aktarımın satırları zaten yazılı
+                changed = valid[~applied.isin(previous[0]).to_numpy()]
+                applied = pd.concat([previous[0], applied], ignore_index=True)
+        results['cache']['changed_rows'] = len(changed)
+        if not changed.empty:
+            results['timings'].update(_merge_courses(cursor, department_id, changed))
+        fingerprint = _course_fingerprint(cursor) if applied_key else None
+        connection.commit()
+        if fingerprint:
+            import_cache.save_applied(applied_key, applied, fingerprint)
+        if progress_callback:
+            progress_callback(len(courses))
+        # Mevcut dersleri de başarı olarak say
+        results['success'] = len(valid)
         return results
-        
+    except Exception as e:
+        connection.rollback()
+        return {
+            'success': 0,
+            'errors': [f"Toplu işlem hatası: {str(e)}"],
+            'warnings': []
+        }
+    finally:
+        try:
+            cursor.close()
+        except Exception:
+            pass
+        connection.close()
+
+
+def process_courses_excel(file_path, department_id, use_cache=True):
+    """
+    Ders listesi dosyasını (Excel, CSV, Parquet veya Arrow) işler ve veritabanına aktarır.
+    Sütun formatı: DERS KODU, DERSİN ADI, DERSİ VEREN ÖĞR. ELEMANI
+    Aralarda sınıf bilgileri var (örn: "1. Sınıf", "2. Sınıf" vb.)
+    Başlık satırı bulunamazsa ilk üç sütun sırasıyla kod, ad ve öğretim üyesi kabul edilir.
+    Dersler geçici bir hazırlık tablosu üzerinden tek işlemle küme tabanlı olarak
+    birleştirilir; aşama süreleri sonuçtaki 'timings' alanında döner.
+
+    use_cache açıkken ayrıştırılmış satırlar dosya özetiyle önbelleğe alınır (aynı dosya
+    tekrar yüklenirse Excel okunmaz) ve veritabanı bölümün önceki aktarımından beri
+    değişmediyse yalnızca o aktarımdan farklı satırlar yazılır. Önbellek bilgisi sonuçtaki
+    'cache' alanında döner.
+    """
+    try:
+        started = time.perf_counter()
+        courses, cache_hit, error = parse_courses_file(file_path, use_cache)
+        if error:
+            return {'success': 0, 'errors': [error], 'warnings': []}
+        parse_time = time.perf_counter() - started
     except Exception as e:
         return {
             'success': 0,
@@ -225,180 +566,458 @@ def process_courses_excel(file_path, department_id):
             'warnings': []
         }
 
-def process_students_excel(file_path):
+    results = import_course_rows(courses, department_id, use_cache)
+    if 'timings' in results:
+        results['timings'] = {'parse': parse_time, **results['timings']}
+        results['cache']['hit'] = cache_hit
+    return results
+
+
+def _normalize_student_rows(rows, mapping):
+    """
+    Ham satırları vektörel olarak STUDENT_FIELDS sütunlu bir DataFrame'e dönüştürür.
+    Boş satırlar ve dosya içi tekrarlar atılır.
+    """
+    frame = _rows_to_frame(rows, mapping)
+    if frame.empty:
+        return pd.DataFrame(columns=STUDENT_FIELDS)
+    # Boş satırları atla
+    frame = frame[(frame['Öğrenci No'] != '') & (frame['Ad Soyad'] != '') & (frame['Sınıf'] != '')]
+    if frame.empty:
+        return pd.DataFrame(columns=STUDENT_FIELDS)
+    class_level = _extract_number(frame['Sınıf']).fillna(1).astype(int)
+    normalized = pd.DataFrame({
+        'student_no': frame['Öğrenci No'],
+        'full_name': frame['Ad Soyad'],
+        'class_level': class_level,
+        'course_code': frame['Ders'].astype(object).where(frame['Ders'] != '', None)
+    }).drop_duplicates()
+    return normalized.reset_index(drop=True)
+
+
+def _create_student_staging(cursor):
+    """Öğrenci aktarımı için geçici hazırlık tablolarını oluşturur."""
+    _drop_student_staging(cursor)
+    # Öğrenci no birincil anahtar: INSERT IGNORE ile dosyadaki ilk satır geçerli olur.
+    # has_unresolved: öğrencinin dersi eşlenemeyen satırı var (fark modunda silme yapılmaz)
+    cursor.execute("""
+        CREATE TEMPORARY TABLE import_students (
+            student_no VARCHAR(100) NOT NULL PRIMARY KEY,
+            full_name VARCHAR(255) NOT NULL,
+            class_level INT NOT NULL,
+            has_unresolved TINYINT NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("""
+        CREATE TEMPORARY TABLE import_enrollments (
+            student_no VARCHAR(100) NOT NULL,
+            course_ref VARCHAR(255) NOT NULL,
+            course_id INT NULL,
+            PRIMARY KEY (student_no, course_ref),
+            KEY idx_course_ref (course_ref)
+        )
+    """)
+    # Fark modunda silinecek (öğrenci, ders) çiftleri; tek DELETE ... JOIN ile silinir
+    cursor.execute("""
+        CREATE TEMPORARY TABLE import_removed (
+            student_id INT NOT NULL,
+            course_id INT NOT NULL,
+            PRIMARY KEY (student_id, course_id)
+        )
+    """)
+
+
+def _drop_student_staging(cursor):
+    """Öğrenci aktarımı hazırlık tablolarını kaldırır."""
+    cursor.execute("DROP TEMPORARY TABLE IF EXISTS import_students")
+    cursor.execute("DROP TEMPORARY TABLE IF EXISTS import_enrollments")
+    cursor.execute("DROP TEMPORARY TABLE IF EXISTS import_removed")
+
+
+def _stage_student_rows(cursor, frame):
+    """Normalize edilmiş bir parça DataFrame'i hazırlık tablolarına toplu olarak yükler."""
+    rows = _frame_rows(frame)
+    cursor.executemany(
+        "INSERT IGNORE INTO import_students (student_no, full_name, class_level) VALUES (%s, %s, %s)",
+        [(student_no, full_name, class_level) for student_no, full_name, class_level, _ in rows]
+    )
+    enrollment_rows = sorted({(student_no, course_code) for student_no, _, _, course_code in rows if course_code})
+    if enrollment_rows:
+        cursor.executemany(
+            "INSERT IGNORE INTO import_enrollments (student_no, course_ref) VALUES (%s, %s)",
+            enrollment_rows
+        )
+
+
+def _merge_staged_students(cursor):
+    """
+    Hazırlık tablosundaki yeni öğrencileri ekler ve ders referanslarını ders id'lerine eşler.
+    Mevcut öğrenciler değişmez.
+    """
+    cursor.execute("""
+        INSERT INTO students (student_no, full_name, class_level)
+        SELECT student_no, full_name, class_level FROM import_students
+        ON DUPLICATE KEY UPDATE student_no = students.student_no
+    """)
+
+    # Ders eşleme: önce koddan, bulunamazsa isimden
+    cursor.execute("""
+        UPDATE import_enrollments r
+        JOIN courses c ON c.code = r.course_ref
+        SET r.course_id = c.id
+    """)
+    cursor.execute("""
+        UPDATE import_enrollments r
+        JOIN courses c ON c.name = r.course_ref
+        SET r.course_id = c.id
+        WHERE r.course_id IS NULL
+    """)
+
+
+def _staging_summary(cursor):
+    """(hazırlık tablosundaki öğrenci sayısı, bulunamayan ders kodları) döndürür."""
+    cursor.execute("SELECT COUNT(*) FROM import_students")
+    student_count = cursor.fetchone()[0]
+
+    cursor.execute("""
+        SELECT DISTINCT course_ref FROM import_enrollments
+        WHERE course_id IS NULL
+        ORDER BY course_ref
+        LIMIT 50
+    """)
+    missing_courses = [row[0] for row in cursor.fetchall()]
+    return student_count, missing_courses
+
+
+def _merge_students(cursor):
+    """
+    Hazırlık tablolarını küme tabanlı ifadelerle students ve enrollments tablolarına
+    birleştirir. Satır sayısından bağımsız olarak sabit sayıda sorgu çalıştırır.
+    (öğrenci sayısı, eklenen ders kaydı sayısı, bulunamayan ders kodları) döndürür.
+    """
+    _merge_staged_students(cursor)
+
+    cursor.execute("""
+        INSERT INTO enrollments (student_id, course_id)
+        SELECT DISTINCT s.id, r.course_id
+        FROM import_enrollments r
+        JOIN students s ON s.student_no = r.student_no
+        WHERE r.course_id IS NOT NULL
+        ON DUPLICATE KEY UPDATE course_id = enrollments.course_id
+    """)
+    enrollments = cursor.rowcount
+
+    student_count, missing_courses = _staging_summary(cursor)
+    return student_count, enrollments, missing_courses
+
+
+def _apply_enrollment_delta(cursor, department_id=None, delete_missing=False):
     """
-    Öğrenci listesi Excel dosyasını işler ve veritabanına aktarır.
-    Excel formatı: Öğrenci No, Ad Soyad, Sınıf, Ders
+    Hazırlık tablosundaki (öğrenci, ders) çiftlerini mevcut enrollments tablosuyla
+    küme tabanlı olarak karşılaştırır ve yalnızca farkları uygular.
+
+    Silme yalnızca dosyada bulunan öğrencilerin kayıtlarını kapsar (department_id verilirse
+    ayrıca yalnızca bölümün dersleri); böylece tek sınıfı veya şubeyi içeren bir dosya
+    diğer öğrencilere dokunmaz. Dosyada dersi eşlenemeyen satırı olan öğrencilerin kayıtları
+    silinmez (eşlenemeyen satır kaldırılmış ders sayılmaz).
+    {'added': [(student_id, course_id)], 'removed': [(student_id, course_id)],
+     'skipped_students': silme yapılmayan öğrenci sayısı} döndürür.
+    """
+    # Dosyada olup veritabanında olmayan çiftler
+    cursor.execute("""
+        SELECT DISTINCT s.id, r.course_id
+        FROM import_enrollments r
+        JOIN students s ON s.student_no = r.student_no
+        LEFT JOIN enrollments e ON e.student_id = s.id AND e.course_id = r.course_id
+        WHERE r.course_id IS NOT NULL AND e.student_id IS NULL
+        ORDER BY s.id, r.course_id
+    """)
+    added = [tuple(row) for row in cursor.fetchall()]
+    if added:
+        cursor.executemany("INSERT IGNORE INTO enrollments (student_id, course_id) VALUES (%s, %s)", added)
+
+    removed = []
+    skipped_students = 0
+    if delete_missing:
+        # Geçici tablolar bir sorguda iki kez kullanılamadığından eşlenemeyen satırı olan
+        # öğrenciler önce işaretlenir
+        cursor.execute("""
+            UPDATE import_students i
+            JOIN import_enrollments r ON r.student_no = i.student_no AND r.course_id IS NULL
+            SET i.has_unresolved = 1
+        """)
+        skipped_students = cursor.rowcount
+
+        # Dosyadaki öğrencilerin kayıtlarından dosyada artık bulunmayanlar hazırlanıp tek sorguyla silinir
+        if department_id is not None:
+            scope_join, params = "JOIN courses c ON c.id = e.course_id AND c.department_id = %s", (department_id,)
+        else:
+            scope_join, params = "", ()
+        cursor.execute(f"""
+            INSERT INTO import_removed (student_id, course_id)
+            SELECT e.student_id, e.course_id
+            FROM enrollments e
+            JOIN students s ON s.id = e.student_id
+            JOIN import_students i ON i.student_no = s.student_no AND i.has_unresolved = 0
+            {scope_join}
+            LEFT JOIN import_enrollments r ON r.student_no = s.student_no AND r.course_id = e.course_id
+            WHERE r.student_no IS NULL
+        """, params)
+        cursor.execute("SELECT student_id, course_id FROM import_removed ORDER BY student_id, course_id")
+        removed = [tuple(row) for row in cursor.fetchall()]
+        if removed:
+            cursor.execute("""
+                DELETE e FROM enrollments e
+                JOIN import_removed d ON d.student_id = e.student_id AND d.course_id = e.course_id
+            """)
+
+    return {'added': added, 'removed': removed, 'skipped_students': skipped_students}
+
+
+def _unresolved_course_refs(cursor):
+    """Hazırlık tablosunda dersi eşlenemeyen ders referanslarını (küçük harfle) döndürür."""
+    cursor.execute("SELECT DISTINCT course_ref FROM import_enrollments WHERE course_id IS NULL")
+    return {row[0].casefold() for row in cursor.fetchall()}
+
+
+def _student_fingerprint(cursor):
     """
+    students, enrollments ve courses tablolarının parmak izini döndürür. Başka bir aktarım,
+    fark modunda silme veya ders değişikliği gibi her değişiklik önceki aktarım kaydını
+    geçersiz kılar (ders kodlarının eşlenmesi courses tablosuna bağlıdır).
+    """
+    cursor.execute("SELECT COUNT(*), BIT_XOR(CRC32(CONCAT_WS('|', id, student_no))) FROM students")
+    students = cursor.fetchone()
+    cursor.execute("SELECT COUNT(*), BIT_XOR(CRC32(CONCAT_WS('|', student_id, course_id))) FROM enrollments")
+    enrollments = cursor.fetchone()
+    values = ':'.join(str(value) for value in (*students, *enrollments))
+    return f"{values}:{_course_fingerprint(cursor)}"
+
+
+def _read_student_frames(file_path, chunk_size):
+    """
+    Öğrenci listesi dosyasını başlığı doğrulayarak açar.
+    (normalize parça DataFrame'leri üreteci, hata mesajı) döndürür; hata yoksa mesaj None'dır.
+    """
+    rows = _iter_rows(file_path)
+    header = next(rows, None)
+    if header is None:
+        return None, "Excel dosyası boş."
+
+    mapping = _map_student_columns(header)
+    if not all(col in mapping for col in STUDENT_COLUMNS):
+        return None, f"Gerekli sütunlar bulunamadı. Mevcut sütunlar: {[_cell_text(c) for c in header]}"
+
+    frames = (_normalize_student_rows(chunk, mapping) for chunk in _iter_chunks(rows, chunk_size))
+    return frames, None
+
+
+def cache_students_file(file_path, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Öğrenci listesini akış halinde ayrıştırıp normalize parçaları önbelleğe yazar; satırlar
+    bellekte birikmez ve paralel ayrıştırmada işlemler arasında taşınmaz. Aynı dosya tekrar
+    yüklenirse yeniden ayrıştırılmaz.
+    (önbellek anahtarı, satır sayısı, önbellekten mi, hata mesajı) döndürür. Önbellek
+    yazılamazsa anahtar None olur; satırlar yazma sırasında dosyadan akış halinde okunur.
+    """
+    key = _rows_cache_key('students', import_cache.file_hash(file_path))
+    info = import_cache.row_chunks_info(key)
+    if info is not None and info[1] == STUDENT_FIELDS:
+        return key, info[0], True, None
+    frames, error = _read_student_frames(file_path, chunk_size)
+    if error:
+        return None, 0, False, error
     try:
-        # Excel dosyasını oku (string olarak yükle, tür hatalarını önlemek için)
-        df = pd.read_excel(file_path, dtype=str)
-        df.columns = df.columns.str.strip()
-        
-        # Sütun isimlerini kontrol et ve düzelt
-        expected_columns = ['Öğrenci No', 'Ad Soyad', 'Sınıf', 'Ders']
-        if not all(col in df.columns for col in expected_columns):
-            # Alternatif sütun isimlerini dene
-            column_mapping = {}
-            for col in df.columns:
-                if 'ÖĞRENCİ NO' in col.upper() or 'NO' in col.upper():
-                    column_mapping[col] = 'Öğrenci No'
-                elif 'AD SOYAD' in col.upper() or 'AD' in col.upper():
-                    column_mapping[col] = 'Ad Soyad'
-                elif 'SINIF' in col.upper():
-                    column_mapping[col] = 'Sınıf'
-                elif 'DERS' in col.upper():
-                    column_mapping[col] = 'Ders'
-            
-            # Sütun isimlerini yeniden adlandır
-            df = df.rename(columns=column_mapping)
-            
-            # Hala gerekli sütunlar yoksa hata ver
-            if not all(col in df.columns for col in expected_columns):
-                return {
-                    'success': 0,
-                    'errors': [f"Gerekli sütunlar bulunamadı. Mevcut sütunlar: {list(df.columns)}"],
-                    'warnings': []
-                }
-        
-        # Boş satırları temizle (NaN ve boş stringler)
-        df[['Öğrenci No', 'Ad Soyad', 'Sınıf']] = df[['Öğrenci No', 'Ad Soyad', 'Sınıf']].fillna('').applymap(lambda x: x.strip())
-        df = df[(df['Öğrenci No'] != '') & (df['Ad Soyad'] != '') & (df['Sınıf'] != '')]
-        
-        results = {
+        rows = import_cache.save_row_chunks(key, frames)
+    except OSError:
+        return None, 0, False, None
+    return key, rows, False, None
+
+
+def _iter_student_source(key, file_path, chunk_size):
+    """Öğrenci satırlarını önbellekten, önbellek yoksa dosyadan akış halinde parça parça üretir."""
+    if key and import_cache.row_chunks_info(key) is not None:
+        yield from import_cache.iter_row_chunks(key, chunk_size)
+        return
+    frames, error = _read_student_frames(file_path, chunk_size)
+    if error:
+        raise ValueError(error)
+    yield from frames
+
+
+def _write_student_chunks(chunks, department_id=None, delta=False, delete_missing=False,
+                          progress_callback=None, applied_key=None):
+    """
+    Normalize parçaları tek bağlantı ve tek işlemle hazırlık tablolarına yükleyip
+    students/enrollments tablolarına birleştirir.
+
+    applied_key verilirse yazılan satırların özetleri bu anahtarla saklanır; sonraki aktarımda
+    veritabanı parmak izi değişmemişse daha önce yazılmış satırlar hazırlık tablolarına
+    yüklenmez. Dersi eşlenemeyen satırlar yazılmış sayılmaz, sonraki aktarımda yeniden denenir.
+    """
+    results = {
+        'success': 0,
+        'errors': [],
+        'warnings': [],
+        'enrollments': 0,
+        'timings': {}
+    }
+    previous = import_cache.load_applied(applied_key) if applied_key else None
+
+    # Performans: Tek bağlantı, hazırlık tabloları ve küme tabanlı birleştirme
+    connection = get_db_connection()
+    if not connection:
+        return {
             'success': 0,
-            'errors': [],
-            'warnings': [],
-            'enrollments': 0
+            'errors': ["Veritabanı bağlantısı kurulamadı."],
+            'warnings': []
         }
-        
-        # Performans: Tek bağlantı ile toplu ekleme ve önbellekli eşleme
-        connection = get_db_connection()
-        if not connection:
-            return {
-                'success': 0,
-                'errors': ["Veritabanı bağlantısı kurulamadı."],
-                'warnings': []
-            }
+    try:
+        cursor = connection.cursor()
+        _create_student_staging(cursor)
+
+        # Fark modunda karşılaştırma veritabanıyla yapıldığından önceki kayıt kullanılmaz
+        baseline = None
+        if previous is not None and not delta and previous[1] == _student_fingerprint(cursor):
+            baseline = previous[0]
+        applied = []
+        student_nos = set()
+        total_rows = changed_rows = 0
+
+        # Satırlar parça parça hazırlık tablolarına yüklenir
+        started = time.perf_counter()
+        for chunk in chunks:
+            if not chunk.empty:
+                total_rows += len(chunk)
+                valid, errors = _split_invalid_rows(chunk, STUDENT_FIELD_LIMITS, 'student_no')
+                results['errors'].extend(errors)
+                if applied_key:
+                    hashes = import_cache.row_hashes(valid)
+                    applied.append((hashes, valid['course_code'].astype('category')))
+                    if baseline is not None:
+                        # Önceki aktarımda yazılmış satırlar yüklenmez
+                        student_nos.update(valid['student_no'])
+                        valid = valid[~hashes.isin(baseline).to_numpy()]
+                changed_rows += len(valid)
+                if not valid.empty:
+                    _stage_student_rows(cursor, valid)
+                if progress_callback:
+                    progress_callback(len(chunk))
+        results['timings']['staging'] = time.perf_counter() - started
+
+        # Küme tabanlı birleştirme
+        started = time.perf_counter()
+        if delta:
+            _merge_staged_students(cursor)
+            results['delta'] = _apply_enrollment_delta(cursor, department_id, delete_missing)
+            enrollments = len(results['delta']['added'])
+            student_count, missing_courses = _staging_summary(cursor)
+        else:
+            student_count, enrollments, missing_courses = _merge_students(cursor)
+        fingerprint = unresolved = None
+        if applied_key:
+            fingerprint = _student_fingerprint(cursor)
+            unresolved = _unresolved_course_refs(cursor)
+        _drop_student_staging(cursor)
+        connection.commit()
+        results['timings']['merge'] = time.perf_counter() - started
+
+        if fingerprint:
+            kept = [] if baseline is None else [baseline]
+            for hashes, codes in applied:
+                if unresolved:
+                    hashes = hashes[~codes.astype(object).str.casefold().isin(unresolved).to_numpy()]
+                kept.append(hashes)
+            import_cache.save_applied(applied_key, pd.concat(kept, ignore_index=True), fingerprint)
+
+        # Başarı sayısı: toplam benzersiz öğrenci sayısı (yüklenmeyen satırlar dahil)
+        results['success'] = len(student_nos) if baseline is not None else student_count
+        results['enrollments'] = enrollments
+        results['cache'] = {'hit': False, 'total_rows': total_rows, 'changed_rows': changed_rows}
+
+        # Uyarılar: bulunamayan ders kodları
+        for code in missing_courses:
+            results['warnings'].append(f"Ders '{code}' bulunamadı")
+        if results.get('delta', {}).get('skipped_students'):
+            results['warnings'].append(
+                f"{results['delta']['skipped_students']} öğrencinin eşlenemeyen dersi olduğu için "
+                f"kayıtları silinmedi")
+
+        return results
+    except Exception as e:
+        connection.rollback()
+        return {
+            'success': 0,
+            'errors': [f"Toplu işlem hatası: {str(e)}"],
+            'warnings': []
+        }
+    finally:
         try:
-            cursor = connection.cursor()
-
-            # 1) Kurs haritasını önceden yükle (kod veya ad -> id)
-            unique_course_codes = sorted({str(x).strip() for x in df['Ders'].fillna('').tolist() if str(x).strip()})
-            code_to_id = {}
-            name_to_id = {}
-            if unique_course_codes:
-                # MySQL IN için 1000'lik parçalar
-                for i in range(0, len(unique_course_codes), 1000):
-                    chunk = unique_course_codes[i:i+1000]
-                    placeholders = ','.join(['%s'] * len(chunk))
-                    # Koddan eşle
-                    cursor.execute(f"SELECT code, id FROM courses WHERE code IN ({placeholders})", tuple(chunk))
-                    for code, cid in cursor.fetchall():
-                        code_to_id[code] = cid
-                    # İsimden eşle
-                    cursor.execute(f"SELECT name, id FROM courses WHERE name IN ({placeholders})", tuple(chunk))
-                    for name, cid in cursor.fetchall():
-                        name_to_id[name] = cid
-
-            # 2) Mevcut öğrencileri toplu kontrol et (no -> id)
-            unique_student_nos = sorted({(str(x).strip()) for x in df['Öğrenci No'].fillna('').tolist() if str(x).strip()})
-            existing_student_nos = set()
-            student_no_to_id = {}
-            for i in range(0, len(unique_student_nos), 1000):
-                chunk = unique_student_nos[i:i+1000]
-                placeholders = ','.join(['%s'] * len(chunk))
-                cursor.execute(f"SELECT student_no, id FROM students WHERE student_no IN ({placeholders})", tuple(chunk))
-                for sno, sid in cursor.fetchall():
-                    existing_student_nos.add(sno)
-                    student_no_to_id[sno] = sid
-
-            # 3) Yeni öğrencileri topla ve toplu ekle
-            new_students = []  # (student_no, full_name, class_level)
-            new_students_seen = set()  # dosya içi tekilleştirme için
-            normalized_rows = []  # işlem için normalize edilmiş satırlar
-            for idx, row in df.iterrows():
-                student_no = (row.get('Öğrenci No') or '').strip()
-                full_name = (row.get('Ad Soyad') or '').strip()
-                class_level_str = (row.get('Sınıf') or '').strip()
-                m = re.search(r'(\d+)', class_level_str)
-                class_level = int(m.group(1)) if m else 1
-                course_code = ((row.get('Ders') or '').strip()) or None
-                if not student_no or not full_name:
-                    continue
-                normalized_rows.append((idx, student_no, full_name, class_level, course_code))
-                if student_no not in existing_student_nos and student_no not in new_students_seen:
-                    new_students.append((student_no, full_name, class_level))
-                    new_students_seen.add(student_no)
-
-            if new_students:
-                # Duplicate riskine karşı INSERT IGNORE kullan
-                cursor.executemany(
-                    "INSERT IGNORE INTO students (student_no, full_name, class_level) VALUES (%s, %s, %s)",
-                    new_students
-                )
-                connection.commit()
-                # Yeni eklenenlerin id'lerini tekrar çek
-                for i in range(0, len(unique_student_nos), 1000):
-                    chunk = unique_student_nos[i:i+1000]
-                    placeholders = ','.join(['%s'] * len(chunk))
-                    cursor.execute(f"SELECT student_no, id FROM students WHERE student_no IN ({placeholders})", tuple(chunk))
-                    for sno, sid in cursor.fetchall():
-                        student_no_to_id[sno] = sid
-
-            # 4) Başarı sayısı: toplam benzersiz öğrenci sayısı
-            results['success'] = len(student_no_to_id)
-
-            # 5) Enrollments toplu
-            enrollment_pairs = []  # (student_id, course_id)
-            for idx, student_no, full_name, class_level, course_code in normalized_rows:
-                if course_code and student_no in student_no_to_id:
-                    if course_code in code_to_id:
-                        enrollment_pairs.append((student_no_to_id[student_no], code_to_id[course_code]))
-                    elif course_code in name_to_id:
-                        enrollment_pairs.append((student_no_to_id[student_no], name_to_id[course_code]))
-
-            # Mevcut kayıtları çıkar
-            unique_enrollments = sorted(set(enrollment_pairs))
-            existing_pairs = set()
-            for i in range(0, len(unique_enrollments), 1000):
-                chunk = unique_enrollments[i:i+1000]
-                # Tuple IN ile kontrol
-                placeholders = ','.join(['(%s,%s)'] * len(chunk))
-                flat = []
-                for a, b in chunk:
-                    flat.extend([a, b])
-                cursor.execute(f"SELECT student_id, course_id FROM enrollments WHERE (student_id, course_id) IN ({placeholders})", tuple(flat))
-                for sid, cid in cursor.fetchall():
-                    existing_pairs.add((sid, cid))
-
-            new_pairs = [p for p in unique_enrollments if p not in existing_pairs]
-            if new_pairs:
-                cursor.executemany("INSERT INTO enrollments (student_id, course_id) VALUES (%s, %s)", new_pairs)
-                connection.commit()
-                results['enrollments'] = len(new_pairs)
-            else:
-                results['enrollments'] = 0
-
-            # Uyarılar: bulunamayan ders kodları
-            missing_courses = sorted({code for code in {r[4] for r in normalized_rows if r[4]} if code not in code_to_id and code not in name_to_id})
-            for code in missing_courses[:50]:
-                results['warnings'].append(f"Ders '{code}' bulunamadı")
-        
-            return results
-        except Exception as e:
-            return {
-                'success': 0,
-                'errors': [f"Toplu işlem hatası: {str(e)}"],
-                'warnings': []
-            }
-        finally:
-            try:
-                cursor.close()
-            except Exception:
-                pass
-            connection.close()
-        
+            cursor.close()
+        except Exception:
+            pass
+        connection.close()
+
+
+def import_student_sources(sources, department_id=None, chunk_size=IMPORT_CHUNK_SIZE, use_cache=True,
+                           delta=False, delete_missing=False, progress_callback=None):
+    """
+    cache_students_file ile önbelleğe yazılmış bir veya daha fazla öğrenci listesini tek
+    işlemde veritabanına yazar. sources: (önbellek anahtarı, dosya yolu) listesi; satırlar
+    önbellekten (önbellek yoksa dosyadan) parça parça okunur, böylece bellek kullanımı dosya
+    boyutundan bağımsızdır.
+    use_cache açıkken bölümün önceki aktarımlarında yazılan satırlar, veritabanı o aktarımdan
+    beri değişmediyse yeniden yüklenmez (bkz. _write_student_chunks); fark modunda tüm
+    satırlar veritabanıyla karşılaştırılır. progress_callback(yazılan_satır) her parçadan
+    sonra çağrılır.
+    """
+    applied_key = f"students_{department_id}" if use_cache else None
+    chunks = itertools.chain.from_iterable(
+        _iter_student_source(key, file_path, chunk_size) for key, file_path in sources)
+    return _write_student_chunks(chunks, department_id, delta, delete_missing,
+                                 progress_callback=progress_callback, applied_key=applied_key)
+
+
+def process_students_excel(file_path, department_id=None, chunk_size=IMPORT_CHUNK_SIZE, use_cache=True,
+                           delta=False, delete_missing=False):
+    """
+    Öğrenci listesi dosyasını (Excel, CSV, Parquet veya Arrow) işler ve veritabanına aktarır.
+    Sütun formatı: Öğrenci No, Ad Soyad, Sınıf, Ders
+    Satırlar akış halinde okunur ve 'chunk_size' satırlık parçalarla geçici hazırlık
+    tablolarına yüklenir, böylece bellek kullanımı dosya boyutundan bağımsızdır.
+    Ardından students ve enrollments tabloları sabit sayıda küme tabanlı sorguyla güncellenir.
+
+    use_cache açıkken ayrıştırılmış satırlar dosya özetiyle parça parça önbelleğe alınır (aynı
+    dosya tekrar yüklenirse yeniden ayrıştırılmaz) ve veritabanı bölümün önceki aktarımından beri
+    değişmediyse yalnızca o aktarımdan farklı satırlar hazırlık tablolarına yüklenir.
+
+    delta açıkken dosyanın tamamı mevcut enrollments tablosuyla karşılaştırılır ve yalnızca
+    eklenen (ve delete_missing açıksa dosyadaki öğrencilerin dosyada artık bulunmayan) ders
+    kayıtları uygulanır. Uygulanan değişiklikler sonuçtaki 'delta' alanında (student_id,
+    course_id) çiftleri olarak döner; oturma planları SeatingPlanner.repair_seating_plans ile
+    artımlı güncellenebilir.
+    """
+    try:
+        if not use_cache:
+            # Önbelleksiz mod: dosya akış halinde okunup doğrudan yüklenir
+            chunks, error = _read_student_frames(file_path, chunk_size)
+            if error:
+                return {'success': 0, 'errors': [error], 'warnings': []}
+            return _write_student_chunks(chunks, department_id, delta, delete_missing)
+
+        started = time.perf_counter()
+        key, _, cache_hit, error = cache_students_file(file_path, chunk_size)
+        if error:
+            return {'success': 0, 'errors': [error], 'warnings': []}
+        parse_time = time.perf_counter() - started
+
+        results = import_student_sources([(key, file_path)], department_id, chunk_size, delta=delta,
+                                         delete_missing=delete_missing)
+        if 'timings' in results:
+            results['timings'] = {'parse': parse_time, **results['timings']}
+            results['cache']['hit'] = cache_hit
+        return results
+
     except Exception as e:
         return {
             'success': 0,
@@ -1,330 +1,914 @@
 # export_manager.py
 # PDF ve Excel dışa aktarma işlemlerini yönetir.
 
-import pandas as pd
-from datetime import datetime
+import json
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
 from database import get_db_connection
 from exam_scheduler import ExamScheduler
-from seating_planner import SeatingPlanner
+from classroom_occupancy import get_occupancy
+
+# Excel dışa aktarımında sunucudan tek seferde okunan satır sayısı.
+# Satırlar openpyxl write-only modunda diske aktığından bellek kullanımı bu değerle sınırlıdır.
+EXPORT_BATCH_SIZE = 5000
+
+# Eşzamanlı rapor üretiminde yazılmayı bekleyen en fazla parça sayısı (sayfa başına)
+EXPORT_QUEUE_SIZE = 4
+
+# Artımlı dışa aktarım için önceki çıktılar ve sınav sürümleri burada tutulur
+EXPORT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.dinamik_takvim', 'export_cache')
+# Önbellekte saklanan en fazla fark çalışma kitabı sayısı (bölüm başına)
+EXPORT_CACHE_KEEP = 10
+# versions.json biçimi: sınavlar ders kodu ve sınav türüyle anahtarlanır (eski biçim id kullanıyordu)
+EXPORT_VERSIONS_FORMAT = 2
+
+# Makine okunur akışlarda (ICS/JSON) kullanılan sabitler
+FEED_PRODUCT_ID = "-//dinamikTakvim//Sinav Takvimi//TR"
+FEED_FORMATS = ('ics', 'ndjson', 'json')
+
+# Toplu PDF üretiminde bir işleme tek seferde gönderilen belge sayısı
+PDF_BATCH_CHUNK_SIZE = 200
+# Toplu PDF üretiminde işlem başına aynı anda bellekte tutulan (gönderilmiş) en fazla parça sayısı
+PDF_BATCH_PENDING_PER_WORKER = 2
+
+SCHEDULE_HEADERS = ['Tarih', 'Saat', 'Sınav Türü', 'Ders Kodu', 'Ders Adı', 'Sınıf', 'Öğretim Üyesi', 'Derslikler']
+SEATING_HEADERS = ['Sınav', 'Tarih', 'Saat', 'Derslik', 'Sıra', 'Sütun', 'Öğrenci No', 'Ad Soyad']
+CLASSROOM_USAGE_HEADERS = ['Derslik Kodu', 'Derslik Adı', 'Kapasite', 'Sınav Sayısı', 'Dolu Dilim',
+                           'Toplam Öğrenci', 'Ortalama Doluluk (%)']
+
+
+class ExportCancelled(Exception):
+    """Dışa aktarma, cancel_event ile kullanıcı tarafından durdurulduğunda fırlatılır."""
+
+    def __init__(self):
+        super().__init__("İşlem kullanıcı tarafından iptal edildi")
+
+
+def _format_time(value):
+    """MySQL TIME değerini (timedelta veya time) HH:MM biçimine çevirir."""
+    if hasattr(value, 'strftime'):
+        return value.strftime('%H:%M')
+    total_seconds = int(value.total_seconds())
+    return f"{(total_seconds // 3600) % 24:02d}:{(total_seconds % 3600) // 60:02d}"
+
+
+def _safe_file_name(name):
+    """Dosya adında kullanılamayan karakterleri '_' ile değiştirir."""
+    return re.sub(r'[^\w.-]', '_', name)
+
+
+def _iter_chunks(items, size):
+    """Öğeleri en fazla 'size' elemanlı listeler halinde döndürür (size None ise tek liste)."""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if size and len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _ics_escape(text):
+    """iCalendar metin değerindeki özel karakterleri kaçışlar."""
+    return (str(text).replace('\\', '\\\\').replace(';', '\\;')
+            .replace(',', '\\,').replace('\n', '\\n'))
+
+
+def _ics_line(line):
+    """Bir iCalendar satırını 75 baytlık parçalara katlar (RFC 5545) ve CRLF ekler."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts = []
+    current = ''
+    limit = 75
+    for char in line:
+        if len((current + char).encode('utf-8')) > limit:
+            parts.append(current)
+            current = ''
+            limit = 74  # Devam satırları bir boşlukla başlar
+        current += char
+    parts.append(current)
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def _new_workbook():
+    """Sabit bellekli (write-only) bir openpyxl çalışma kitabı oluşturur."""
+    from openpyxl import Workbook
+    return Workbook(write_only=True)
+
 
 class ExportManager:
     """Dışa aktarma işlemlerini yöneten sınıf."""
     
-    def __init__(self, department_id):
+    def __init__(self, department_id, batch_size=EXPORT_BATCH_SIZE, progress_callback=None, cancel_event=None):
+        """
+        progress_callback: Okunan satırlar ve çizilen PDF parçaları için
+            {'phase', 'current', 'total'} sözlüğüyle çağrılır (birden fazla iş parçacığından)
+        cancel_event: set() edilirse dışa aktarma bir sonraki parçada ExportCancelled ile durur;
+            dışa aktarma metotları bunu (False, mesaj) olarak döndürür
+        """
         self.department_id = department_id
+        self.batch_size = batch_size
+        self.progress_callback = progress_callback
+        self.cancel_event = cancel_event
+        self._progress_lock = threading.Lock()
+        self._rows_read = 0
+        # Son kapsamlı raporun sayfa bazlı süreleri (saniye)
+        self.last_timings = {}
+    
+    def _check_cancelled(self):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise ExportCancelled()
+    
+    def _report_rows(self, count):
+        """Okunan satır sayısını biriktirip bildirir (toplam bilinmediğinden total=0)."""
+        if not self.progress_callback:
+            return
+        with self._progress_lock:
+            self._rows_read += count
+            rows_read = self._rows_read
+        self.progress_callback({'phase': 'export', 'current': rows_read, 'total': 0})
     
     def export_schedule_to_excel(self, file_path):
         """Sınav programını Excel dosyasına aktarır."""
         try:
-            scheduler = ExamScheduler(self.department_id)
-            exams = scheduler.get_scheduled_exams()
-            
-            if not exams:
+            workbook = _new_workbook()
+            if self._write_sheet(workbook, 'Sınav Programı', self._schedule_batches()) == 0:
                 return False, "Dışa aktarılacak sınav bulunamadı."
             
-            # Excel için veri hazırla
-            excel_data = []
-            for exam in exams:
-                # Derslik bilgilerini al
-                classroom_info = self._get_exam_classrooms(exam['id'])
-                classroom_text = ", ".join([f"{c['code']}({c['capacity']})" for c in classroom_info])
-                
-                # MySQL TIME alanı timedelta olabilir
-                start_time = exam['start_time']
-                if hasattr(start_time, 'strftime'):
-                    saat = start_time.strftime('%H:%M')
-                else:
-                    total_seconds = int(start_time.total_seconds())
-                    saat = f"{(total_seconds // 3600) % 24:02d}:{(total_seconds % 3600) // 60:02d}"
-                excel_data.append({
-                    'Tarih': exam['exam_date'].strftime('%d.%m.%Y'),
-                    'Saat': saat,
-                    'Sınav Türü': exam['exam_type'],
-                    'Ders Kodu': exam['course_code'],
-                    'Ders Adı': exam['course_name'],
-                    'Sınıf': exam['class_level'],
-                    'Öğretim Üyesi': exam['instructor_name'],
-                    'Derslikler': classroom_text
-                })
-            
-            # DataFrame oluştur ve Excel'e yaz
-            df = pd.DataFrame(excel_data)
-            df.to_excel(file_path, index=False, sheet_name='Sınav Programı')
-            
+            workbook.save(file_path)
             return True, f"Sınav programı başarıyla Excel dosyasına aktarıldı: {file_path}"
             
         except Exception as e:
             return False, f"Excel dışa aktarma hatası: {str(e)}"
     
     def export_seating_plans_to_excel(self, file_path):
-        """Oturma planlarını Excel dosyasına aktarır."""
+        """Oturma planlarını Excel dosyasına aktarır (satırlar akış halinde yazılır)."""
         try:
-            planner = SeatingPlanner(self.department_id)
-            scheduler = ExamScheduler(self.department_id)
-            exams = scheduler.get_scheduled_exams()
-            
-            if not exams:
-                return False, "Dışa aktarılacak sınav bulunamadı."
-            
-            # Excel için veri hazırla
-            excel_data = []
-            for exam in exams:
-                seating_data = planner.get_seating_plan(exam['id'])
-                for seat in seating_data:
-                    # TIME alanı timedelta olabilir
-                    start_time = exam['start_time']
-                    if hasattr(start_time, 'strftime'):
-                        saat = start_time.strftime('%H:%M')
-                    else:
-                        total_seconds = int(start_time.total_seconds())
-                        saat = f"{(total_seconds // 3600) % 24:02d}:{(total_seconds % 3600) // 60:02d}"
-                    excel_data.append({
-                        'Sınav': f"{exam['course_code']} - {exam['exam_type']}",
-                        'Tarih': exam['exam_date'].strftime('%d.%m.%Y'),
-                        'Saat': saat,
-                        'Derslik': seat['classroom_code'],
-                        'Sıra': seat['seat_row'],
-                        'Sütun': seat['seat_col'],
-                        'Öğrenci No': seat['student_no'],
-                        'Ad Soyad': seat['full_name']
-                    })
-            
-            if not excel_data:
+            workbook = _new_workbook()
+            if self._write_sheet(workbook, 'Oturma Planları', self._seating_batches()) == 0:
                 return False, "Dışa aktarılacak oturma planı bulunamadı."
             
-            # DataFrame oluştur ve Excel'e yaz
-            df = pd.DataFrame(excel_data)
-            df.to_excel(file_path, index=False, sheet_name='Oturma Planları')
-            
+            workbook.save(file_path)
             return True, f"Oturma planları başarıyla Excel dosyasına aktarıldı: {file_path}"
             
         except Exception as e:
             return False, f"Excel dışa aktarma hatası: {str(e)}"
     
     def export_comprehensive_report_to_excel(self, file_path):
-        """Kapsamlı raporu Excel dosyasına aktarır (birden fazla sayfa)."""
+        """
+        Kapsamlı raporu Excel dosyasına aktarır (birden fazla sayfa).
+        Dört sayfanın verisi ayrı iş parçacıklarında eşzamanlı okunur ve biçimlendirilir;
+        çalışma kitabına yazma tek iş parçacığında yapılır. Toplam süre en yavaş sayfayla sınırlıdır.
+        """
         try:
-            with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-                # 1. Sınav Programı
-                self._export_schedule_sheet(writer)
-                
-                # 2. Oturma Planları
-                self._export_seating_sheet(writer)
-                
-                # 3. Derslik Kullanımı
-                self._export_classroom_usage_sheet(writer)
-                
-                # 4. Öğrenci Sınav Listesi
-                self._export_student_exam_sheet(writer)
+            # Fark temeli okumaya başlamadan alınır: dışa aktarım sürerken değişen sınavlar
+            # temele eski sürümüyle girer ve sonraki fark dosyasında yeniden yazılır
+            versions = self.get_exam_versions()
+            workbook = _new_workbook()
+            sources = [
+                # (sayfa adı, parça üreteci, hata raporu durdursun mu)
+                ('Sınav Programı', self._schedule_batches(), True),
+                ('Oturma Planları', self._seating_batches(), True),
+                ('Derslik Kullanımı', self._classroom_usage_batches(), False),
+                ('Öğrenci Sınav Listesi', self._student_exam_batches(), False)
+            ]
+            self.last_timings, partial = self._write_sheets_concurrently(workbook, sources)
             
-            return True, f"Kapsamlı rapor başarıyla Excel dosyasına aktarıldı: {file_path}"
+            workbook.save(file_path)
+            timing_text = ", ".join(f"{name} {seconds:.2f} sn" for name, seconds in self.last_timings.items())
+            if partial:
+                # Eksik rapor artımlı dışa aktarımın temeli olamaz
+                return True, (f"Kapsamlı rapor eksik sayfalarla dışa aktarıldı: {file_path}\n"
+                              f"Eksik sayfalar: {', '.join(partial)} (fark temeli güncellenmedi)\n"
+                              f"Süreler: {timing_text}")
+            # Sonraki artımlı dışa aktarım bu rapora göre fark üretir
+            self._save_export_baseline(file_path, 'kapsamli_rapor.xlsx', versions)
+            return True, f"Kapsamlı rapor başarıyla Excel dosyasına aktarıldı: {file_path}\nSüreler: {timing_text}"
             
         except Exception as e:
             return False, f"Excel dışa aktarma hatası: {str(e)}"
     
-    def _export_schedule_sheet(self, writer):
-        """Sınav programı sayfasını oluşturur."""
-        scheduler = ExamScheduler(self.department_id)
-        exams = scheduler.get_scheduled_exams()
-        
-        if exams:
-            excel_data = []
-            for exam in exams:
-                classroom_info = self._get_exam_classrooms(exam['id'])
-                classroom_text = ", ".join([f"{c['code']}({c['capacity']})" for c in classroom_info])
-                
-                start_time = exam['start_time']
-                if hasattr(start_time, 'strftime'):
-                    saat = start_time.strftime('%H:%M')
-                else:
-                    total_seconds = int(start_time.total_seconds())
-                    saat = f"{(total_seconds // 3600) % 24:02d}:{(total_seconds % 3600) // 60:02d}"
-                excel_data.append({
-                    'Tarih': exam['exam_date'].strftime('%d.%m.%Y'),
-                    'Saat': saat,
-                    'Sınav Türü': exam['exam_type'],
-                    'Ders Kodu': exam['course_code'],
-                    'Ders Adı': exam['course_name'],
-                    'Sınıf': exam['class_level'],
-                    'Öğretim Üyesi': exam['instructor_name'],
-                    'Derslikler': classroom_text
-                })
+    def export_changes_to_excel(self, file_path):
+        """
+        Son dışa aktarımdan bu yana değişen sınavları fark çalışma kitabı olarak yazar.
+        Sınav sürümleri (sınav, derslik ve koltuk bilgilerinin özeti) önbellekteki son
+        sürümlerle ders kodu ve sınav türüne göre karşılaştırılır (program yeniden
+        oluşturulunca sınav id'leri değişir); yalnızca yeni/değişen sınavların programı ve
+        oturma planı yazılır, silinen sınavlar listelenir. Çıktının bir kopyası önbellekte saklanır.
+        """
+        try:
+            versions = self.get_exam_versions()
+            previous = self._load_exam_versions()
+            if previous is None:
+                return False, "Önceki dışa aktarım bulunamadı. Önce kapsamlı raporu dışa aktarın."
             
-            df = pd.DataFrame(excel_data)
-            df.to_excel(writer, sheet_name='Sınav Programı', index=False)
-    
-    def _export_seating_sheet(self, writer):
-        """Oturma planları sayfasını oluşturur."""
-        planner = SeatingPlanner(self.department_id)
-        scheduler = ExamScheduler(self.department_id)
-        exams = scheduler.get_scheduled_exams()
-        
-        if exams:
-            excel_data = []
-            for exam in exams:
-                seating_data = planner.get_seating_plan(exam['id'])
-                for seat in seating_data:
-                    start_time = exam['start_time']
-                    if hasattr(start_time, 'strftime'):
-                        saat = start_time.strftime('%H:%M')
-                    else:
-                        total_seconds = int(start_time.total_seconds())
-                        saat = f"{(total_seconds // 3600) % 24:02d}:{(total_seconds % 3600) // 60:02d}"
-                    excel_data.append({
-                        'Sınav': f"{exam['course_code']} - {exam['exam_type']}",
-                        'Tarih': exam['exam_date'].strftime('%d.%m.%Y'),
-                        'Saat': saat,
-                        'Derslik': seat['classroom_code'],
-                        'Sıra': seat['seat_row'],
-                        'Sütun': seat['seat_col'],
-                        'Öğrenci No': seat['student_no'],
-                        'Ad Soyad': seat['full_name']
-                    })
+            changed = [key for key, info in versions.items()
+                       if previous.get(key, {}).get('version') != info['version']]
+            removed = [info for key, info in previous.items() if key not in versions]
+            if not changed and not removed:
+                return False, "Son dışa aktarımdan bu yana değişen sınav yok."
+            
+            workbook = _new_workbook()
+            worksheet = workbook.create_sheet('Değişiklikler')
+            worksheet.append(['Sınav', 'Tarih', 'Saat', 'Durum'])
+            for key in sorted(changed, key=lambda k: (datetime.strptime(versions[k]['date'], '%d.%m.%Y'), versions[k]['time'])):
+                info = versions[key]
+                status = "Değişti" if key in previous else "Yeni"
+                worksheet.append([info['label'], info['date'], info['time'], status])
+            for info in removed:
+                worksheet.append([info['label'], info['date'], info['time'], "Silindi"])
             
-            df = pd.DataFrame(excel_data)
-            df.to_excel(writer, sheet_name='Oturma Planları', index=False)
+            exam_ids = {exam_id for key in changed for exam_id in versions[key]['exam_ids']}
+            self._write_sheet(workbook, 'Sınav Programı', self._schedule_batches(exam_ids))
+            self._write_sheet(workbook, 'Oturma Planları', self._seating_batches(exam_ids))
+            workbook.save(file_path)
+            
+            self._save_export_baseline(file_path, f"fark_{datetime.now():%Y%m%d_%H%M%S}.xlsx", versions)
+            return True, (f"{len(changed)} değişen/yeni, {len(removed)} silinen sınav "
+                          f"fark dosyasına aktarıldı: {file_path}")
+            
+        except Exception as e:
+            return False, f"Excel dışa aktarma hatası: {str(e)}"
     
-    def _export_classroom_usage_sheet(self, writer):
-        """Derslik kullanımı sayfasını oluşturur."""
+    def get_exam_versions(self):
+        """
+        Bölümdeki her sınavın içerik sürümünü tek toplu sorguyla hesaplar.
+        Sürüm; sınav bilgileri, derslikleri ve koltuk atamalarının özetidir (MD5).
+        Sınavlar "ders kodu|sınav türü" anahtarıyla döner; program her kaydedildiğinde sınavlar
+        yeniden eklendiğinden id'ler dışa aktarımlar arasında karşılaştırılamaz.
+        {anahtar: {'version', 'exam_ids', 'label', 'date', 'time'}} döndürür.
+        """
         connection = get_db_connection()
         if not connection:
-            return
+            return {}
         
         try:
-            cursor = connection.cursor(dictionary=True)
+            cursor = connection.cursor()
             query = """
-                SELECT cl.code as derslik_kodu, cl.name as derslik_adi, cl.capacity as kapasite,
-                       COUNT(DISTINCT e.id) as sinav_sayisi,
-                       COUNT(sa.student_id) as toplam_ogrenci,
-                       AVG(COUNT(sa.student_id)) OVER (PARTITION BY cl.id) as ortalama_kullanim
-                FROM classrooms cl
-                LEFT JOIN exam_assignments ea ON cl.id = ea.classroom_id
-                LEFT JOIN exams e ON ea.exam_id = e.id
-                LEFT JOIN seating_assignments sa ON e.id = sa.exam_id AND cl.id = sa.classroom_id
-                WHERE cl.department_id = %s
-                GROUP BY cl.id, cl.code, cl.name, cl.capacity
-                ORDER BY cl.code
+                SELECT e.id, c.code, e.exam_type, e.exam_date, e.start_time,
+                       MD5(CONCAT_WS('|', e.exam_type, e.exam_date, e.start_time, e.duration_minutes,
+                                     c.code, c.name, c.class_level, i.full_name,
+                                     COALESCE(r.rooms, ''), COALESCE(st.seat_count, 0),
+                                     COALESCE(st.seat_hash, 0))) as version
+                FROM exams e
+                JOIN courses c ON e.course_id = c.id
+                JOIN instructors i ON c.instructor_id = i.id
+                LEFT JOIN (
+                    SELECT ea.exam_id, GROUP_CONCAT(ea.classroom_id ORDER BY ea.classroom_id) as rooms
+                    FROM exam_assignments ea
+                    JOIN exams ex ON ea.exam_id = ex.id
+                    JOIN courses co ON ex.course_id = co.id
+                    WHERE co.department_id = %s
+                    GROUP BY ea.exam_id
+                ) r ON r.exam_id = e.id
+                LEFT JOIN (
+                    SELECT sa.exam_id, COUNT(*) as seat_count,
+                           BIT_XOR(CRC32(CONCAT_WS(',', s.student_no, s.full_name, sa.classroom_id,
+                                                   sa.seat_row, sa.seat_col))) as seat_hash
+                    FROM seating_assignments sa
+                    JOIN students s ON sa.student_id = s.id
+                    JOIN exams ex ON sa.exam_id = ex.id
+                    JOIN courses co ON ex.course_id = co.id
+                    WHERE co.department_id = %s
+                    GROUP BY sa.exam_id
+                ) st ON st.exam_id = e.id
+                WHERE c.department_id = %s
+                ORDER BY e.exam_date, e.start_time, e.id
             """
-            cursor.execute(query, (self.department_id,))
-            data = cursor.fetchall()
-            
-            if data:
-                df = pd.DataFrame(data)
-                df.to_excel(writer, sheet_name='Derslik Kullanımı', index=False)
-        except Exception as e:
-            print(f"Derslik kullanımı verisi alınırken hata: {e}")
+            cursor.execute(query, (self.department_id,) * 3)
+            versions = {}
+            for exam_id, course_code, exam_type, exam_date, start_time, version in cursor.fetchall():
+                key = f"{course_code}|{exam_type}"
+                if key in versions:
+                    # Aynı dersin aynı türde birden fazla sınavı: sürümler birlikte karşılaştırılır
+                    versions[key]['exam_ids'].append(exam_id)
+                    versions[key]['version'] += f"|{version}"
+                    continue
+                versions[key] = {
+                    'version': version,
+                    'exam_ids': [exam_id],
+                    'label': f"{course_code} - {exam_type}",
+                    'date': exam_date.strftime('%d.%m.%Y'),
+                    'time': _format_time(start_time)
+                }
+            return versions
         finally:
             connection.close()
     
-    def _export_student_exam_sheet(self, writer):
-        """Öğrenci sınav listesi sayfasını oluşturur."""
-        connection = get_db_connection()
-        if not connection:
-            return
-        
+    def _cache_dir(self):
+        """Bölümün dışa aktarım önbellek dizini."""
+        return os.path.join(EXPORT_CACHE_DIR, f"department_{self.department_id}")
+    
+    def _load_exam_versions(self):
+        """
+        Son dışa aktarımda kaydedilen sınav sürümlerini okur; kayıt yoksa veya sınav id'leriyle
+        anahtarlanmış eski biçimdeyse None döndürür.
+        """
         try:
-            cursor = connection.cursor(dictionary=True)
-            query = """
-                SELECT s.student_no, s.full_name, s.class_level,
-                       c.code as ders_kodu, c.name as ders_adi,
-                       e.exam_type, e.exam_date, e.start_time,
-                       cl.code as derslik, sa.seat_row, sa.seat_col
-                FROM students s
-                JOIN enrollments en ON s.id = en.student_id
-                JOIN courses c ON en.course_id = c.id
-                JOIN exams e ON c.id = e.course_id
-                JOIN seating_assignments sa ON e.id = sa.exam_id AND s.id = sa.student_id
-                JOIN classrooms cl ON sa.classroom_id = cl.id
-                WHERE c.department_id = %s
-                ORDER BY s.student_no, e.exam_date, e.start_time
-            """
-            cursor.execute(query, (self.department_id,))
-            data = cursor.fetchall()
+            with open(os.path.join(self._cache_dir(), 'versions.json'), encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get('format') != EXPORT_VERSIONS_FORMAT:
+            return None
+        return data['exams']
+    
+    def _save_export_baseline(self, file_path, cache_name, versions):
+        """
+        Dışa aktarılan dosyanın kopyasını ve dışa aktarım başında alınan sınav sürümlerini
+        önbelleğe yazar. Önbellek yazılamazsa dışa aktarım başarısız sayılmaz.
+        """
+        try:
+            cache_dir = self._cache_dir()
+            os.makedirs(cache_dir, exist_ok=True)
+            shutil.copyfile(file_path, os.path.join(cache_dir, cache_name))
+            with open(os.path.join(cache_dir, 'versions.json'), 'w', encoding='utf-8') as f:
+                json.dump({'format': EXPORT_VERSIONS_FORMAT, 'exams': versions}, f, ensure_ascii=False)
             
-            if data:
-                # Tarih formatını düzenle
-                for row in data:
-                    row['exam_date'] = row['exam_date'].strftime('%d.%m.%Y')
-                    st = row['start_time']
-                    if hasattr(st, 'strftime'):
-                        row['start_time'] = st.strftime('%H:%M')
-                    else:
-                        total_seconds = int(st.total_seconds())
-                        row['start_time'] = f"{(total_seconds // 3600) % 24:02d}:{(total_seconds % 3600) // 60:02d}"
+            # En eski fark dosyalarını temizle
+            deltas = sorted(name for name in os.listdir(cache_dir) if name.startswith('fark_'))
+            for name in deltas[:-EXPORT_CACHE_KEEP]:
+                os.remove(os.path.join(cache_dir, name))
+        except Exception as e:
+            print(f"Dışa aktarım önbelleği yazılamadı: {e}")
+    
+    def export_feeds(self, output_dir, formats=FEED_FORMATS, shard_prefix_length=0):
+        """
+        Sınav, derslik ve koltuk bilgilerini makine okunur akışlar olarak dışa aktarır:
+        - 'ics': öğrenci başına bir iCalendar (.ics) dosyası
+        - 'ndjson': satır başına bir koltuk kaydı (JSON Lines)
+        - 'json': aynı kayıtlar tek bir JSON dizisi olarak
+        Tüm çıktılar öğrenci numarasına göre sıralı tek bir akış sorgusundan yazılır; bellekte
+        en fazla bir öğrencinin kayıtları tutulur. shard_prefix_length > 0 ise dosyalar öğrenci
+        numarasının ilk karakterlerine göre ayrı dosya/dizinlere bölünür; satırlar sıralı
+        geldiğinden önek değişince önceki parçanın dosyaları kapatılır.
+        """
+        formats = [fmt for fmt in formats if fmt in FEED_FORMATS]
+        if not formats:
+            return False, "Geçerli bir akış biçimi seçilmedi."
+        
+        query = """
+            SELECT s.student_no, s.full_name, e.id, c.code, c.name, e.exam_type,
+                   e.exam_date, e.start_time, e.duration_minutes,
+                   cl.code, cl.name, sa.seat_row, sa.seat_col
+            FROM seating_assignments sa
+            JOIN students s ON sa.student_id = s.id
+            JOIN exams e ON sa.exam_id = e.id
+            JOIN courses c ON e.course_id = c.id
+            JOIN classrooms cl ON sa.classroom_id = cl.id
+            WHERE c.department_id = %s
+            ORDER BY s.student_no, e.exam_date, e.start_time
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        # Açık dosyalar: (biçim, parça öneki) -> dosya; JSON dizilerinde ilk kayıt bilgisi
+        streams = {}
+        closed = set()
+        first_record = {}
+        json_tail = '\n]\n'
+        stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
+        counts = {'students': 0, 'records': 0}
+        
+        def shard_of(student_no):
+            return str(student_no)[:shard_prefix_length] if shard_prefix_length > 0 else ''
+        
+        def stream_for(fmt, shard):
+            key = (fmt, shard)
+            if key not in streams:
+                name = f"oturma_{shard}.{fmt}" if shard else f"oturma.{fmt}"
+                path = os.path.join(output_dir, name)
+                if key in closed:
+                    # Veritabanı sıralaması önekleri bitişik vermediyse (örn. büyük/küçük harf
+                    # duyarsız harmanlama) kapatılan dosyaya eklenerek devam edilir
+                    if fmt == 'json':
+                        os.truncate(path, os.path.getsize(path) - len(json_tail))
+                    streams[key] = open(path, 'a', encoding='utf-8')
+                else:
+                    streams[key] = open(path, 'w', encoding='utf-8')
+                    if fmt == 'json':
+                        streams[key].write('[\n')
+                        first_record[key] = True
+            return streams[key]
+        
+        def close_streams():
+            for key, stream in streams.items():
+                if key[0] == 'json':
+                    stream.write(json_tail)
+                stream.close()
+                closed.add(key)
+            streams.clear()
+        
+        def write_calendar(student_no, full_name, events):
+            folder = os.path.join(output_dir, 'ics', shard_of(student_no))
+            os.makedirs(folder, exist_ok=True)
+            with open(os.path.join(folder, f"{_safe_file_name(str(student_no))}.ics"), 'w',
+                      encoding='utf-8', newline='') as f:
+                f.write(_ics_line('BEGIN:VCALENDAR') + _ics_line('VERSION:2.0') +
+                        _ics_line(f'PRODID:{FEED_PRODUCT_ID}') + _ics_line('CALSCALE:GREGORIAN') +
+                        _ics_line(f'X-WR-CALNAME:{_ics_escape(f"Sınav Takvimi - {full_name}")}'))
+                for record in events:
+                    start = datetime.strptime(f"{record['date']} {record['start_time']}", '%Y-%m-%d %H:%M')
+                    end = start + timedelta(minutes=record['duration_minutes'] or 0)
+                    location = (f"{record['classroom_code']} - {record['classroom_name']} "
+                                f"(Sıra {record['seat_row']}, Sütun {record['seat_col']})")
+                    f.write(_ics_line('BEGIN:VEVENT') +
+                            _ics_line(f"UID:exam-{record['exam_id']}-{student_no}@dinamiktakvim") +
+                            _ics_line(f'DTSTAMP:{stamp}') +
+                            _ics_line(f"DTSTART:{start:%Y%m%dT%H%M%S}") +
+                            _ics_line(f"DTEND:{end:%Y%m%dT%H%M%S}") +
+                            _ics_line(f"SUMMARY:{_ics_escape(record['course_code'] + ' ' + record['exam_type'])}") +
+                            _ics_line(f"LOCATION:{_ics_escape(location)}") +
+                            _ics_line(f"DESCRIPTION:{_ics_escape(record['course_name'])}") +
+                            _ics_line('END:VEVENT'))
+                f.write(_ics_line('END:VCALENDAR'))
+        
+        try:
+            current_student = None
+            shard = None
+            events = []
+            exam_cache = {}  # Sınav başına tarih/saat bir kez biçimlendirilir
+            for row in self._iter_query(query, (self.department_id,)):
+                (student_no, full_name, exam_id, course_code, course_name, exam_type,
+                 exam_date, start_time, duration_minutes, classroom_code, classroom_name,
+                 seat_row, seat_col) = row
+                if exam_id not in exam_cache:
+                    exam_cache[exam_id] = (exam_date.isoformat(), _format_time(start_time))
+                date_text, time_text = exam_cache[exam_id]
+                record = {
+                    'student_no': student_no, 'full_name': full_name,
+                    'exam_id': exam_id, 'course_code': course_code, 'course_name': course_name,
+                    'exam_type': exam_type, 'date': date_text, 'start_time': time_text,
+                    'duration_minutes': duration_minutes,
+                    'classroom_code': classroom_code, 'classroom_name': classroom_name,
+                    'seat_row': seat_row, 'seat_col': seat_col
+                }
                 
-                df = pd.DataFrame(data)
-                df.to_excel(writer, sheet_name='Öğrenci Sınav Listesi', index=False)
+                if student_no != current_student:
+                    if events and 'ics' in formats:
+                        write_calendar(current_student, events[0]['full_name'], events)
+                    current_student = student_no
+                    events = []
+                    counts['students'] += 1
+                    if shard_of(student_no) != shard:
+                        # Önceki parçanın satırları bitti: dosyaları açık tutulmaz
+                        close_streams()
+                        shard = shard_of(student_no)
+                events.append(record)
+                counts['records'] += 1
+                
+                line = json.dumps(record, ensure_ascii=False)
+                if 'ndjson' in formats:
+                    stream_for('ndjson', shard).write(line + '\n')
+                if 'json' in formats:
+                    stream = stream_for('json', shard)
+                    if not first_record[('json', shard)]:
+                        stream.write(',\n')
+                    first_record[('json', shard)] = False
+                    stream.write(line)
+            
+            if events and 'ics' in formats:
+                write_calendar(current_student, events[0]['full_name'], events)
+            
+            if counts['records'] == 0:
+                return False, "Dışa aktarılacak oturma planı bulunamadı."
+            return True, (f"{counts['students']} öğrenci, {counts['records']} kayıt "
+                          f"({', '.join(formats)}) dışa aktarıldı: {output_dir}")
+            
         except Exception as e:
-            print(f"Öğrenci sınav verisi alınırken hata: {e}")
+            return False, f"Akış dışa aktarma hatası: {str(e)}"
         finally:
-            connection.close()
+            close_streams()
     
-    def _get_exam_classrooms(self, exam_id):
-        """Belirli bir sınavın derslik bilgilerini getirir."""
+    def _write_sheet(self, workbook, sheet_name, batches):
+        """
+        Bir parça üretecini (ilk eleman başlık, sonrakiler satır listeleri) yeni bir sayfaya yazar.
+        Üreteç hiç eleman vermezse sayfa oluşturulmaz. Yazılan veri satırı sayısını döndürür.
+        """
+        worksheet = None
+        count = 0
+        for item in batches:
+            if worksheet is None:
+                worksheet = workbook.create_sheet(sheet_name)
+                worksheet.append(item)
+                continue
+            for row in item:
+                worksheet.append(row)
+            count += len(item)
+        return count
+    
+    def _write_sheets_concurrently(self, workbook, sources):
+        """
+        Her kaynağı ayrı bir iş parçacığında tüketir; hazır olan parçalar sınırlı bir kuyruk
+        üzerinden ana iş parçacığına gelir ve ilgili sayfaya yazılır. Sayfa sırası korunur.
+        İptal (ExportCancelled) ve zorunlu sayfaların hataları yeniden fırlatılır; diğer
+        sayfaların hataları raporu durdurmaz, sayfa eksik kalır.
+        (sayfa bazlı süreler (saniye), eksik kalan sayfa adları) döndürür.
+        """
+        output = queue.Queue(maxsize=EXPORT_QUEUE_SIZE * len(sources))
+        stop = threading.Event()
+        done = object()
+        timings = {}
+        partial = []
+        
+        def produce(index, name, batches):
+            started = time.perf_counter()
+            try:
+                for item in batches:
+                    while not stop.is_set():
+                        try:
+                            output.put((index, item), timeout=0.1)
+                            break
+                        except queue.Full:
+                            continue
+                    if stop.is_set():
+                        batches.close()
+                        return
+            except Exception as e:
+                output.put((index, e))
+            finally:
+                timings[name] = time.perf_counter() - started
+                output.put((index, done))
+        
+        # Sayfalar sırayla önceden oluşturulur; veri geldikçe doldurulur
+        worksheets = [workbook.create_sheet(name) for name, _, _ in sources]
+        threads = [threading.Thread(target=produce, args=(index, name, batches), daemon=True)
+                   for index, (name, batches, _) in enumerate(sources)]
+        for thread in threads:
+            thread.start()
+        
+        try:
+            remaining = len(sources)
+            while remaining:
+                index, item = output.get()
+                name, _, required = sources[index]
+                if item is done:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    if required or isinstance(item, ExportCancelled):
+                        raise item
+                    print(f"{name} verisi alınırken hata: {item}")
+                    partial.append(name)
+                elif isinstance(item[0], str):
+                    # Başlık satırı
+                    worksheets[index].append(item)
+                else:
+                    for row in item:
+                        worksheets[index].append(row)
+        finally:
+            stop.set()
+            # Bekleyen üreticiler takılmasın diye kuyruk boşaltılarak beklenir
+            for thread in threads:
+                while thread.is_alive():
+                    try:
+                        output.get(timeout=0.1)
+                    except queue.Empty:
+                        pass
+        
+        # Sayfa sırasıyla süreler
+        return {name: timings.get(name, 0.0) for name, _, _ in sources}, partial
+    
+    def _query_batches(self, query, params, headers=None, transform=None):
+        """
+        Sorgu sonucunu batch_size satırlık parçalar halinde üretir.
+        İlk eleman başlık satırıdır (verilmezse sorgunun sütun adları); transform her satıra uygulanır.
+        """
         connection = get_db_connection()
         if not connection:
-            return []
+            return
         
         try:
-            cursor = connection.cursor(dictionary=True)
-            query = """
-                SELECT cl.code, cl.name, cl.capacity
-                FROM exam_assignments ea
-                JOIN classrooms cl ON ea.classroom_id = cl.id
-                WHERE ea.exam_id = %s
-            """
-            cursor.execute(query, (exam_id,))
-            return cursor.fetchall()
-        except Exception as e:
-            print(f"Derslik bilgileri alınırken hata: {e}")
-            return []
+            # Tamponsuz imleç: satırlar sunucudan parça parça okunur
+            cursor = connection.cursor()
+            cursor.execute(query, params)
+            yield headers or list(cursor.column_names)
+            for batch in iter(lambda: cursor.fetchmany(self.batch_size), []):
+                self._check_cancelled()
+                self._report_rows(len(batch))
+                yield [transform(row) for row in batch] if transform else batch
         finally:
             connection.close()
     
-    def generate_pdf_report(self, file_path):
-        """PDF raporu oluşturur (basit metin tabanlı)."""
+    def _schedule_batches(self, exam_ids=None):
+        """Sınav programı sayfasının başlık ve satırlarını üretir (exam_ids verilirse yalnızca onlar)."""
+        scheduler = ExamScheduler(self.department_id)
+        # Derslikler sınavlarla aynı sorguda toplanır (sınav başına sorgu yok)
+        exams = scheduler.get_scheduled_exams(include_classrooms=True)
+        if exam_ids is not None:
+            exams = [exam for exam in exams if exam['id'] in exam_ids]
+        if not exams:
+            return
+        
+        yield SCHEDULE_HEADERS
+        yield [[
+            exam['exam_date'].strftime('%d.%m.%Y'),
+            _format_time(exam['start_time']),
+            exam['exam_type'],
+            exam['course_code'],
+            exam['course_name'],
+            exam['class_level'],
+            exam['instructor_name'],
+            exam['classrooms']
+        ] for exam in exams]
+    
+    def _seating_batches(self, exam_ids=None):
+        """
+        Oturma planı satırlarını tek sıralı sorguyla üretir (exam_ids verilirse yalnızca onlar).
+        Tarih/saat biçimlendirmesi sınav başına bir kez yapılır.
+        """
+        params = (self.department_id,)
+        exam_filter = ""
+        if exam_ids is not None:
+            exam_ids = sorted(exam_ids) or [0]
+            exam_filter = f"AND e.id IN ({','.join(['%s'] * len(exam_ids))})"
+            params += tuple(exam_ids)
+        query = f"""
+            SELECT sa.exam_id, c.code, e.exam_type, e.exam_date, e.start_time,
+                   cl.code, sa.seat_row, sa.seat_col, s.student_no, s.full_name
+            FROM seating_assignments sa
+            JOIN exams e ON sa.exam_id = e.id
+            JOIN courses c ON e.course_id = c.id
+            JOIN classrooms cl ON sa.classroom_id = cl.id
+            JOIN students s ON sa.student_id = s.id
+            WHERE c.department_id = %s {exam_filter}
+            ORDER BY e.exam_date, e.start_time, e.id, cl.code, sa.seat_row, sa.seat_col
+        """
+        current = {'exam_id': None, 'columns': None}
+        
+        def to_row(row):
+            exam_id, course_code, exam_type, exam_date, start_time = row[:5]
+            if exam_id != current['exam_id']:
+                current['exam_id'] = exam_id
+                current['columns'] = [f"{course_code} - {exam_type}",
+                                      exam_date.strftime('%d.%m.%Y'),
+                                      _format_time(start_time)]
+            return current['columns'] + list(row[5:])
+        
+        return self._query_batches(query, params, SEATING_HEADERS, to_row)
+    
+    def _classroom_usage_batches(self):
+        """
+        Derslik kullanımı sayfasının satırlarını üretir.
+        Satırlar doluluk matrisinden gelir (tek toplu sorgu, program değişmediyse önbellekten).
+        """
+        self._check_cancelled()
+        summaries = get_occupancy(self.department_id).room_summaries()
+        self._report_rows(len(summaries))
+        yield CLASSROOM_USAGE_HEADERS
+        yield [[
+            room['code'],
+            room['name'],
+            room['capacity'],
+            room['exam_count'],
+            room['slot_count'],
+            room['seated'],
+            round(room['utilization'], 1)
+        ] for room in summaries]
+    
+    def _student_exam_batches(self):
+        """Öğrenci sınav listesi sayfasının satırlarını üretir."""
+        query = """
+            SELECT s.student_no, s.full_name, s.class_level,
+                   c.code as ders_kodu, c.name as ders_adi,
+                   e.exam_type, e.exam_date, e.start_time,
+                   cl.code as derslik, sa.seat_row, sa.seat_col
+            FROM students s
+            JOIN enrollments en ON s.id = en.student_id
+            JOIN courses c ON en.course_id = c.id
+            JOIN exams e ON c.id = e.course_id
+            JOIN seating_assignments sa ON e.id = sa.exam_id AND s.id = sa.student_id
+            JOIN classrooms cl ON sa.classroom_id = cl.id
+            WHERE c.department_id = %s
+            ORDER BY s.student_no, e.exam_date, e.start_time
+        """
+        # Aynı tarih/saat değerleri tekrar tekrar biçimlendirilmez
+        formatted = {}
+        
+        def to_row(row):
+            row = list(row)
+            key = (row[6], row[7])
+            if key not in formatted:
+                formatted[key] = (row[6].strftime('%d.%m.%Y'), _format_time(row[7]))
+            row[6], row[7] = formatted[key]
+            return row
+        
+        return self._query_batches(query, (self.department_id,), transform=to_row)
+    
+    def generate_batch_pdfs(self, output_path, kind='students', merged=False, max_workers=None):
+        """
+        Toplu PDF belgeleri üretir.
+        kind='students': öğrenci başına sınav giriş kartı (sınavlar, derslik ve koltuklar)
+        kind='rooms': (derslik, tarih, saat) başına kapı listesi
+        merged=False ise output_path bir dizindir ve belge başına bir dosya yazılır;
+        merged=True ise tüm belgeler output_path dosyasında birleştirilir.
+        Belgeler PDF_BATCH_CHUNK_SIZE'lık gruplar halinde işlem havuzunda çizilir; aynı anda
+        en fazla işlem başına PDF_BATCH_PENDING_PER_WORKER grup gönderilmiş olarak bekler.
+        """
         try:
-            from reportlab.lib.pagesizes import letter, A4
-            from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-            from reportlab.lib import colors
-            from reportlab.lib.units import inch
-            from reportlab.pdfbase import pdfmetrics
-            from reportlab.pdfbase.ttfonts import TTFont
+            import reportlab  # noqa: F401
+        except ImportError:
+            return False, "PDF oluşturmak için reportlab kütüphanesi gerekli. 'pip install reportlab' komutu ile yükleyin."
+        
+        try:
+            from pdf_documents import render_entities
+            started = time.perf_counter()
+            entities = self._student_card_entities() if kind == 'students' else self._room_sheet_entities()
+            
+            # pypdf yoksa birleştirilmiş çıktı tek parça olarak çizilir
+            chunk_size = PDF_BATCH_CHUNK_SIZE
+            part_paths = []
+            if merged:
+                try:
+                    import pypdf  # noqa: F401
+                except ImportError:
+                    chunk_size = None
+            else:
+                os.makedirs(output_path, exist_ok=True)
+            
+            workers = max_workers or os.cpu_count() or 1
+            # Çizimi bekleyen parça sayısı sınırlıdır; sorgu okuması çizimin önüne fazla geçmez
+            max_pending = workers * PDF_BATCH_PENDING_PER_WORKER
+            pending = deque()
+            totals = {'pages': 0, 'rendered': 0}
             
-            # Türkçe karakter desteği için font kaydı
+            def drain(limit):
+                """Bekleyen parça sayısı limite inene kadar en eski parçanın bitmesini bekler."""
+                while len(pending) > limit:
+                    self._check_cancelled()
+                    totals['pages'] += pending.popleft().result()
+                    totals['rendered'] += 1
+                    if self.progress_callback:
+                        # Toplam parça sayısı akış bitmeden bilinmez
+                        self.progress_callback({'phase': 'render', 'current': totals['rendered'], 'total': 0})
+            
+            entity_count = 0
             try:
-                # Windows sistem fontu kullan
-                pdfmetrics.registerFont(TTFont('Turkish', 'C:/Windows/Fonts/arial.ttf'))
-                pdfmetrics.registerFont(TTFont('Turkish-Bold', 'C:/Windows/Fonts/arialbd.ttf'))
-                default_font = 'Turkish'
-                bold_font = 'Turkish-Bold'
-            except:
-                # Font bulunamazsa DejaVu fontunu dene
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    try:
+                        for chunk in _iter_chunks(entities, chunk_size):
+                            entity_count += len(chunk)
+                            drain(max_pending - 1)
+                            pending.append(self._submit_pdf_chunk(executor, render_entities, chunk, output_path,
+                                                                  part_paths if merged else None))
+                        drain(0)
+                    except BaseException:
+                        # İptal veya hata: henüz başlamamış parçalar iptal edilir, çalışanlar bitince havuz kapanır
+                        for future in pending:
+                            future.cancel()
+                        raise
+                
+                if entity_count == 0:
+                    return False, "PDF'e aktarılacak oturma planı bulunamadı."
+                
+                if merged:
+                    self._merge_pdf_parts(part_paths, output_path)
+            finally:
+                # İptal/hata durumunda yarım kalan parça dosyaları silinir (birleştirmeden sonra zaten yoktur)
+                for part_path in part_paths:
+                    if os.path.exists(part_path):
+                        try:
+                            os.remove(part_path)
+                        except OSError:
+                            pass
+            
+            pages = totals['pages']
+            elapsed = time.perf_counter() - started
+            return True, (f"{entity_count} belge, {pages} sayfa oluşturuldu "
+                          f"({pages / elapsed if elapsed else pages:.1f} sayfa/sn): {output_path}")
+            
+        except Exception as e:
+            return False, f"PDF oluşturma hatası: {str(e)}"
+    
+    def _submit_pdf_chunk(self, executor, render_entities, chunk, output_path, part_paths):
+        """Bir belge grubunu işlem havuzuna gönderir; birleştirme modunda parça dosyası ayırır."""
+        if part_paths is None:
+            return executor.submit(render_entities, chunk, output_dir=output_path)
+        part_path = f"{output_path}.part{len(part_paths)}.pdf"
+        part_paths.append(part_path)
+        return executor.submit(render_entities, chunk, merged_path=part_path)
+    
+    def _merge_pdf_parts(self, part_paths, output_path):
+        """Parça PDF'leri sırayla tek dosyada birleştirir ve parçaları siler."""
+        if len(part_paths) == 1:
+            os.replace(part_paths[0], output_path)
+            return
+        from pypdf import PdfWriter
+        writer = PdfWriter()
+        try:
+            for part_path in part_paths:
+                writer.append(part_path)
+            with open(output_path, 'wb') as f:
+                writer.write(f)
+        finally:
+            for part_path in part_paths:
                 try:
-                    pdfmetrics.registerFont(TTFont('Turkish', 'DejaVuSans.ttf'))
-                    pdfmetrics.registerFont(TTFont('Turkish-Bold', 'DejaVuSans-Bold.ttf'))
-                    default_font = 'Turkish'
-                    bold_font = 'Turkish-Bold'
-                except:
-                    # Hiçbir font bulunamazsa varsayılan fontu kullan (ama Türkçe karakterler sorunlu olabilir)
-                    default_font = 'Helvetica'
-                    bold_font = 'Helvetica-Bold'
+                    os.remove(part_path)
+                except OSError:
+                    pass
+    
+    def _student_card_entities(self):
+        """Öğrenci sınav kartlarını tek sıralı sorgudan öğrenci öğrenci üretir."""
+        query = """
+            SELECT s.student_no, s.full_name, e.exam_date, e.start_time, c.code, c.name,
+                   e.exam_type, cl.code, sa.seat_row, sa.seat_col
+            FROM seating_assignments sa
+            JOIN students s ON sa.student_id = s.id
+            JOIN exams e ON sa.exam_id = e.id
+            JOIN courses c ON e.course_id = c.id
+            JOIN classrooms cl ON sa.classroom_id = cl.id
+            WHERE c.department_id = %s
+            ORDER BY s.student_no, e.exam_date, e.start_time
+        """
+        entity = None
+        for row in self._iter_query(query, (self.department_id,)):
+            student_no, full_name, exam_date, start_time = row[:4]
+            if entity is None or entity['key'] != student_no:
+                if entity is not None:
+                    yield entity
+                entity = {
+                    'key': student_no,
+                    'name': _safe_file_name(f"ogrenci_{student_no}"),
+                    'title': "Sınav Giriş Kartı",
+                    'subtitle': f"{student_no} - {full_name}",
+                    'headers': ['Tarih', 'Saat', 'Ders Kodu', 'Ders Adı', 'Sınav Türü', 'Derslik', 'Sıra', 'Sütun'],
+                    'rows': []
+                }
+            entity['rows'].append([exam_date.strftime('%d.%m.%Y'), _format_time(start_time),
+                                   *[str(value) for value in row[4:]]])
+        if entity is not None:
+            yield entity
+    
+    def _room_sheet_entities(self):
+        """Derslik kapı listelerini tek sıralı sorgudan (derslik, tarih, saat) bazında üretir."""
+        query = """
+            SELECT cl.code, cl.name, e.exam_date, e.start_time, c.code, e.exam_type,
+                   sa.seat_row, sa.seat_col, s.student_no, s.full_name
+            FROM seating_assignments sa
+            JOIN classrooms cl ON sa.classroom_id = cl.id
+            JOIN exams e ON sa.exam_id = e.id
+            JOIN courses c ON e.course_id = c.id
+            JOIN students s ON sa.student_id = s.id
+            WHERE c.department_id = %s
+            ORDER BY cl.code, e.exam_date, e.start_time, sa.seat_row, sa.seat_col
+        """
+        entity = None
+        for row in self._iter_query(query, (self.department_id,)):
+            classroom_code, classroom_name, exam_date, start_time, course_code, exam_type = row[:6]
+            key = (classroom_code, exam_date, start_time)
+            if entity is None or entity['key'] != key:
+                if entity is not None:
+                    yield entity
+                date_text, time_text = exam_date.strftime('%d.%m.%Y'), _format_time(start_time)
+                entity = {
+                    'key': key,
+                    'name': _safe_file_name(f"derslik_{classroom_code}_{exam_date:%Y%m%d}_{time_text.replace(':', '')}"),
+                    'title': f"{classroom_code} - {classroom_name}",
+                    'subtitle': f"{date_text} {time_text}",
+                    'headers': ['Sıra', 'Sütun', 'Öğrenci No', 'Ad Soyad', 'Sınav'],
+                    'rows': [],
+                    'exams': []
+                }
+            exam_label = f"{course_code} - {exam_type}"
+            if exam_label not in entity['exams']:
+                entity['exams'].append(exam_label)
+                entity['subtitle'] = f"{date_text} {time_text} | " + ", ".join(entity['exams'])
+            entity['rows'].append([str(value) for value in row[6:]] + [exam_label])
+        if entity is not None:
+            yield entity
+    
+    def _iter_query(self, query, params):
+        """Sorgu satırlarını batch_size'lık parçalarla okuyarak tek tek döndürür."""
+        for index, batch in enumerate(self._query_batches(query, params)):
+            if index == 0:
+                continue  # Başlık satırı
+            yield from batch
+    
+    def generate_pdf_report(self, file_path, group_by_date=True):
+        """
+        Sınav programı PDF raporunu oluşturur.
+        Uzun program sayfa boyunda tablolara bölünür (her parçada başlık tekrar eder);
+        group_by_date açıkken sınavlar tarih başlıkları altında gruplanır.
+        """
+        try:
+            from reportlab.lib.pagesizes import A4
+            from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+            from pdf_documents import get_styles, chunked_tables
             
+            # Yazı tipleri ve stiller süreç başına bir kez hazırlanır
+            styles = get_styles()
             doc = SimpleDocTemplate(file_path, pagesize=A4)
-            styles = getSampleStyleSheet()
             story = []
             
             # Başlık
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=16,
-                spaceAfter=30,
-                alignment=1,  # Center
-                fontName=bold_font
-            )
-            story.append(Paragraph("Sınav Programı Raporu", title_style))
+            story.append(Paragraph("Sınav Programı Raporu", styles['title']))
             story.append(Spacer(1, 20))
             
             # Sınav programı tablosu
@@ -332,19 +916,17 @@ class ExportManager:
             exams = scheduler.get_scheduled_exams()
             
             if exams:
-                # Tablo başlıkları
-                table_data = [['Tarih', 'Saat', 'Sınav Türü', 'Ders Kodu', 'Ders Adı', 'Sınıf', 'Öğretim Üyesi']]
+                headers = ['Tarih', 'Saat', 'Sınav Türü', 'Ders Kodu', 'Ders Adı', 'Sınıf', 'Öğretim Üyesi']
                 
+                # Sınavlar tarih/saat sırasıyla gelir; tarih değiştikçe yeni grup başlar
+                groups = []
                 for exam in exams:
-                    st = exam['start_time']
-                    if hasattr(st, 'strftime'):
-                        saat = st.strftime('%H:%M')
-                    else:
-                        total_seconds = int(st.total_seconds())
-                        saat = f"{(total_seconds // 3600) % 24:02d}:{(total_seconds % 3600) // 60:02d}"
-                    table_data.append([
-                        exam['exam_date'].strftime('%d.%m.%Y'),
-                        saat,
+                    date_text = exam['exam_date'].strftime('%d.%m.%Y')
+                    if not groups or (group_by_date and groups[-1][0] != date_text):
+                        groups.append((date_text, []))
+                    groups[-1][1].append([
+                        date_text,
+                        _format_time(exam['start_time']),
                         exam['exam_type'],
                         exam['course_code'],
                         exam['course_name'],
@@ -352,23 +934,11 @@ class ExportManager:
                         exam['instructor_name']
                     ])
                 
-                # Tablo oluştur
-                table = Table(table_data)
-                table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), bold_font),
-                    ('FONTNAME', (0, 1), (-1, -1), default_font),
-                    ('FONTSIZE', (0, 0), (-1, 0), 10),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                    ('FONTSIZE', (0, 1), (-1, -1), 8),
-                ]))
-                
-                story.append(table)
-                story.append(Spacer(1, 20))
+                for date_text, rows in groups:
+                    if group_by_date:
+                        story.append(Paragraph(date_text, styles['heading']))
+                    story.extend(chunked_tables(headers, rows))
+                    story.append(Spacer(1, 20))
             
             # PDF'i oluştur
             doc.build(story)
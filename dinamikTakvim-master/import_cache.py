@@ -0,0 +1,245 @@
+# import_cache.py
+# Excel aktarımlarında ayrıştırılmış satırları dosya özetine göre önbellekler.
+
+import hashlib
+import json
+import os
+import pickle
+import pandas as pd
+
+# Önbellek dizini ve toplam boyut sınırı (bayt)
+IMPORT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.dinamik_takvim', 'import_cache')
+IMPORT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Parquet için pyarrow/fastparquet gerekir; yoksa pickle kullanılır
+_FORMATS = (('.parquet', pd.read_parquet), ('.pkl', pd.read_pickle))
+
+# Parçalı satır önbelleği pyarrow yoksa art arda pickle edilmiş parçalar olarak yazılır
+_CHUNK_PICKLE_EXTENSION = '.pkls'
+
+
+def file_hash(file_path, block_size=1024 * 1024):
+    """Dosyanın SHA-256 özetini blok blok okuyarak hesaplar."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_frame(base_path, frame):
+    """DataFrame'i Parquet olarak, Parquet desteği yoksa pickle olarak yazar."""
+    os.makedirs(IMPORT_CACHE_DIR, exist_ok=True)
+    try:
+        frame.to_parquet(base_path + '.parquet', index=False)
+    except ImportError:
+        frame.to_pickle(base_path + '.pkl')
+
+
+def _read_frame(base_path):
+    """Önbellekteki DataFrame'i okur; yoksa veya okunamazsa None döndürür."""
+    for extension, reader in _FORMATS:
+        path = base_path + extension
+        if not os.path.exists(path):
+            continue
+        try:
+            frame = reader(path)
+        except Exception:
+            # Bozuk veya okunamayan önbellek dosyası: yok say
+            return None
+        # LRU tahliyesi için erişim zamanını güncelle
+        os.utime(path)
+        return frame
+    return None
+
+
+def load_rows(key):
+    """
+    Verilen anahtar için önbellekteki normalize satırları döndürür (yoksa None).
+    Anahtar liste türünü, ayrıştırıcı sürümünü ve dosya özetini içerir.
+    """
+    return _read_frame(os.path.join(IMPORT_CACHE_DIR, f"rows_{key}"))
+
+
+def save_rows(key, frame):
+    """Normalize satırları anahtarla önbelleğe yazar ve boyut sınırını uygular."""
+    try:
+        _write_frame(os.path.join(IMPORT_CACHE_DIR, f"rows_{key}"), frame)
+        _evict()
+    except OSError:
+        # Önbellek yazılamazsa aktarım yine de devam eder
+        pass
+
+
+def _arrow_schema(frame):
+    """Parçalar arasında değişmeyen Arrow şeması: metin sütunları her zaman string olur."""
+    import pyarrow as pa
+    return pa.schema([pa.field(name, pa.string() if dtype == object else pa.from_numpy_dtype(dtype))
+                      for name, dtype in frame.dtypes.items()])
+
+
+def _iter_pickled_chunks(path):
+    """Art arda pickle edilmiş DataFrame parçalarını sırayla okur."""
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def save_row_chunks(key, chunks):
+    """
+    Normalize satır parçalarını akış halinde tek önbellek dosyasına yazar; satırlar bellekte
+    birikmez. Dosya tamamlanana kadar geçici adla yazıldığından yarım kalan yazım okunmaz.
+    Yazılan satır sayısını döndürür; önbellek yazılamazsa OSError yükselir.
+    """
+    os.makedirs(IMPORT_CACHE_DIR, exist_ok=True)
+    base_path = os.path.join(IMPORT_CACHE_DIR, f"rows_{key}")
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        path = base_path + '.parquet'
+    except ImportError:
+        pq = None
+        path = base_path + _CHUNK_PICKLE_EXTENSION
+
+    rows = 0
+    try:
+        if pq is not None:
+            writer = None
+            try:
+                for chunk in chunks:
+                    if chunk.empty:
+                        continue
+                    if writer is None:
+                        writer = pq.ParquetWriter(path + '.tmp', _arrow_schema(chunk))
+                    writer.write_table(pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False))
+                    rows += len(chunk)
+            finally:
+                if writer is not None:
+                    writer.close()
+        else:
+            with open(path + '.tmp', 'wb') as f:
+                for chunk in chunks:
+                    if not chunk.empty:
+                        pickle.dump(chunk, f, protocol=pickle.HIGHEST_PROTOCOL)
+                        rows += len(chunk)
+    except BaseException:
+        _remove(path + '.tmp')
+        raise
+
+    if not rows:
+        _remove(path + '.tmp')
+        return 0
+    os.replace(path + '.tmp', path)
+    _evict()
+    return rows
+
+
+def row_chunks_info(key):
+    """Parçalı önbelleğin (satır sayısı, sütunlar) bilgisini döndürür; yoksa veya okunamazsa None."""
+    base_path = os.path.join(IMPORT_CACHE_DIR, f"rows_{key}")
+    path = base_path + '.parquet'
+    try:
+        if os.path.exists(path):
+            import pyarrow.parquet as pq
+            parquet = pq.ParquetFile(path)
+            info = parquet.metadata.num_rows, parquet.schema_arrow.names
+        elif os.path.exists(base_path + _CHUNK_PICKLE_EXTENSION):
+            path = base_path + _CHUNK_PICKLE_EXTENSION
+            rows, columns = 0, []
+            for chunk in _iter_pickled_chunks(path):
+                rows += len(chunk)
+                columns = columns or list(chunk.columns)
+            info = rows, columns
+        else:
+            return None
+        # LRU tahliyesi için erişim zamanını güncelle
+        os.utime(path)
+        return info
+    except Exception:
+        # Bozuk veya okunamayan önbellek dosyası: yok say
+        return None
+
+
+def iter_row_chunks(key, chunk_size):
+    """Önbellekteki satırları en fazla chunk_size satırlık DataFrame parçaları halinde üretir."""
+    base_path = os.path.join(IMPORT_CACHE_DIR, f"rows_{key}")
+    if os.path.exists(base_path + '.parquet'):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(base_path + '.parquet').iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+        return
+    for chunk in _iter_pickled_chunks(base_path + _CHUNK_PICKLE_EXTENSION):
+        for start in range(0, len(chunk), chunk_size):
+            yield chunk.iloc[start:start + chunk_size]
+
+
+def row_hashes(frame):
+    """Satırların tüm sütunlarından 64 bitlik özetler üretir (sütun türlerinden bağımsız)."""
+    return pd.util.hash_pandas_object(frame.fillna('').astype(str), index=False)
+
+
+def load_applied(key):
+    """
+    Bir bölümün önceki aktarımlarında veritabanına yazılmış satırların özetlerini ve o anki
+    veritabanı parmak izini döndürür: (özetler, parmak izi) veya kayıt yoksa None.
+    """
+    base_path = os.path.join(IMPORT_CACHE_DIR, f"applied_{key}")
+    try:
+        with open(base_path + '.json', encoding='utf-8') as f:
+            fingerprint = json.load(f)['fingerprint']
+    except (OSError, ValueError, KeyError):
+        return None
+    frame = _read_frame(base_path)
+    if frame is None or 'hash' not in frame.columns:
+        return None
+    return frame['hash'], fingerprint
+
+
+def save_applied(key, hashes, fingerprint):
+    """Yazılmış satırların özetlerini, yazımdan sonraki veritabanı parmak iziyle saklar."""
+    base_path = os.path.join(IMPORT_CACHE_DIR, f"applied_{key}")
+    try:
+        _write_frame(base_path, pd.DataFrame({'hash': hashes}).drop_duplicates())
+        with open(base_path + '.json', 'w', encoding='utf-8') as f:
+            json.dump({'fingerprint': fingerprint}, f)
+        _evict()
+    except OSError:
+        pass
+
+
+def _remove(path):
+    """Dosyayı varsa siler."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _evict():
+    """Toplam boyut sınırı aşılırsa en eski önbellek dosyalarını siler."""
+    entries = []
+    for name in os.listdir(IMPORT_CACHE_DIR):
+        # Başka bir işlemin yazmakta olduğu geçici dosyalara dokunulmaz
+        if name.endswith('.tmp'):
+            continue
+        # 'applied_' kayıtları da tahliye edilebilir; silinen kayıt yalnızca tam birleştirmeye yol açar
+        path = os.path.join(IMPORT_CACHE_DIR, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            # Başka bir işlem aynı anda silmiş olabilir
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= IMPORT_CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
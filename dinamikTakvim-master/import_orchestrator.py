@@ -0,0 +1,206 @@
+# import_orchestrator.py
+# Birden fazla ders/öğrenci listesini paralel ayrıştırıp bağımlılık sırasıyla veritabanına yazar.
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from excel_processor import (cache_courses_file, cache_students_file, load_cached_courses,
+                             import_course_rows, import_student_sources)
+
+# Ayrıştırmanın ilerleme çubuğundaki payı (kalanı veritabanı yazımıdır)
+PARSE_WEIGHT = 0.5
+
+
+def _parse_job(mode, file_path):
+    """
+    İşlem havuzunda çalışır: dosyayı ayrıştırıp normalize satırları içe aktarma önbelleğine
+    yazar ve yalnızca (önbellek anahtarı, satır sayısı, önbellekten mi, hata mesajı) döndürür;
+    satırlar ana işleme pickle ile taşınmaz, yazma aşamasında önbellekten parça parça okunur.
+    Modül düzeyinde olmalıdır (Windows'ta işlemlere pickle ile aktarılır).
+    """
+    if mode == 'courses':
+        return cache_courses_file(file_path)
+    return cache_students_file(file_path)
+
+
+class _ProgressTracker:
+    """Ayrıştırılan/yazılan satırları sayar ve yüzde ile tahmini kalan süreyi hesaplar."""
+
+    def __init__(self, files_total, callback):
+        self.callback = callback
+        self.files_total = files_total
+        self.files_parsed = 0
+        self.rows_parsed = 0
+        self.rows_total = 0
+        self.rows_written = 0
+        self.started = time.perf_counter()
+
+    def parsed(self, rows):
+        self.files_parsed += 1
+        self.rows_parsed += rows
+        self.emit('parse')
+
+    def written(self, rows):
+        self.rows_written += rows
+        self.emit('write')
+
+    def emit(self, phase, message=''):
+        if not self.callback:
+            return
+        parse_ratio = self.files_parsed / self.files_total if self.files_total else 1.0
+        write_ratio = self.rows_written / self.rows_total if self.rows_total else float(phase == 'done')
+        fraction = PARSE_WEIGHT * parse_ratio + (1 - PARSE_WEIGHT) * min(write_ratio, 1.0)
+        elapsed = time.perf_counter() - self.started
+        eta = elapsed * (1 - fraction) / fraction if fraction > 0 else None
+        self.callback({
+            'phase': phase,
+            'message': message,
+            'files_total': self.files_total,
+            'files_parsed': self.files_parsed,
+            'rows_parsed': self.rows_parsed,
+            'rows_written': self.rows_written,
+            'rows_total': self.rows_total,
+            'percent': int(fraction * 100),
+            'elapsed': elapsed,
+            'eta': eta
+        })
+
+
+def _parse_all(jobs, tracker, max_workers):
+    """Tüm dosyaları ayrıştırır; birden fazla dosya varsa işlem havuzu kullanılır."""
+    parsed = [None] * len(jobs)
+    if len(jobs) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(_parse_job, job['mode'], job['file_path']): index
+                           for index, job in enumerate(jobs)}
+                for future in as_completed(futures):
+                    index = futures[future]
+                    try:
+                        parsed[index] = future.result()
+                    except Exception as e:
+                        parsed[index] = (None, 0, False, f"Dosya okunamadı: {str(e)}")
+                    tracker.parsed(parsed[index][1])
+            return parsed
+        except (OSError, RuntimeError):
+            # İşlem havuzu başlatılamazsa (kısıtlı ortam) sırayla ayrıştır
+            parsed = [None] * len(jobs)
+            tracker.files_parsed = tracker.rows_parsed = 0
+
+    for index, job in enumerate(jobs):
+        try:
+            parsed[index] = _parse_job(job['mode'], job['file_path'])
+        except Exception as e:
+            parsed[index] = (None, 0, False, f"Dosya okunamadı: {str(e)}")
+        tracker.parsed(parsed[index][1])
+    return parsed
+
+
+def _write_groups(jobs, delta):
+    """
+    Yazma gruplarını (iş indeksleri listesi) sırasıyla döndürür: önce dersler, sonra öğrenciler.
+    Fark modunda bir bölümün tüm öğrenci dosyaları tek grupta birleşir; böylece fark tek
+    hazırlık yüklemesinde tüm dosyalara karşı bir kez hesaplanır (bir dosya, aynı gruptaki
+    başka bir dosyanın eklediği kayıtları silmez).
+    """
+    groups = [[index] for index, job in enumerate(jobs) if job['mode'] == 'courses']
+    if not delta:
+        return groups + [[index] for index, job in enumerate(jobs) if job['mode'] != 'courses']
+    by_department = {}
+    for index, job in enumerate(jobs):
+        if job['mode'] != 'courses':
+            by_department.setdefault(job.get('department_id'), []).append(index)
+    return groups + list(by_department.values())
+
+
+def run_import_batch(jobs, progress_callback=None, max_workers=None, delta=False, delete_missing=False):
+    """
+    Bir grup liste dosyasını içe aktarır.
+
+    Args:
+        jobs: {'mode': 'courses' | 'students', 'file_path': ..., 'department_id': ...} listesi
+        progress_callback: İlerleme sözlüğüyle çağrılır (phase, rows_parsed, rows_written,
+            rows_total, percent, eta ...)
+        max_workers: Ayrıştırma için en fazla işlem sayısı (varsayılan: CPU sayısı)
+        delta: Öğrenci listelerinde fark modu; bir bölümün öğrenci dosyaları birleştirilip
+            mevcut ders kayıtlarıyla tek seferde karşılaştırılır
+        delete_missing: Fark modunda listelerdeki öğrencilerin listelerde olmayan ders
+            kayıtlarını siler; gruptaki bir dosya okunamazsa o bölümde silme yapılmaz
+
+    Dosyalar paralel ayrıştırılıp içe aktarma önbelleğine yazılır; veritabanı yazımları ise
+    tek tek ve ders listeleri öğrenci listelerinden önce yapılır (ders kayıtları ders
+    kodlarına bağlıdır). Öğrenci satırları önbellekten parça parça okunduğundan bellek
+    kullanımı dosya boyutundan bağımsızdır.
+    """
+    started = time.perf_counter()
+    tracker = _ProgressTracker(len(jobs), progress_callback)
+    results = {
+        'success': 0,
+        'errors': [],
+        'warnings': [],
+        'files': [],
+        'timings': {}
+    }
+    if not jobs:
+        return results
+
+    workers = max_workers or min(len(jobs), os.cpu_count() or 1)
+    parsed = _parse_all(jobs, tracker, workers)
+    results['timings']['parse'] = time.perf_counter() - started
+
+    tracker.rows_total = sum(rows for _, rows, _, _ in parsed)
+    tracker.emit('write')
+
+    started = time.perf_counter()
+    for group in _write_groups(jobs, delta):
+        job = jobs[group[0]]
+        file_info = {'mode': job['mode'], 'department_id': job.get('department_id')}
+        readable = []
+        for index in group:
+            error = parsed[index][3]
+            if not error:
+                readable.append(index)
+                continue
+            file_name = os.path.basename(jobs[index]['file_path'])
+            results['files'].append({'success': 0, 'errors': [error], 'warnings': [],
+                                     'file_paths': [jobs[index]['file_path']], **file_info})
+            results['errors'].append(f"{file_name}: {error}")
+        if not readable:
+            continue
+
+        file_paths = [jobs[index]['file_path'] for index in readable]
+        sources = [(parsed[index][0], jobs[index]['file_path']) for index in readable]
+        file_name = ', '.join(os.path.basename(path) for path in file_paths)
+        tracker.emit('write', f"{file_name} yazılıyor...")
+        written_before = tracker.rows_written
+        if job['mode'] == 'courses':
+            courses, error = load_cached_courses(*sources[0])
+            if error:
+                file_results = {'success': 0, 'errors': [error], 'warnings': []}
+            else:
+                file_results = import_course_rows(courses, job['department_id'],
+                                                  progress_callback=tracker.written)
+        else:
+            # Eksik dosyayla yapılan fark, o dosyadaki kayıtları silinmiş sayardı
+            group_delete = delete_missing and delta and len(readable) == len(group)
+            file_results = import_student_sources(sources, job.get('department_id'), delta=delta,
+                                                  delete_missing=group_delete, progress_callback=tracker.written)
+            if delete_missing and delta and not group_delete:
+                file_results['warnings'].append(
+                    "Okunamayan dosya olduğu için listede olmayan ders kayıtları silinmedi")
+        # Yazım erken biterse (ör. hata) kalan satırlar da ilerlemeye dahil edilir
+        tracker.written(sum(parsed[index][1] for index in readable) - (tracker.rows_written - written_before))
+        if 'cache' in file_results:
+            file_results['cache']['hit'] = all(parsed[index][2] for index in readable)
+
+        file_results.update({'file_paths': file_paths, **file_info})
+        results['files'].append(file_results)
+        if file_results['errors']:
+            results['errors'].extend(f"{file_name}: {message}" for message in file_results['errors'])
+        else:
+            results['success'] += len(readable)
+        results['warnings'].extend(f"{file_name}: {message}" for message in file_results['warnings'])
+
+    results['timings']['write'] = time.perf_counter() - started
+    tracker.emit('done')
+    return results
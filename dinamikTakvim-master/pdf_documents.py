@@ -0,0 +1,141 @@
+# pdf_documents.py
+# reportlab ile PDF belge üretimi: yazı tipi ve stil önbelleği, toplu belge çizimi.
+
+import os
+
+# Türkçe karakter desteği için denenecek yazı tipleri (normal, kalın)
+FONT_CANDIDATES = [
+    ('C:/Windows/Fonts/arial.ttf', 'C:/Windows/Fonts/arialbd.ttf'),
+    ('DejaVuSans.ttf', 'DejaVuSans-Bold.ttf'),
+]
+
+# Uzun tablolar bu kadar satırlık parçalara bölünür (A4 sayfasına sığacak kadar)
+TABLE_ROWS_PER_CHUNK = 40
+
+# Süreç başına bir kez doldurulur
+_fonts = None
+_styles = None
+_table_style = None
+
+
+def get_fonts():
+    """
+    Türkçe karakter destekli yazı tiplerini süreç başına bir kez kaydeder.
+    (normal, kalın) yazı tipi adlarını döndürür; hiçbiri bulunamazsa Helvetica kullanılır.
+    """
+    global _fonts
+    if _fonts is None:
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+        _fonts = ('Helvetica', 'Helvetica-Bold')
+        for regular_path, bold_path in FONT_CANDIDATES:
+            try:
+                pdfmetrics.registerFont(TTFont('Turkish', regular_path))
+                pdfmetrics.registerFont(TTFont('Turkish-Bold', bold_path))
+                _fonts = ('Turkish', 'Turkish-Bold')
+                break
+            except Exception:
+                continue
+    return _fonts
+
+
+def get_styles():
+    """Belgelerde kullanılan paragraf stillerini bir kez oluşturur ve paylaşır."""
+    global _styles
+    if _styles is None:
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        default_font, bold_font = get_fonts()
+        sample = getSampleStyleSheet()
+        _styles = {
+            'title': ParagraphStyle('CustomTitle', parent=sample['Heading1'], fontSize=16,
+                                    spaceAfter=30, alignment=1, fontName=bold_font),
+            'heading': ParagraphStyle('EntityTitle', parent=sample['Heading2'], fontSize=14,
+                                      spaceAfter=6, alignment=1, fontName=bold_font),
+            'subtitle': ParagraphStyle('EntitySubtitle', parent=sample['Normal'], fontSize=10,
+                                       spaceAfter=12, alignment=1, fontName=default_font)
+        }
+    return _styles
+
+
+def table_style():
+    """Sınav tablolarının ortak görünümü (tek başlık satırı); bir kez oluşturulup paylaşılır."""
+    global _table_style
+    if _table_style is not None:
+        return _table_style
+    from reportlab.platypus import TableStyle
+    from reportlab.lib import colors
+    default_font, bold_font = get_fonts()
+    header_rows = 1
+    _table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, header_rows - 1), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, header_rows - 1), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, header_rows - 1), bold_font),
+        ('FONTNAME', (0, header_rows), (-1, -1), default_font),
+        ('FONTSIZE', (0, 0), (-1, header_rows - 1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, header_rows - 1), 12),
+        ('BACKGROUND', (0, header_rows), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('FONTSIZE', (0, header_rows), (-1, -1), 8),
+    ])
+    return _table_style
+
+
+def chunked_tables(headers, rows, rows_per_table=TABLE_ROWS_PER_CHUNK):
+    """
+    Uzun bir tabloyu her biri başlık satırıyla başlayan küçük tablolara böler.
+    Küçük tabloların yerleşimi tek dev tablodan çok daha hızlıdır ve sayfalara temiz bölünür.
+    """
+    from reportlab.platypus import Table
+    style = table_style()
+    tables = []
+    for start in range(0, len(rows), rows_per_table):
+        table = Table([headers] + rows[start:start + rows_per_table], repeatRows=1)
+        table.setStyle(style)
+        tables.append(table)
+    return tables
+
+
+def _entity_story(entity):
+    """
+    Tek bir belge (öğrenci kartı, kapı listesi ...) için akış öğelerini oluşturur.
+    entity: {'name', 'title', 'subtitle', 'headers', 'rows'}
+    """
+    from reportlab.platypus import Paragraph, Spacer
+    styles = get_styles()
+    return [
+        Paragraph(entity['title'], styles['heading']),
+        Paragraph(entity['subtitle'], styles['subtitle']),
+        Spacer(1, 10),
+        *chunked_tables(entity['headers'], entity['rows'])
+    ]
+
+
+def _build(file_path, story):
+    """Belgeyi oluşturur ve sayfa sayısını döndürür."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate
+    doc = SimpleDocTemplate(file_path, pagesize=A4)
+    doc.build(story)
+    return doc.page
+
+
+def render_entities(entities, output_dir=None, merged_path=None):
+    """
+    Belgeleri çizer: merged_path verilirse hepsi tek dosyada (her biri yeni sayfada),
+    aksi halde output_dir içinde belge başına bir dosya ('name'.pdf) oluşturulur.
+    İşlem havuzunda çalışabilmesi için modül düzeyindedir. Toplam sayfa sayısını döndürür.
+    """
+    if merged_path:
+        from reportlab.platypus import PageBreak
+        story = []
+        for entity in entities:
+            if story:
+                story.append(PageBreak())
+            story.extend(_entity_story(entity))
+        return _build(merged_path, story) if story else 0
+
+    pages = 0
+    for entity in entities:
+        pages += _build(os.path.join(output_dir, f"{entity['name']}.pdf"), _entity_story(entity))
+    return pages
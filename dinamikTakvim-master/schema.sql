@@ -133,6 +133,7 @@ CREATE TABLE IF NOT EXISTS exams (
                                      start_time TIME NOT NULL,
                                      duration_minutes INT NOT NULL,
                                      PRIMARY KEY (id),
+                                     KEY idx_exams_schedule (exam_date, start_time), -- Tarih/saat sıralı sayfalama için
                                      CONSTRAINT fk_exams_courses
                                          FOREIGN KEY (course_id)
                                              REFERENCES courses(id)
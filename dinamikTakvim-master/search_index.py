@@ -0,0 +1,106 @@
+# search_index.py
+# Ders, öğretim üyesi ve öğrenci aramaları için bellek içi n-gram arama indeksi.
+
+# Türkçe büyük/küçük harf dönüşümü (str.lower() 'I' -> 'i' ve 'İ' -> 'i̇' üretir)
+_TURKISH_LOWER = (('I', 'ı'), ('İ', 'i'))
+# Aramada Türkçe karakterler yazılmasa da eşleşsin diye harfler ASCII karşılıklarına indirgenir
+_ASCII_FOLD = (('ç', 'c'), ('ğ', 'g'), ('ı', 'i'), ('ö', 'o'), ('ş', 's'), ('ü', 'u'),
+               ('â', 'a'), ('î', 'i'), ('û', 'u'))
+
+# Alt dizi aramasında kullanılan n-gram uzunluğu; daha kısa sorgu kelimeleri sıralı taramayla aranır
+NGRAM_SIZE = 3
+# Sonuç sınırlıyken, aday kelime sayısı limitin bu katını aşarsa indeks yerine sıralı tarama yapılır
+# (yaygın sorgularda eşleşmeler sık olduğundan tarama limit dolunca hemen biter)
+SCAN_FACTOR = 20
+
+
+def fold(text):
+    """Metni Türkçe kurallarıyla küçültür ve aksanları kaldırır ('İSTANBUL' -> 'istanbul', 'Işık' -> 'isik')."""
+    # Ardışık replace çağrıları, sözlüklü str.translate'ten büyük metinlerde çok daha hızlıdır
+    text = str(text)
+    for source, target in _TURKISH_LOWER:
+        text = text.replace(source, target)
+    text = text.lower()
+    for source, target in _ASCII_FOLD:
+        text = text.replace(source, target)
+    return text
+
+
+class SearchIndex:
+    """
+    Kayıtları kelimeleri üzerinden indeksler.
+    Her benzersiz kelime bir kez n-gramlarına ayrılır (isimler ve kodlar çok tekrar ettiğinden
+    benzersiz kelime sayısı kayıt sayısından çok küçüktür). Sorgudaki her kelime kaydın bir
+    kelimesinin içinde geçmelidir; sonuçlar kayıtların eklenme sırasıyla döner.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self._texts = []         # kayıt numarası -> katlanmış kelimeler (boşlukla birleşik)
+        self._postings = {}      # kelime -> kayıt numaraları
+        self._ngrams = {}        # n-gram -> o n-gramı içeren kelimeler
+
+    @classmethod
+    def build(cls, entries, fields):
+        """entries içindeki her kayıt için fields anahtarlarındaki metinleri indeksler."""
+        index = cls()
+        postings = index._postings
+        # Tüm metinler tek seferde katlanır (kayıt başına translate çağrısından çok daha hızlı)
+        texts = fold('\n'.join(' '.join(str(entry[field]) for field in fields if entry[field] is not None)
+                                for entry in entries)).split('\n') if entries else []
+        for number, text in enumerate(texts):
+            tokens = set(text.split())
+            index._texts.append(' '.join(tokens))
+            for token in tokens:
+                postings.setdefault(token, []).append(number)
+        index.size = len(entries)
+
+        ngrams = index._ngrams
+        for token in postings:
+            for gram in {token[start:start + NGRAM_SIZE] for start in range(len(token) - NGRAM_SIZE + 1)}:
+                ngrams.setdefault(gram, []).append(token)
+        return index
+
+    def _scan(self, words, numbers, limit):
+        """Aday kayıtlardan tüm kelimeleri içerenleri sırayla döndürür; limit dolunca durur."""
+        result = []
+        texts = self._texts
+        for number in numbers:
+            text = texts[number]
+            if all(word in text for word in words):
+                result.append(number)
+                if limit is not None and len(result) >= limit:
+                    break
+        return result
+
+    def search(self, query, limit=None):
+        """
+        Sorgudaki tüm kelimeleri içeren kayıtların numaralarını (eklenme sırasıyla) döndürür.
+        Boş sorgu tüm kayıtları döndürür.
+        """
+        words = set(fold(query).split())
+        if not words:
+            return list(range(self.size if limit is None else min(limit, self.size)))
+
+        # Her uzun kelimenin en seçici n-gramı; en az kelimeye sahip olan aday kümesini belirler
+        best_word, best_tokens = None, None
+        for word in words:
+            if len(word) < NGRAM_SIZE:
+                continue
+            for start in range(len(word) - NGRAM_SIZE + 1):
+                tokens = self._ngrams.get(word[start:start + NGRAM_SIZE])
+                if not tokens:
+                    return []
+                if best_tokens is None or len(tokens) < len(best_tokens):
+                    best_word, best_tokens = word, tokens
+
+        # Kısa kelimeler ya da çok yaygın n-gramlar için sıralı tarama (limitle erken biter)
+        if best_tokens is None or (limit is not None and len(best_tokens) > limit * SCAN_FACTOR):
+            return self._scan(words, range(self.size), limit)
+
+        postings = [self._postings[token] for token in best_tokens if best_word in token]
+        words.discard(best_word)
+        if len(postings) == 1:
+            # Tek kelime eşleştiyse kayıt listesi zaten sıralıdır; tarama limit dolunca biter
+            return self._scan(words, postings[0], limit)
+        return self._scan(words, sorted(set().union(*postings)), limit)
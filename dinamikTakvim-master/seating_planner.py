@@ -2,17 +2,42 @@
 # Oturma planı üretimi ve yönetimi işlemlerini içerir.
 
 from database import get_db_connection
+from classroom_occupancy import schedule_changed
 import random
 
+
+def _minutes(time_value):
+    """TIME alanını (timedelta veya time) gün içindeki dakikaya çevirir."""
+    if hasattr(time_value, 'total_seconds'):
+        return int(time_value.total_seconds()) // 60
+    return time_value.hour * 60 + time_value.minute
+
+
+def _overlaps(start, duration, other_start, other_duration):
+    """Aynı gündeki iki sınavın [başlangıç, başlangıç + süre) aralıkları kesişiyor mu?"""
+    return start < other_start + other_duration and other_start < start + duration
+
+
 class SeatingPlanner:
     """Oturma planı üretimi ve yönetimi sınıfı."""
     
     def __init__(self, department_id):
         self.department_id = department_id
     
-    def generate_seating_plans(self):
-        """Tüm sınavlar için oturma planları oluşturur."""
+    def generate_seating_plans(self, allocate_extra_rooms=False, progress_callback=None, cancel_event=None):
+        """
+        Tüm sınavlar için oturma planları oluşturur.
+
+        Args:
+            allocate_extra_rooms: True ise kapasitesi yetmeyen sınavlara önce
+                aynı saatte boş olan derslikler eklenir (bkz. validate_capacity)
+            progress_callback: {'phase', 'current', 'total'} sözlüğüyle her sınavdan sonra çağrılır
+            cancel_event: set() edilirse bir sonraki sınavda durulur ('cancelled': True döner)
+        """
         try:
+            if allocate_extra_rooms:
+                self.validate_capacity(auto_allocate=True)
+
             # Sınavları ve atandıkları derslikleri al
             exams_with_classrooms = self._get_exams_with_classrooms()
             
@@ -22,7 +47,15 @@ class SeatingPlanner:
                 'warnings': []
             }
             
-            for exam_data in exams_with_classrooms:
+            for index, exam_data in enumerate(exams_with_classrooms):
+                if cancel_event is not None and cancel_event.is_set():
+                    results['cancelled'] = True
+                    results['warnings'].append(
+                        f"İşlem iptal edildi: {len(exams_with_classrooms) - index} sınavın oturma planı oluşturulmadı")
+                    break
+                if progress_callback:
+                    progress_callback({'phase': 'seating', 'current': index,
+                                       'total': len(exams_with_classrooms)})
                 try:
                     # Bu sınava kayıtlı öğrencileri al
                     students = self._get_exam_students(exam_data['exam_id'])
@@ -56,6 +89,11 @@ class SeatingPlanner:
                             else:
                                 results['errors'].append(f"Sınav {exam_data['exam_id']}, Derslik {classroom_id}: Oturma planı oluşturulamadı")
                     
+                    if students:
+                        results['warnings'].append(
+                            f"Sınav {exam_data['exam_id']} ({exam_data['course_code']}): "
+                            f"Derslik kapasitesi yetersiz, {len(students)} öğrenci yerleştirilemedi")
+                    
                 except Exception as e:
                     results['errors'].append(f"Sınav {exam_data['exam_id']}: {str(e)}")
             
@@ -126,6 +164,125 @@ class SeatingPlanner:
         finally:
             connection.close()
     
+    def validate_capacity(self, auto_allocate=False):
+        """
+        Sınav kayıt sayılarını atanan derslik kapasiteleriyle tek sorguda karşılaştırır.
+
+        Args:
+            auto_allocate: True ise taşan sınavlara sınav süresince boş olan
+                bölüm derslikleri kapasiteye göre eklenir
+
+        Returns:
+            Taşma kayıtları listesi. Her kayıt sınav bilgisi, öğrenci sayısı,
+            kapasite, taşan öğrenci sayısı ve eklenen derslik kodlarını içerir.
+        """
+        connection = get_db_connection()
+        if not connection:
+            return []
+
+        try:
+            cursor = connection.cursor(dictionary=True)
+            query = """
+                SELECT e.id as exam_id, e.exam_date, e.start_time, e.duration_minutes,
+                       c.code as course_code,
+                       COALESCE(r.student_count, 0) as student_count,
+                       COALESCE(a.capacity, 0) as capacity
+                FROM exams e
+                JOIN courses c ON e.course_id = c.id
+                LEFT JOIN (
+                    SELECT course_id, COUNT(*) as student_count
+                    FROM enrollments
+                    GROUP BY course_id
+                ) r ON r.course_id = e.course_id
+                LEFT JOIN (
+                    SELECT ea.exam_id, SUM(cl.capacity) as capacity
+                    FROM exam_assignments ea
+                    JOIN classrooms cl ON ea.classroom_id = cl.id
+                    GROUP BY ea.exam_id
+                ) a ON a.exam_id = e.id
+                WHERE c.department_id = %s
+                  AND COALESCE(r.student_count, 0) > COALESCE(a.capacity, 0)
+                ORDER BY e.exam_date, e.start_time, c.code
+            """
+            cursor.execute(query, (self.department_id,))
+            overflows = []
+            for row in cursor.fetchall():
+                overflows.append({
+                    'exam_id': row['exam_id'],
+                    'course_code': row['course_code'],
+                    'exam_date': row['exam_date'],
+                    'start_time': row['start_time'],
+                    'duration_minutes': row['duration_minutes'],
+                    'student_count': int(row['student_count']),
+                    'capacity': int(row['capacity']),
+                    'overflow': int(row['student_count']) - int(row['capacity']),
+                    'added_classrooms': []
+                })
+
+            if overflows and auto_allocate:
+                self._allocate_extra_classrooms(cursor, overflows)
+                connection.commit()
+                schedule_changed(self.department_id)
+
+            return overflows
+
+        except Exception as e:
+            print(f"Kapasite kontrolü yapılırken hata: {e}")
+            return []
+        finally:
+            connection.close()
+
+    def _allocate_extra_classrooms(self, cursor, overflows):
+        """
+        Taşan sınavlara, sınav süresince başka bir sınavla kullanılmayan derslikleri atar.
+        Başlangıç saatleri farklı olsa da süreleri kesişen sınavlar dersliği paylaşamaz.
+        """
+        cursor.execute(
+            "SELECT id, code, capacity FROM classrooms WHERE department_id = %s ORDER BY capacity DESC",
+            (self.department_id,)
+        )
+        classrooms = cursor.fetchall()
+
+        # Tarih -> [(başlangıç dakikası, süre, derslik id)] dolu aralıklar
+        cursor.execute("""
+            SELECT e.exam_date, e.start_time, e.duration_minutes, ea.classroom_id
+            FROM exam_assignments ea
+            JOIN exams e ON ea.exam_id = e.id
+            JOIN classrooms cl ON ea.classroom_id = cl.id
+            WHERE cl.department_id = %s
+        """, (self.department_id,))
+        busy = {}
+        for row in cursor.fetchall():
+            busy.setdefault(row['exam_date'], []).append(
+                (_minutes(row['start_time']), row['duration_minutes'] or 0, row['classroom_id']))
+
+        new_assignments = []
+        for record in overflows:
+            start = _minutes(record['start_time'])
+            duration = record['duration_minutes'] or 0
+            day_busy = busy.setdefault(record['exam_date'], [])
+            taken = {classroom_id for other_start, other_duration, classroom_id in day_busy
+                     if _overlaps(start, duration, other_start, other_duration)}
+            remaining = record['overflow']
+            for classroom in classrooms:
+                if remaining <= 0:
+                    break
+                if classroom['id'] in taken:
+                    continue
+                taken.add(classroom['id'])
+                day_busy.append((start, duration, classroom['id']))
+                new_assignments.append((record['exam_id'], classroom['id']))
+                record['added_classrooms'].append(classroom['code'])
+                record['capacity'] += classroom['capacity']
+                remaining -= classroom['capacity']
+            record['overflow'] = max(remaining, 0)
+
+        if new_assignments:
+            cursor.executemany(
+                "INSERT INTO exam_assignments (exam_id, classroom_id) VALUES (%s, %s)",
+                new_assignments
+            )
+
     def _get_exam_students(self, exam_id):
         """Belirli bir sınava kayıtlı öğrencileri getirir."""
         connection = get_db_connection()
@@ -188,6 +345,7 @@ class SeatingPlanner:
                         break  # Tüm öğrenciler yerleştirildi
             
             connection.commit()
+            schedule_changed(self.department_id)
             return True
             
         except Exception as e:
@@ -196,6 +354,148 @@ class SeatingPlanner:
         finally:
             connection.close()
     
+    def repair_seating_plans(self, added_enrollments=None, removed_enrollments=None):
+        """
+        Ders kaydı değişikliklerine göre oturma planlarını artımlı olarak günceller.
+        Yalnızca etkilenen sınavlardaki ilgili koltuklar eklenir/silinir, diğer
+        öğrencilerin yerleri değişmez. Oturma planı hiç oluşturulmamış sınavlara
+        dokunulmaz (kısmi plan oluşmaz; plan daha sonra tümüyle oluşturulur).
+
+        Args:
+            added_enrollments: Eklenen (student_id, course_id) çiftleri
+            removed_enrollments: Silinen (student_id, course_id) çiftleri
+        """
+        added_enrollments = list(added_enrollments or [])
+        removed_enrollments = list(removed_enrollments or [])
+        results = {
+            'success': 0,
+            'removed': 0,
+            'errors': [],
+            'warnings': []
+        }
+
+        course_ids = sorted({cid for _, cid in added_enrollments + removed_enrollments})
+        if not course_ids:
+            return results
+
+        connection = get_db_connection()
+        if not connection:
+            results['errors'].append("Veritabanı bağlantısı kurulamadı.")
+            return results
+
+        try:
+            cursor = connection.cursor(dictionary=True)
+
+            # 1) Etkilenen derslerin oturma planı olan sınavlarını bul (ders -> sınav id listesi)
+            course_exams = {}
+            for i in range(0, len(course_ids), 1000):
+                chunk = course_ids[i:i+1000]
+                placeholders = ','.join(['%s'] * len(chunk))
+                cursor.execute(f"""
+                    SELECT e.id, e.course_id
+                    FROM exams e
+                    JOIN courses c ON e.course_id = c.id
+                    WHERE c.department_id = %s AND e.course_id IN ({placeholders})
+                      AND EXISTS (SELECT 1 FROM seating_assignments sa WHERE sa.exam_id = e.id)
+                """, (self.department_id, *chunk))
+                for row in cursor.fetchall():
+                    course_exams.setdefault(row['course_id'], []).append(row['id'])
+
+            # 2) Kaydı silinen öğrencilerin koltuklarını boşalt
+            removed_seats = [
+                (exam_id, student_id)
+                for student_id, course_id in removed_enrollments
+                for exam_id in course_exams.get(course_id, [])
+            ]
+            if removed_seats:
+                cursor.executemany(
+                    "DELETE FROM seating_assignments WHERE exam_id = %s AND student_id = %s",
+                    removed_seats
+                )
+                results['removed'] = cursor.rowcount
+
+            # 3) Yeni öğrenciler için etkilenen sınavların derslik ve dolu koltuk bilgisi
+            added_by_exam = {}
+            for student_id, course_id in added_enrollments:
+                for exam_id in course_exams.get(course_id, []):
+                    added_by_exam.setdefault(exam_id, []).append(student_id)
+
+            if added_by_exam:
+                exam_ids = sorted(added_by_exam)
+                placeholders = ','.join(['%s'] * len(exam_ids))
+                cursor.execute(f"""
+                    SELECT ea.exam_id, cl.id as classroom_id, cl.capacity,
+                           cl.rows_count, cl.cols_count
+                    FROM exam_assignments ea
+                    JOIN classrooms cl ON ea.classroom_id = cl.id
+                    WHERE ea.exam_id IN ({placeholders})
+                    ORDER BY ea.exam_id, cl.capacity DESC
+                """, tuple(exam_ids))
+                exam_classrooms = {}
+                for row in cursor.fetchall():
+                    exam_classrooms.setdefault(row['exam_id'], []).append(row)
+
+                cursor.execute(f"""
+                    SELECT exam_id, classroom_id, student_id, seat_row, seat_col
+                    FROM seating_assignments
+                    WHERE exam_id IN ({placeholders})
+                """, tuple(exam_ids))
+                occupied = {}  # (exam_id, classroom_id) -> {(satır, sütun)}
+                seated_students = set()  # (exam_id, student_id)
+                for row in cursor.fetchall():
+                    occupied.setdefault((row['exam_id'], row['classroom_id']), set()).add(
+                        (row['seat_row'], row['seat_col']))
+                    seated_students.add((row['exam_id'], row['student_id']))
+
+                # 4) Her yeni öğrenciye ilk boş koltuğu ata
+                new_seats = []
+                for exam_id in exam_ids:
+                    for student_id in added_by_exam[exam_id]:
+                        if (exam_id, student_id) in seated_students:
+                            continue
+                        seat = self._find_free_seat(exam_id, exam_classrooms.get(exam_id, []), occupied)
+                        if seat is None:
+                            results['warnings'].append(
+                                f"Sınav {exam_id}: Öğrenci {student_id} için boş koltuk bulunamadı")
+                            continue
+                        classroom_id, seat_row, seat_col = seat
+                        occupied.setdefault((exam_id, classroom_id), set()).add((seat_row, seat_col))
+                        seated_students.add((exam_id, student_id))
+                        new_seats.append((exam_id, student_id, classroom_id, seat_row, seat_col))
+
+                if new_seats:
+                    cursor.executemany("""
+                        INSERT INTO seating_assignments
+                        (exam_id, student_id, classroom_id, seat_row, seat_col)
+                        VALUES (%s, %s, %s, %s, %s)
+                    """, new_seats)
+                    results['success'] = len(new_seats)
+
+            connection.commit()
+            schedule_changed(self.department_id)
+            return results
+
+        except Exception as e:
+            connection.rollback()
+            results['success'] = 0
+            results['removed'] = 0
+            results['errors'].append(f"Oturma planı güncelleme hatası: {str(e)}")
+            return results
+        finally:
+            connection.close()
+
+    def _find_free_seat(self, exam_id, classrooms, occupied):
+        """Sınavın dersliklerinde kapasiteyi aşmayan ilk boş koltuğu döndürür."""
+        for classroom in classrooms:
+            taken = occupied.get((exam_id, classroom['classroom_id']), set())
+            if len(taken) >= classroom['capacity']:
+                continue
+            for row in range(1, classroom['rows_count'] + 1):
+                for col in range(1, classroom['cols_count'] + 1):
+                    if (row, col) not in taken:
+                        return classroom['classroom_id'], row, col
+        return None
+
     def get_seating_plan(self, exam_id, classroom_id=None):
         """Belirli bir sınav için oturma planını getirir."""
         connection = get_db_connection()
@@ -239,6 +539,37 @@ class SeatingPlanner:
         finally:
             connection.close()
     
+    def get_department_seating(self):
+        """
+        Bölümün tüm sınavlarının oturma yerlerini tek sorguda getirir.
+        Satırlar (sınav, derslik kodu, sıra, sütun, öğrenci no, ad soyad) demetleridir.
+        """
+        connection = get_db_connection()
+        if not connection:
+            return []
+        
+        try:
+            cursor = connection.cursor()
+            query = """
+                SELECT CONCAT(c.code, ' - ', e.exam_type), cl.code, sa.seat_row, sa.seat_col,
+                       s.student_no, s.full_name
+                FROM seating_assignments sa
+                JOIN exams e ON sa.exam_id = e.id
+                JOIN courses c ON e.course_id = c.id
+                JOIN classrooms cl ON sa.classroom_id = cl.id
+                JOIN students s ON sa.student_id = s.id
+                WHERE c.department_id = %s
+                ORDER BY e.exam_date, e.start_time, e.id, cl.code, sa.seat_row, sa.seat_col
+            """
+            cursor.execute(query, (self.department_id,))
+            return cursor.fetchall()
+            
+        except Exception as e:
+            print(f"Oturma planları alınırken hata: {e}")
+            return []
+        finally:
+            connection.close()
+    
     def clear_seating_plans(self):
         """Tüm oturma planlarını temizler."""
         connection = get_db_connection()
@@ -259,6 +590,7 @@ class SeatingPlanner:
             """, (self.department_id,))
             
             connection.commit()
+            schedule_changed(self.department_id)
             return True
             
         except Exception as e:
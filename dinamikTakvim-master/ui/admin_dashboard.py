@@ -1,12 +1,18 @@
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QLabel, QVBoxLayout, QHBoxLayout,
                              QTabWidget, QLineEdit, QPushButton, QTableWidget,
                              QTableWidgetItem, QComboBox, QMessageBox, QFormLayout,
-                             QHeaderView, QToolBar, QAction, QSizePolicy)
+                             QHeaderView, QToolBar, QAction, QSizePolicy, QSpinBox)
 from PyQt5.QtGui import QFont
-from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtCore import pyqtSignal, QTimer
 
 # Gerekli veritabanı fonksiyonlarını içe aktar
-from database import get_all_departments, get_all_users, add_new_user
+from database import (get_all_departments, get_all_users, add_new_user,
+                      get_classrooms_page, get_courses_page, get_exams_page,
+                      CLASSROOM_SORT_COLUMNS, COURSE_SORT_COLUMNS, EXAM_SORT_COLUMNS)
+from ui.table_models import QueryTableModel, create_table_view, format_date, format_time
+
+# Arama kutusunda yazma bittikten sonra sorgu göndermeden önce beklenen süre (ms)
+SEARCH_DELAY_MS = 300
 
 
 class AdminDashboard(QMainWindow):
@@ -249,16 +255,16 @@ class AdminDashboard(QMainWindow):
         refresh_button.clicked.connect(self.load_all_classrooms_into_table)
         
         # Derslikler tablosu
-        self.all_classrooms_table = QTableWidget()
-        self.all_classrooms_table.setColumnCount(6)
-        self.all_classrooms_table.setHorizontalHeaderLabels([
-            "ID", "Bölüm", "Kod", "Ad", "Kapasite", "Sıra Yapısı"
-        ])
-        self.all_classrooms_table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.all_classrooms_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.all_classrooms_model = QueryTableModel([
+            ("ID", 'id'), ("Bölüm", 'department_name'), ("Kod", 'code'), ("Ad", 'name'),
+            ("Kapasite", 'capacity'), ("Sıra Yapısı", 'seating_type')
+        ], get_classrooms_page, sortable=CLASSROOM_SORT_COLUMNS, default_sort='department_name')
+        self.all_classrooms_table = create_table_view(self.all_classrooms_model)
+        self.classroom_filters = self.create_filter_bar(self.load_all_classrooms_into_table, with_level=False)
         
         layout.addWidget(title)
         layout.addWidget(refresh_button)
+        layout.addLayout(self.classroom_filters['layout'])
         layout.addWidget(self.all_classrooms_table)
         
         self.classrooms_view_tab.setLayout(layout)
@@ -279,16 +285,16 @@ class AdminDashboard(QMainWindow):
         refresh_button.clicked.connect(self.load_all_courses_into_table)
         
         # Dersler tablosu
-        self.all_courses_table = QTableWidget()
-        self.all_courses_table.setColumnCount(7)
-        self.all_courses_table.setHorizontalHeaderLabels([
-            "ID", "Bölüm", "Kod", "Ad", "Tür", "Sınıf", "Öğretim Üyesi"
-        ])
-        self.all_courses_table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.all_courses_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.all_courses_model = QueryTableModel([
+            ("ID", 'id'), ("Bölüm", 'department_name'), ("Kod", 'code'), ("Ad", 'name'),
+            ("Tür", 'course_type'), ("Sınıf", 'class_level'), ("Öğretim Üyesi", 'instructor_name')
+        ], get_courses_page, sortable=COURSE_SORT_COLUMNS, default_sort='department_name')
+        self.all_courses_table = create_table_view(self.all_courses_model)
+        self.course_filters = self.create_filter_bar(self.load_all_courses_into_table)
         
         layout.addWidget(title)
         layout.addWidget(refresh_button)
+        layout.addLayout(self.course_filters['layout'])
         layout.addWidget(self.all_courses_table)
         
         self.courses_view_tab.setLayout(layout)
@@ -309,16 +315,18 @@ class AdminDashboard(QMainWindow):
         refresh_button.clicked.connect(self.load_all_exams_into_table)
         
         # Sınavlar tablosu
-        self.all_exams_table = QTableWidget()
-        self.all_exams_table.setColumnCount(8)
-        self.all_exams_table.setHorizontalHeaderLabels([
-            "ID", "Bölüm", "Ders Kodu", "Sınav Türü", "Tarih", "Saat", "Öğretim Üyesi", "Derslikler"
-        ])
-        self.all_exams_table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.all_exams_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.all_exams_model = QueryTableModel([
+            ("ID", 'id'), ("Bölüm", 'department_name'), ("Ders Kodu", 'course_code'),
+            ("Sınav Türü", 'exam_type'), ("Tarih", 'exam_date'), ("Saat", 'start_time'),
+            ("Öğretim Üyesi", 'instructor_name'), ("Derslikler", 'classrooms')
+        ], get_exams_page, sortable=EXAM_SORT_COLUMNS, default_sort='exam_date',
+            formatters={4: format_date, 5: format_time, 7: lambda value: value or 'Atanmamış'})
+        self.all_exams_table = create_table_view(self.all_exams_model)
+        self.exam_filters = self.create_filter_bar(self.load_all_exams_into_table)
         
         layout.addWidget(title)
         layout.addWidget(refresh_button)
+        layout.addLayout(self.exam_filters['layout'])
         layout.addWidget(self.all_exams_table)
         
         self.exams_view_tab.setLayout(layout)
@@ -336,118 +344,58 @@ class AdminDashboard(QMainWindow):
             self.departments_table.setItem(row_num, 0, QTableWidgetItem(str(dept['id'])))
             self.departments_table.setItem(row_num, 1, QTableWidgetItem(dept['name']))
 
+    def create_filter_bar(self, reload, with_level=True):
+        """
+        Arama metni, bölüm ve (isteğe bağlı) sınıf filtrelerinden oluşan satırı oluşturur.
+        Filtreler sunucuya gönderilir; arama kutusu yazma bitene kadar bekletilir.
+        """
+        layout = QHBoxLayout()
+        search_edit = QLineEdit()
+        search_edit.setPlaceholderText("Kod, ad veya öğretim üyesi ile ara...")
+        department_combo = QComboBox()
+        department_combo.addItem("Tüm Bölümler", None)
+        for dept in get_all_departments():
+            department_combo.addItem(dept['name'], dept['id'])
+        
+        search_timer = QTimer(self)
+        search_timer.setSingleShot(True)
+        search_timer.setInterval(SEARCH_DELAY_MS)
+        search_timer.timeout.connect(reload)
+        search_edit.textChanged.connect(search_timer.start)
+        department_combo.currentIndexChanged.connect(reload)
+        
+        layout.addWidget(QLabel("Ara:"))
+        layout.addWidget(search_edit, 2)
+        layout.addWidget(QLabel("Bölüm:"))
+        layout.addWidget(department_combo, 1)
+        filters = {'layout': layout, 'search': search_edit, 'department': department_combo, 'level': None}
+        
+        if with_level:
+            level_spin = QSpinBox()
+            level_spin.setRange(0, 8)
+            level_spin.setSpecialValueText("Tümü")
+            level_spin.valueChanged.connect(reload)
+            layout.addWidget(QLabel("Sınıf:"))
+            layout.addWidget(level_spin)
+            filters['level'] = level_spin
+        return filters
+
+    def _filter_values(self, filters):
+        """Filtre satırındaki değerleri sayfa sorgusu argümanlarına çevirir."""
+        values = {'search': filters['search'].text().strip(),
+                  'department_id': filters['department'].currentData()}
+        if filters['level'] is not None:
+            values['class_level'] = filters['level'].value() or None
+        return values
+
     def load_all_classrooms_into_table(self):
-        """Tüm derslikleri tabloya yükler."""
-        from database import get_db_connection
-        
-        self.all_classrooms_table.setRowCount(0)
-        connection = get_db_connection()
-        if not connection:
-            return
-        
-        try:
-            cursor = connection.cursor(dictionary=True)
-            query = """
-                SELECT cl.id, d.name as department_name, cl.code, cl.name, 
-                       cl.capacity, cl.seating_type
-                FROM classrooms cl
-                JOIN departments d ON cl.department_id = d.id
-                ORDER BY d.name, cl.code
-            """
-            cursor.execute(query)
-            classrooms = cursor.fetchall()
-            
-            for row_num, classroom in enumerate(classrooms):
-                self.all_classrooms_table.insertRow(row_num)
-                self.all_classrooms_table.setItem(row_num, 0, QTableWidgetItem(str(classroom['id'])))
-                self.all_classrooms_table.setItem(row_num, 1, QTableWidgetItem(classroom['department_name']))
-                self.all_classrooms_table.setItem(row_num, 2, QTableWidgetItem(classroom['code']))
-                self.all_classrooms_table.setItem(row_num, 3, QTableWidgetItem(classroom['name']))
-                self.all_classrooms_table.setItem(row_num, 4, QTableWidgetItem(str(classroom['capacity'])))
-                self.all_classrooms_table.setItem(row_num, 5, QTableWidgetItem(str(classroom['seating_type'])))
-                
-        except Exception as e:
-            print(f"Derslikler yüklenirken hata: {e}")
-        finally:
-            connection.close()
+        """Derslikleri filtrelere göre sunucudan sayfa sayfa yükler (ilk sayfa)."""
+        self.all_classrooms_model.reload(self._filter_values(self.classroom_filters))
 
     def load_all_courses_into_table(self):
-        """Tüm dersleri tabloya yükler."""
-        from database import get_db_connection
-        
-        self.all_courses_table.setRowCount(0)
-        connection = get_db_connection()
-        if not connection:
-            return
-        
-        try:
-            cursor = connection.cursor(dictionary=True)
-            query = """
-                SELECT c.id, d.name as department_name, c.code, c.name, 
-                       c.course_type, c.class_level, i.full_name as instructor_name
-                FROM courses c
-                JOIN departments d ON c.department_id = d.id
-                JOIN instructors i ON c.instructor_id = i.id
-                ORDER BY d.name, c.code
-            """
-            cursor.execute(query)
-            courses = cursor.fetchall()
-            
-            for row_num, course in enumerate(courses):
-                self.all_courses_table.insertRow(row_num)
-                self.all_courses_table.setItem(row_num, 0, QTableWidgetItem(str(course['id'])))
-                self.all_courses_table.setItem(row_num, 1, QTableWidgetItem(course['department_name']))
-                self.all_courses_table.setItem(row_num, 2, QTableWidgetItem(course['code']))
-                self.all_courses_table.setItem(row_num, 3, QTableWidgetItem(course['name']))
-                self.all_courses_table.setItem(row_num, 4, QTableWidgetItem(course['course_type']))
-                self.all_courses_table.setItem(row_num, 5, QTableWidgetItem(str(course['class_level'])))
-                self.all_courses_table.setItem(row_num, 6, QTableWidgetItem(course['instructor_name']))
-                
-        except Exception as e:
-            print(f"Dersler yüklenirken hata: {e}")
-        finally:
-            connection.close()
+        """Dersleri filtrelere göre sunucudan sayfa sayfa yükler (ilk sayfa)."""
+        self.all_courses_model.reload(self._filter_values(self.course_filters))
 
     def load_all_exams_into_table(self):
-        """Tüm sınavları tabloya yükler."""
-        from database import get_db_connection
-        
-        self.all_exams_table.setRowCount(0)
-        connection = get_db_connection()
-        if not connection:
-            return
-        
-        try:
-            cursor = connection.cursor(dictionary=True)
-            query = """
-                SELECT e.id, d.name as department_name, c.code as course_code,
-                       e.exam_type, e.exam_date, e.start_time, i.full_name as instructor_name,
-                       GROUP_CONCAT(cl.code SEPARATOR ', ') as classrooms
-                FROM exams e
-                JOIN courses c ON e.course_id = c.id
-                JOIN departments d ON c.department_id = d.id
-                JOIN instructors i ON c.instructor_id = i.id
-                LEFT JOIN exam_assignments ea ON e.id = ea.exam_id
-                LEFT JOIN classrooms cl ON ea.classroom_id = cl.id
-                GROUP BY e.id, d.name, c.code, e.exam_type, e.exam_date, e.start_time, i.full_name
-                ORDER BY e.exam_date, e.start_time
-            """
-            cursor.execute(query)
-            exams = cursor.fetchall()
-            
-            for row_num, exam in enumerate(exams):
-                self.all_exams_table.insertRow(row_num)
-                self.all_exams_table.setItem(row_num, 0, QTableWidgetItem(str(exam['id'])))
-                self.all_exams_table.setItem(row_num, 1, QTableWidgetItem(exam['department_name']))
-                self.all_exams_table.setItem(row_num, 2, QTableWidgetItem(exam['course_code']))
-                self.all_exams_table.setItem(row_num, 3, QTableWidgetItem(exam['exam_type']))
-                self.all_exams_table.setItem(row_num, 4, QTableWidgetItem(exam['exam_date'].strftime('%d.%m.%Y')))
-                self.all_exams_table.setItem(row_num, 5, QTableWidgetItem(exam['start_time'].strftime('%H:%M')))
-                self.all_exams_table.setItem(row_num, 6, QTableWidgetItem(exam['instructor_name']))
-                self.all_exams_table.setItem(row_num, 7, QTableWidgetItem(exam['classrooms'] or 'Atanmamış'))
-                
-        except Exception as e:
-            print(f"Sınavlar yüklenirken hata: {e}")
-        finally:
-            connection.close()
-
+        """Sınavları filtrelere göre sunucudan sayfa sayfa yükler (ilk sayfa)."""
+        self.all_exams_model.reload(self._filter_values(self.exam_filters))
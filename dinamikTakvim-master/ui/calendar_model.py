@@ -0,0 +1,78 @@
+# ui/calendar_model.py
+# Takvim görünümü için sınavları (ISO hafta, gün, saat dilimi) kovalarına ayıran önbellekli model.
+
+from bisect import bisect_right
+from datetime import timedelta
+
+# Takvimin saat dilimleri: (başlangıç dakikası, etiket); her dilim bir sonrakinin başına kadar sürer
+SLOT_LENGTH_MINUTES = 120
+TIME_SLOTS = [(9 * 60, "09:00-11:00"), (11 * 60, "11:00-13:00"),
+              (13 * 60, "13:00-15:00"), (15 * 60, "15:00-17:00")]
+DAY_NAMES = ["Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"]
+
+_SLOT_STARTS = [start for start, _ in TIME_SLOTS]
+
+
+def _minutes(time_value):
+    """TIME alanını (timedelta veya time) gün içindeki dakikaya çevirir."""
+    if isinstance(time_value, timedelta):
+        return (int(time_value.total_seconds()) // 60) % (24 * 60)
+    if hasattr(time_value, 'hour'):
+        return time_value.hour * 60 + time_value.minute
+    return None
+
+
+def slot_index(time_value):
+    """Başlangıç saatinin düştüğü dilimin sırası; takvim dışında kalıyorsa None."""
+    minutes = _minutes(time_value)
+    if minutes is None:
+        return None
+    slot = bisect_right(_SLOT_STARTS, minutes) - 1
+    if slot < 0 or minutes >= _SLOT_STARTS[slot] + SLOT_LENGTH_MINUTES:
+        return None
+    return slot
+
+
+def week_start(day):
+    """Günün içinde bulunduğu haftanın pazartesisi."""
+    return day - timedelta(days=day.weekday())
+
+
+class CalendarWeekModel:
+    """
+    Sınavları bir kez (ISO yıl, ISO hafta, gün, dilim) anahtarlı kovalara ayırır ve hücre
+    metinlerini hazır tutar. Hafta değiştirmek yalnızca 7 x dilim sayısı kadar sözlük okumasıdır;
+    program değişene kadar (set_exams / invalidate) veritabanına gidilmez.
+
+    load_exams: önbellek boşken sınav satırlarını getiren fonksiyon
+    """
+
+    def __init__(self, load_exams):
+        self.load_exams = load_exams
+        self._cells = None
+
+    def set_exams(self, exams):
+        """Kovaları verilen sınav satırlarından yeniden oluşturur."""
+        cells = {}
+        for exam in exams:
+            slot = slot_index(exam['start_time'])
+            if slot is None or not hasattr(exam['exam_date'], 'isocalendar'):
+                continue
+            iso_year, iso_week, iso_day = exam['exam_date'].isocalendar()
+            cells.setdefault((iso_year, iso_week, iso_day - 1, slot), []).append(
+                f"📚 {exam['course_code']}\n📝 {exam['exam_type']}\n👤 {exam['instructor_name']}")
+        self._cells = {key: '\n'.join(lines) for key, lines in cells.items()}
+
+    def invalidate(self):
+        """Program değiştiğinde çağrılır; sonraki istekte sınavlar yeniden yüklenir."""
+        self._cells = None
+
+    def week(self, start):
+        """
+        start haftasının hücre metinlerini [dilim][gün] listesi olarak döndürür (boş hücre: '').
+        """
+        if self._cells is None:
+            self.set_exams(self.load_exams())
+        iso_year, iso_week, _ = start.isocalendar()
+        return [[self._cells.get((iso_year, iso_week, day, slot), '') for day in range(len(DAY_NAMES))]
+                for slot in range(len(TIME_SLOTS))]
@@ -4,38 +4,129 @@
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QLabel, QVBoxLayout, QHBoxLayout,
                              QTabWidget, QLineEdit, QPushButton, QTableWidget,
                              QTableWidgetItem, QComboBox, QMessageBox, QFormLayout,
-                             QHeaderView, QSpinBox, QDialog, QGridLayout, QFileDialog,
-                             QProgressBar, QTextEdit, QDateEdit, QCheckBox, QToolBar, QAction)
+                             QHeaderView, QSpinBox, QDialog, QFileDialog,
+                             QProgressBar, QTextEdit, QDateEdit, QCheckBox, QToolBar, QAction,
+                             QListWidget, QListWidgetItem)
 from PyQt5.QtGui import QFont, QColor, QIcon
-from PyQt5.QtCore import Qt, QDate, QObject, QThread, pyqtSignal
+from PyQt5.QtCore import Qt, QDate, QObject, QThread, QTimer, pyqtSignal
 from datetime import datetime, timedelta
+import threading
+import time
 # import pandas as pd  # Geçici olarak devre dışı
 
 # Gerekli veritabanı fonksiyonlarını içe aktar
 from database import (get_classrooms_by_department, add_classroom,
-                      update_classroom, delete_classroom, get_classroom_details, get_db_connection, sanitize_courses)
-from excel_processor import process_courses_excel, process_students_excel
+                      update_classroom, delete_classroom, get_classroom_details, sanitize_courses)
+from import_orchestrator import run_import_batch
+from ui.table_models import (RowTableModel, create_table_view, create_filter_edit,
+                             source_row, format_date, format_time)
+from ui.seat_map import SeatMapScene, SeatMapView
+from ui.calendar_model import CalendarWeekModel, TIME_SLOTS, DAY_NAMES, week_start
+from search_index import SearchIndex
+from classroom_occupancy import get_occupancy, schedule_changed
+
+# Aktarım dosyası seçim filtresi (biçim uzantıdan belirlenir)
+IMPORT_FILE_FILTER = ("Liste Dosyaları (*.xlsx *.xls *.csv *.parquet *.arrow *.feather);;"
+                      "Excel Dosyaları (*.xlsx *.xls);;CSV Dosyaları (*.csv);;"
+                      "Parquet/Arrow Dosyaları (*.parquet *.arrow *.feather)")
+# Arama kutularında son tuştan sonra aramanın başlaması için beklenen süre (ms)
+SEARCH_DEBOUNCE_MS = 150
+# Öğrenci aramasında listelenen en fazla sonuç
+STUDENT_MATCH_LIMIT = 50
+# Birden fazla dosya seçildiğinde giriş alanında kullanılan ayırıcı
+IMPORT_PATH_SEPARATOR = "; "
+# Arka plan işlerinin ilerleme çubuğunda gösterilen aşama adları
+TASK_PHASE_LABELS = {
+    'load': "Ders kayıtları yükleniyor",
+    'schedule': "Sınavlar zamanlanıyor",
+    'save': "Yeni program kaydediliyor",
+    'seating': "Oturma planları oluşturuluyor",
+    'export': "Satırlar okunuyor",
+    'render': "PDF parçaları çiziliyor"
+}
 
 
 class ExcelWorker(QObject):
     finished = pyqtSignal(dict)
     error = pyqtSignal(str)
+    progress = pyqtSignal(dict)
 
-    def __init__(self, mode, file_path, department_id=None):
+    def __init__(self, mode, file_paths, department_id=None, delta=False, delete_missing=False):
         super().__init__()
         self.mode = mode  # 'courses' or 'students'
-        self.file_path = file_path
+        self.file_paths = [file_paths] if isinstance(file_paths, str) else list(file_paths)
         self.department_id = department_id
+        self.delta = delta  # Öğrenci listesinde yalnızca farkları uygula
+        self.delete_missing = delete_missing  # Fark modunda listede olmayan kayıtları sil
 
     def run(self):
         try:
-            if self.mode == 'courses':
-                results = process_courses_excel(self.file_path, self.department_id)
-            else:
-                results = process_students_excel(self.file_path)
-            self.finished.emit(results)
+            jobs = [{'mode': self.mode, 'file_path': path, 'department_id': self.department_id}
+                    for path in self.file_paths]
+            batch = run_import_batch(jobs, self.progress.emit, delta=self.delta,
+                                     delete_missing=self.delete_missing)
+            self.finished.emit(self._summarize(batch))
         except Exception as e:
             self.error.emit(str(e))
+
+    @staticmethod
+    def _summarize(batch):
+        """Dosya bazlı sonuçları panelde gösterilecek tek sonuç sözlüğünde birleştirir."""
+        files = batch['files']
+        results = {
+            'success': sum(f['success'] for f in files),
+            'enrollments': sum(f.get('enrollments', 0) for f in files),
+            'errors': batch['errors'],
+            'warnings': batch['warnings'],
+            'timings': batch['timings']
+        }
+        caches = [f['cache'] for f in files if 'cache' in f]
+        if caches:
+            results['cache'] = {
+                'hit': all(c['hit'] for c in caches),
+                'total_rows': sum(c['total_rows'] for c in caches),
+                'changed_rows': sum(c['changed_rows'] for c in caches)
+            }
+        deltas = [f['delta'] for f in files if 'delta' in f]
+        if deltas:
+            results['delta'] = {
+                'added': [pair for d in deltas for pair in d['added']],
+                'removed': [pair for d in deltas for pair in d['removed']]
+            }
+        return results
+
+
+class TaskWorker(QObject):
+    """
+    Zamanlama, oturma planı, temizleme ve dışa aktarma gibi uzun işleri arka planda çalıştırır.
+    İş fonksiyonu progress_callback ve cancel_event anahtar argümanlarıyla çağrılır; ilerleme
+    sözlüklerine başlangıçtan bu yana geçen süre ('elapsed', saniye) eklenerek yayınlanır.
+    """
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+    progress = pyqtSignal(dict)
+
+    def __init__(self, task):
+        super().__init__()
+        self.task = task
+        self.cancel_event = threading.Event()
+        self.started = None
+
+    def cancel(self):
+        """İşin bir sonraki kontrol noktasında durmasını ister (ana iş parçacığından çağrılır)."""
+        self.cancel_event.set()
+
+    def report(self, info):
+        self.progress.emit(dict(info, elapsed=time.perf_counter() - self.started))
+
+    def run(self):
+        self.started = time.perf_counter()
+        try:
+            self.finished.emit(self.task(progress_callback=self.report, cancel_event=self.cancel_event))
+        except Exception as e:
+            self.error.emit(str(e))
+
+
 from exam_scheduler import ExamScheduler
 from seating_planner import SeatingPlanner
 from export_manager import ExportManager
@@ -53,6 +144,11 @@ class CoordinatorDashboard(QMainWindow):
         self.department_id = self.user_data['department_id']
         # Seçili olan dersliğin ID'sini tutmak için
         self.selected_classroom_id = None
+        # Arka planda çalışan işler: ad -> (thread, worker, ilerleme çubuğu, düğmeler, iptal düğmesi)
+        self.running_tasks = {}
+        # Takvim görünümünün hafta kovaları; program değişince yenilenir
+        self.calendar_model = CalendarWeekModel(
+            lambda: ExamScheduler(self.department_id).get_scheduled_exams())
 
         self.setWindowTitle(f"Bölüm Koordinatör Paneli - {self.user_data.get('department_name', '')}")
         self.setGeometry(200, 200, 1100, 700)
@@ -296,6 +392,16 @@ class CoordinatorDashboard(QMainWindow):
         self.student_upload_button = QPushButton("Öğrencileri Yükle")
         self.student_upload_button.clicked.connect(self.handle_student_upload)
         
+        # Fark modu: seçilen listeler birlikte mevcut kayıtlarla karşılaştırılır, oturma planları onarılır
+        self.student_delta_checkbox = QCheckBox("Yalnızca değişiklikleri uygula")
+        self.student_delta_checkbox.setToolTip(
+            "Seçilen listeler birlikte mevcut ders kayıtlarıyla karşılaştırılır; eklenen (ve "
+            "silinen) kayıtlar oturma planlarına artımlı olarak yansıtılır.")
+        # Silme ayrıca seçilir: yalnızca listelerdeki öğrencilerin listede olmayan kayıtları silinir
+        self.student_delete_checkbox = QCheckBox("Listelerdeki öğrencilerin listede olmayan ders kayıtlarını sil")
+        self.student_delete_checkbox.setEnabled(False)
+        self.student_delta_checkbox.toggled.connect(self.student_delete_checkbox.setEnabled)
+
         # İlerleme çubuğu
         self.student_progress = QProgressBar()
         self.student_progress.setVisible(False)
@@ -307,6 +413,8 @@ class CoordinatorDashboard(QMainWindow):
         
         layout.addWidget(title)
         layout.addLayout(file_layout)
+        layout.addWidget(self.student_delta_checkbox)
+        layout.addWidget(self.student_delete_checkbox)
         layout.addWidget(self.student_upload_button)
         layout.addWidget(self.student_progress)
         layout.addWidget(QLabel("İşlem Sonuçları:"))
@@ -326,12 +434,26 @@ class CoordinatorDashboard(QMainWindow):
         
         # Arama alanı
         search_layout = QHBoxLayout()
-        search_label = QLabel("Öğrenci No:")
+        search_label = QLabel("Öğrenci No / Ad:")
         self.student_search_input = QLineEdit()
-        self.student_search_input.setPlaceholderText("Öğrenci numarası girin...")
+        self.student_search_input.setPlaceholderText("Öğrenci numarası veya adı girin...")
+        self.student_search_input.returnPressed.connect(self.handle_student_search)
         self.student_search_button = QPushButton("Ara")
         self.student_search_button.clicked.connect(self.handle_student_search)
         
+        # Yazarken eşleşen öğrenciler (bellek içi indeksten, son tuştan kısa süre sonra)
+        self.student_index = None
+        self.student_index_rows = []
+        self.student_search_timer = QTimer(self)
+        self.student_search_timer.setSingleShot(True)
+        self.student_search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.student_search_timer.timeout.connect(self.update_student_matches)
+        self.student_search_input.textChanged.connect(self.student_search_timer.start)
+        self.student_matches_list = QListWidget()
+        self.student_matches_list.setMaximumHeight(120)
+        self.student_matches_list.setVisible(False)
+        self.student_matches_list.itemClicked.connect(self.handle_student_match_selected)
+        
         search_layout.addWidget(search_label)
         search_layout.addWidget(self.student_search_input)
         search_layout.addWidget(self.student_search_button)
@@ -355,6 +477,7 @@ class CoordinatorDashboard(QMainWindow):
         
         layout.addWidget(title)
         layout.addLayout(search_layout)
+        layout.addWidget(self.student_matches_list)
         layout.addWidget(QLabel("Öğrenci Bilgileri:"))
         layout.addWidget(self.student_info_text)
         layout.addWidget(courses_label)
@@ -376,15 +499,12 @@ class CoordinatorDashboard(QMainWindow):
         courses_label = QLabel("Dersler:")
         courses_label.setFont(QFont("Arial", 11, QFont.Bold))
         
-        self.courses_list_table = QTableWidget()
-        self.courses_list_table.setColumnCount(5)
-        self.courses_list_table.setHorizontalHeaderLabels([
-            "Ders Kodu", "Ders Adı", "Tür", "Sınıf", "Öğretim Üyesi"
+        self.courses_list_model = RowTableModel([
+            ("Ders Kodu", 'code'), ("Ders Adı", 'name'), ("Tür", 'course_type'),
+            ("Sınıf", 'class_level'), ("Öğretim Üyesi", 'instructor_name')
         ])
-        self.courses_list_table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.courses_list_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.courses_list_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.courses_list_table.cellClicked.connect(self.handle_course_selection)
+        self.courses_list_table = create_table_view(self.courses_list_model)
+        self.courses_list_table.clicked.connect(self.handle_course_selection)
         
         # Seçili derse kayıtlı öğrenciler
         students_label = QLabel("Seçili Derse Kayıtlı Öğrenciler:")
@@ -409,24 +529,72 @@ class CoordinatorDashboard(QMainWindow):
         # Dersleri yükle
         self.load_courses_list()
 
+    def get_student_index(self):
+        """Öğrenci arama indeksini ilk kullanımda oluşturur (öğrenci yüklemesinden sonra yenilenir)."""
+        if self.student_index is None:
+            from database import get_all_students
+            self.student_index_rows = get_all_students()
+            self.student_index = SearchIndex.build(self.student_index_rows, ('student_no', 'full_name'))
+        return self.student_index
+
+    def update_student_matches(self):
+        """Yazılan metinle eşleşen öğrencileri (numara veya ad) listeler."""
+        text = self.student_search_input.text().strip()
+        self.student_matches_list.clear()
+        if not text:
+            self.student_matches_list.setVisible(False)
+            return
+        
+        for number in self.get_student_index().search(text, limit=STUDENT_MATCH_LIMIT):
+            student = self.student_index_rows[number]
+            item = QListWidgetItem(f"{student['student_no']} - {student['full_name']} ({student['class_level']}. sınıf)")
+            item.setData(Qt.UserRole, student['student_no'])
+            self.student_matches_list.addItem(item)
+        self.student_matches_list.setVisible(self.student_matches_list.count() > 0)
+
+    def handle_student_match_selected(self, item):
+        """Listeden seçilen öğrencinin bilgilerini gösterir."""
+        from database import get_student_by_no
+        self.show_student(get_student_by_no(item.data(Qt.UserRole)))
+
     def handle_student_search(self):
         """Öğrenci arama işlemini gerçekleştirir."""
-        from database import get_student_by_no, get_student_courses
+        from database import get_student_by_no
         
-        student_no = self.student_search_input.text().strip()
-        if not student_no:
-            QMessageBox.warning(self, "Eksik Bilgi", "Lütfen bir öğrenci numarası girin.")
+        text = self.student_search_input.text().strip()
+        if not text:
+            QMessageBox.warning(self, "Eksik Bilgi", "Lütfen bir öğrenci numarası veya adı girin.")
             return
         
-        # Öğrenci bilgilerini al
-        student = get_student_by_no(student_no)
+        # Önce numarayla tam eşleşme, yoksa indekste ad/numara parçası aranır
+        student = get_student_by_no(text)
+        if not student:
+            matches = self.get_student_index().search(text, limit=2)
+            if len(matches) > 1:
+                self.student_search_timer.stop()
+                self.update_student_matches()
+                QMessageBox.information(self, "Birden Fazla Sonuç",
+                    f"'{text}' ile eşleşen birden fazla öğrenci var, lütfen listeden seçin.")
+                return
+            if matches:
+                student = get_student_by_no(self.student_index_rows[matches[0]]['student_no'])
+        
         if not student:
             QMessageBox.information(self, "Bulunamadı", 
-                f"'{student_no}' numaralı öğrenci bulunamadı.")
+                f"'{text}' ile eşleşen öğrenci bulunamadı.")
             self.student_info_text.clear()
             self.student_courses_table.setRowCount(0)
             return
+        self.show_student(student)
+
+    def show_student(self, student):
+        """Öğrencinin bilgilerini ve aldığı dersleri gösterir."""
+        from database import get_student_courses
         
+        if not student:
+            return
+        student_no = student['student_no']
+
         # Öğrenci bilgilerini göster
         info_text = f"Öğrenci No: {student['student_no']}\n"
         info_text += f"Ad Soyad: {student['full_name']}\n"
@@ -451,25 +619,15 @@ class CoordinatorDashboard(QMainWindow):
         """Bölüme ait tüm dersleri yükler."""
         from database import get_all_courses_by_department
         
-        courses = get_all_courses_by_department(self.department_id)
-        self.courses_list_table.setRowCount(len(courses))
-        
-        for row_num, course in enumerate(courses):
-            self.courses_list_table.setItem(row_num, 0, QTableWidgetItem(course['code']))
-            self.courses_list_table.setItem(row_num, 1, QTableWidgetItem(course['name']))
-            self.courses_list_table.setItem(row_num, 2, QTableWidgetItem(course['course_type']))
-            self.courses_list_table.setItem(row_num, 3, QTableWidgetItem(str(course['class_level'])))
-            self.courses_list_table.setItem(row_num, 4, QTableWidgetItem(course['instructor_name']))
-            
-            # Course ID'yi saklı tut (hidden olarak)
-            self.courses_list_table.item(row_num, 0).setData(Qt.UserRole, course['id'])
+        # Ders satırları (ID dahil) modelde tutulur; hücreler görünürken biçimlendirilir
+        self.courses_list_model.set_rows(get_all_courses_by_department(self.department_id))
 
-    def handle_course_selection(self, row, column):
+    def handle_course_selection(self, index):
         """Ders seçildiğinde o derse kayıtlı öğrencileri gösterir."""
         from database import get_course_students
         
-        # Seçili dersin ID'sini al
-        course_id = self.courses_list_table.item(row, 0).data(Qt.UserRole)
+        # Seçili dersin ID'sini al (görünüm sıralı/süzülmüş olabilir)
+        course_id = source_row(self.courses_list_table, index)['id']
         
         # Derse kayıtlı öğrencileri al
         students = get_course_students(course_id)
@@ -571,8 +729,12 @@ class CoordinatorDashboard(QMainWindow):
         course_search_layout = QHBoxLayout()
         course_search_layout.addWidget(QLabel("Ara:"))
         self.course_search_filter = QLineEdit()
-        self.course_search_filter.setPlaceholderText("Ders kodu veya adı ile ara...")
-        self.course_search_filter.textChanged.connect(self.filter_courses_for_scheduling)
+        self.course_search_filter.setPlaceholderText("Ders kodu, adı veya öğretim üyesi ile ara...")
+        self.course_search_timer = QTimer(self)
+        self.course_search_timer.setSingleShot(True)
+        self.course_search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.course_search_timer.timeout.connect(self.filter_courses_for_scheduling)
+        self.course_search_filter.textChanged.connect(self.course_search_timer.start)
         course_search_layout.addWidget(self.course_search_filter)
         
         select_all_btn = QPushButton("Tümünü Seç")
@@ -606,9 +768,13 @@ class CoordinatorDashboard(QMainWindow):
         self.sanitize_courses_button.clicked.connect(self.handle_sanitize_courses)
         self.clear_schedule_button = QPushButton("Mevcut Programı Temizle")
         self.clear_schedule_button.clicked.connect(self.handle_clear_schedule)
+        self.cancel_schedule_button = QPushButton("İptal")
+        self.cancel_schedule_button.setVisible(False)
+        self.cancel_schedule_button.clicked.connect(lambda: self.cancel_task('schedule'))
         button_layout.addWidget(self.generate_schedule_button)
         button_layout.addWidget(self.sanitize_courses_button)
         button_layout.addWidget(self.clear_schedule_button)
+        button_layout.addWidget(self.cancel_schedule_button)
         
         info_label = QLabel("💡 İpucu: Kısıtları ayarlayıp 'Sınav Programı Oluştur' butonuna tıklayın")
         info_label.setStyleSheet("color: #0066cc; font-style: italic;")
@@ -618,13 +784,12 @@ class CoordinatorDashboard(QMainWindow):
         self.schedule_progress.setVisible(False)
         
         # Sınav programı tablosu
-        self.exams_table = QTableWidget()
-        self.exams_table.setColumnCount(7)
-        self.exams_table.setHorizontalHeaderLabels([
-            "Sınav Türü", "Ders Kodu", "Ders Adı", "Sınıf", "Tarih", "Saat", "Öğretim Üyesi"
-        ])
-        self.exams_table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.exams_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.exams_model = RowTableModel([
+            ("Sınav Türü", 'exam_type'), ("Ders Kodu", 'course_code'), ("Ders Adı", 'course_name'),
+            ("Sınıf", 'class_level'), ("Tarih", 'exam_date'), ("Saat", 'start_time'),
+            ("Öğretim Üyesi", 'instructor_name')
+        ], formatters={4: format_date, 5: format_time})
+        self.exams_table = create_table_view(self.exams_model)
         
         layout.addWidget(title)
         layout.addLayout(date_layout)
@@ -649,6 +814,9 @@ class CoordinatorDashboard(QMainWindow):
         from database import get_all_courses_by_department
         
         courses = get_all_courses_by_department(self.department_id)
+        # Arama indeksinin kayıt numaraları tablo satırlarıyla aynıdır
+        self.scheduling_course_index = SearchIndex.build(
+            courses, ('code', 'name', 'course_type', 'instructor_name'))
         self.scheduling_courses_table.setRowCount(len(courses))
         
         for row_num, course in enumerate(courses):
@@ -673,22 +841,18 @@ class CoordinatorDashboard(QMainWindow):
             
             # Course ID'yi saklı tut
             self.scheduling_courses_table.item(row_num, 1).setData(Qt.UserRole, course['id'])
+        
+        # Yeniden yüklenen listeye mevcut arama uygulanır
+        self.filter_courses_for_scheduling()
 
-    def filter_courses_for_scheduling(self, text):
-        """Ders listesini filtreler."""
-        for row in range(self.scheduling_courses_table.rowCount()):
-            code_item = self.scheduling_courses_table.item(row, 1)
-            name_item = self.scheduling_courses_table.item(row, 2)
-            
-            if code_item and name_item:
-                code = code_item.text()
-                name = name_item.text()
-                
-                # Arama metnini içeriyorsa göster
-                if text.lower() in code.lower() or text.lower() in name.lower():
-                    self.scheduling_courses_table.setRowHidden(row, False)
-                else:
-                    self.scheduling_courses_table.setRowHidden(row, True)
+    def filter_courses_for_scheduling(self):
+        """Ders listesini arama indeksine göre filtreler; yalnızca görünürlüğü değişen satırlar güncellenir."""
+        table = self.scheduling_courses_table
+        visible = set(self.scheduling_course_index.search(self.course_search_filter.text()))
+        for row in range(table.rowCount()):
+            hidden = row not in visible
+            if table.isRowHidden(row) != hidden:
+                table.setRowHidden(row, hidden)
 
     def select_all_courses(self):
         """Tüm dersleri seçer."""
@@ -792,28 +956,29 @@ class CoordinatorDashboard(QMainWindow):
             'course_durations': course_durations
         }
         
-        self.schedule_progress.setVisible(True)
-        self.schedule_progress.setRange(0, 0)
-        self.generate_schedule_button.setEnabled(False)
-        
-        try:
-            scheduler = ExamScheduler(self.department_id)
-            result = scheduler.generate_exam_schedule(start_date, end_date, exam_types, constraints)
-            
-            if result['success']:
-                message = result['message']
-                if result.get('warnings'):
-                    message += "\n\n⚠️ Uyarılar:\n" + "\n".join(result['warnings'][:5])
-                QMessageBox.information(self, "Başarılı", message)
-                self.load_scheduled_exams()
-            else:
-                QMessageBox.critical(self, "Hata", result['message'])
-                
-        except Exception as e:
-            QMessageBox.critical(self, "Hata", f"Sınav programı oluşturulurken hata: {str(e)}")
-        finally:
-            self.schedule_progress.setVisible(False)
-            self.generate_schedule_button.setEnabled(True)
+        scheduler = ExamScheduler(self.department_id)
+        self.start_task('schedule',
+                        lambda **hooks: scheduler.generate_exam_schedule(
+                            start_date, end_date, exam_types, constraints, **hooks),
+                        self.on_schedule_finished, self.schedule_progress,
+                        self._schedule_buttons(), self.cancel_schedule_button)
+
+    def on_schedule_finished(self, result):
+        """Arka planda oluşturulan sınav programının sonucunu gösterir."""
+        message = result['message']
+        if result.get('warnings'):
+            message += "\n\n⚠️ Uyarılar:\n" + "\n".join(result['warnings'][:5])
+        if result['success']:
+            QMessageBox.information(self, "Başarılı", message)
+        elif result.get('cancelled'):
+            QMessageBox.information(self, "İptal Edildi", message)
+        else:
+            QMessageBox.critical(self, "Hata", result['message'])
+        if result['success'] or result.get('cancelled'):
+            self.load_scheduled_exams()
+
+    def _schedule_buttons(self):
+        return [self.generate_schedule_button, self.sanitize_courses_button, self.clear_schedule_button]
 
     def handle_sanitize_courses(self):
         ok, msg = sanitize_courses(self.department_id)
@@ -829,33 +994,26 @@ class CoordinatorDashboard(QMainWindow):
                                    QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
         
         if reply == QMessageBox.Yes:
-            try:
-                scheduler = ExamScheduler(self.department_id)
-                if scheduler.clear_existing_exams():
-                    QMessageBox.information(self, "Başarılı", "Sınav programı temizlendi.")
-                    self.load_scheduled_exams()
-                else:
-                    QMessageBox.critical(self, "Hata", "Sınav programı temizlenirken hata oluştu.")
-            except Exception as e:
-                QMessageBox.critical(self, "Hata", f"Temizleme işlemi sırasında hata: {str(e)}")
+            scheduler = ExamScheduler(self.department_id)
+            self.start_task('schedule', lambda **hooks: scheduler.clear_existing_exams(),
+                            self.on_schedule_cleared, self.schedule_progress, self._schedule_buttons())
+
+    def on_schedule_cleared(self, cleared):
+        if cleared:
+            QMessageBox.information(self, "Başarılı", "Sınav programı temizlendi.")
+            self.load_scheduled_exams()
+        else:
+            QMessageBox.critical(self, "Hata", "Sınav programı temizlenirken hata oluştu.")
 
     def load_scheduled_exams(self):
         """Zamanlanmış sınavları tabloya yükler."""
         try:
             scheduler = ExamScheduler(self.department_id)
             exams = scheduler.get_scheduled_exams()
+            self.exams_model.set_rows(exams)
+            # Aynı satırlarla takvim kovaları da güncellenir (ek sorgu yok)
+            self.calendar_model.set_exams(exams)
             
-            self.exams_table.setRowCount(len(exams))
-            
-            for row_num, exam in enumerate(exams):
-                self.exams_table.setItem(row_num, 0, QTableWidgetItem(exam['exam_type']))
-                self.exams_table.setItem(row_num, 1, QTableWidgetItem(exam['course_code']))
-                self.exams_table.setItem(row_num, 2, QTableWidgetItem(exam['course_name']))
-                self.exams_table.setItem(row_num, 3, QTableWidgetItem(str(exam['class_level'])))
-                self.exams_table.setItem(row_num, 4, QTableWidgetItem(exam['exam_date'].strftime('%d.%m.%Y')))
-                self.exams_table.setItem(row_num, 5, QTableWidgetItem(self._format_time(exam['start_time'])))
-                self.exams_table.setItem(row_num, 6, QTableWidgetItem(exam['instructor_name']))
-                
         except Exception as e:
             print(f"Sınavlar yüklenirken hata: {e}")
 
@@ -877,9 +1035,18 @@ class CoordinatorDashboard(QMainWindow):
         self.clear_seating_button.clicked.connect(self.handle_clear_seating)
         self.view_seating_button = QPushButton("Oturma Planını Görüntüle")
         self.view_seating_button.clicked.connect(self.handle_view_seating)
+        self.cancel_seating_button = QPushButton("İptal")
+        self.cancel_seating_button.setVisible(False)
+        self.cancel_seating_button.clicked.connect(lambda: self.cancel_task('seating'))
         button_layout.addWidget(self.generate_seating_button)
         button_layout.addWidget(self.clear_seating_button)
         button_layout.addWidget(self.view_seating_button)
+        button_layout.addWidget(self.cancel_seating_button)
+        
+        # Kapasite yetersizse boş derslik ekleme seçeneği
+        self.auto_allocate_checkbox = QCheckBox("Kapasite yetersizse aynı saatte boş derslik ekle")
+        self.auto_allocate_checkbox.setToolTip(
+            "Kayıtlı öğrenci sayısı atanan derslik kapasitesini aşan sınavlara otomatik derslik ekler")
         
         # İlerleme çubuğu
         self.seating_progress = QProgressBar()
@@ -891,52 +1058,68 @@ class CoordinatorDashboard(QMainWindow):
         self.seating_result_text.setReadOnly(True)
         
         # Oturma planı tablosu
-        self.seating_table = QTableWidget()
-        self.seating_table.setColumnCount(6)
-        self.seating_table.setHorizontalHeaderLabels([
-            "Sınav", "Derslik", "Sıra", "Sütun", "Öğrenci No", "Ad Soyad"
+        # Satırlar (sınav, derslik, sıra, sütun, öğrenci no, ad soyad) demetleridir
+        self.seating_model = RowTableModel([
+            ("Sınav", 0), ("Derslik", 1), ("Sıra", 2), ("Sütun", 3), ("Öğrenci No", 4), ("Ad Soyad", 5)
         ])
-        self.seating_table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.seating_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.seating_table = create_table_view(self.seating_model)
+        self.seating_filter_edit = create_filter_edit(
+            self.seating_table, "Sınav, derslik veya öğrenci ile süz...")
         
         layout.addWidget(title)
         layout.addLayout(button_layout)
+        layout.addWidget(self.auto_allocate_checkbox)
         layout.addWidget(self.seating_progress)
         layout.addWidget(QLabel("İşlem Sonuçları:"))
         layout.addWidget(self.seating_result_text)
         layout.addWidget(QLabel("Oturma Planları:"))
+        layout.addWidget(self.seating_filter_edit)
         layout.addWidget(self.seating_table)
         
         self.seating_plan_tab.setLayout(layout)
 
     def handle_generate_seating(self):
         """Oturma planları oluşturma işlemini gerçekleştirir."""
-        self.seating_progress.setVisible(True)
-        self.seating_progress.setRange(0, 0)
-        self.generate_seating_button.setEnabled(False)
-        
-        try:
-            planner = SeatingPlanner(self.department_id)
-            results = planner.generate_seating_plans()
-            
-            # Sonuçları göster
-            result_text = f"✅ Başarılı: {results['success']} oturma planı oluşturuldu\n"
-            if results['warnings']:
-                result_text += f"⚠️ Uyarılar:\n" + "\n".join(results['warnings'][:5]) + "\n"
-            if results['errors']:
-                result_text += f"❌ Hatalar:\n" + "\n".join(results['errors'][:5]) + "\n"
-            
-            self.seating_result_text.setText(result_text)
-            
-            if results['success'] > 0:
+        planner = SeatingPlanner(self.department_id)
+        auto_allocate = self.auto_allocate_checkbox.isChecked()
+        
+        def task(progress_callback, cancel_event):
+            overflows = planner.validate_capacity(auto_allocate=auto_allocate)
+            results = planner.generate_seating_plans(progress_callback=progress_callback,
+                                                     cancel_event=cancel_event)
+            results['overflows'] = overflows
+            return results
+        
+        self.start_task('seating', task, self.on_seating_finished, self.seating_progress,
+                        self._seating_buttons(), self.cancel_seating_button)
+
+    def _seating_buttons(self):
+        return [self.generate_seating_button, self.clear_seating_button, self.view_seating_button]
+
+    def on_seating_finished(self, results):
+        """Arka planda oluşturulan oturma planlarının sonucunu gösterir."""
+        overflows = results['overflows']
+        result_text = f"✅ Başarılı: {results['success']} oturma planı oluşturuldu\n"
+        if overflows:
+            result_text += "📋 Kapasite Kontrolü:\n" + "\n".join(
+                f"{o['course_code']}: {o['student_count']} öğrenci / {o['capacity']} kapasite"
+                + (f" (eklenen: {', '.join(o['added_classrooms'])})" if o['added_classrooms'] else "")
+                for o in overflows[:5]
+            ) + "\n"
+        if results['warnings']:
+            result_text += f"⚠️ Uyarılar:\n" + "\n".join(results['warnings'][:5]) + "\n"
+        if results['errors']:
+            result_text += f"❌ Hatalar:\n" + "\n".join(results['errors'][:5]) + "\n"
+        
+        self.seating_result_text.setText(result_text)
+        
+        if results['success'] > 0:
+            if results.get('cancelled'):
+                QMessageBox.information(self, "İptal Edildi",
+                    f"İşlem iptal edildi; {results['success']} oturma planı oluşturulmuştu.")
+            else:
                 QMessageBox.information(self, "Başarılı", f"{results['success']} oturma planı oluşturuldu.")
-                self.load_seating_plans()
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Hata", f"Oturma planı oluşturulurken hata: {str(e)}")
-        finally:
-            self.seating_progress.setVisible(False)
-            self.generate_seating_button.setEnabled(True)
+            self.load_seating_plans()
 
     def handle_clear_seating(self):
         """Oturma planlarını temizler."""
@@ -945,16 +1128,17 @@ class CoordinatorDashboard(QMainWindow):
                                    QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
         
         if reply == QMessageBox.Yes:
-            try:
-                planner = SeatingPlanner(self.department_id)
-                if planner.clear_seating_plans():
-                    QMessageBox.information(self, "Başarılı", "Oturma planları temizlendi.")
-                    self.seating_table.setRowCount(0)
-                    self.seating_result_text.clear()
-                else:
-                    QMessageBox.critical(self, "Hata", "Oturma planları temizlenirken hata oluştu.")
-            except Exception as e:
-                QMessageBox.critical(self, "Hata", f"Temizleme işlemi sırasında hata: {str(e)}")
+            planner = SeatingPlanner(self.department_id)
+            self.start_task('seating', lambda **hooks: planner.clear_seating_plans(),
+                            self.on_seating_cleared, self.seating_progress, self._seating_buttons())
+
+    def on_seating_cleared(self, cleared):
+        if cleared:
+            QMessageBox.information(self, "Başarılı", "Oturma planları temizlendi.")
+            self.seating_model.clear()
+            self.seating_result_text.clear()
+        else:
+            QMessageBox.critical(self, "Hata", "Oturma planları temizlenirken hata oluştu.")
 
     def handle_view_seating(self):
         """Oturma planını görselleştirir."""
@@ -963,9 +1147,9 @@ class CoordinatorDashboard(QMainWindow):
             self.load_seating_plans()
             
             # Eğer tabloda veri varsa bilgi mesajı göster
-            if self.seating_table.rowCount() > 0:
+            if self.seating_model.total_count() > 0:
                 QMessageBox.information(self, "Başarılı", 
-                    f"Oturma planları tabloda gösteriliyor.\nToplam {self.seating_table.rowCount()} kayıt bulundu.")
+                    f"Oturma planları tabloda gösteriliyor.\nToplam {self.seating_model.total_count()} kayıt bulundu.")
             else:
                 QMessageBox.warning(self, "Uyarı", 
                     "Henüz oluşturulmuş oturma planı bulunmamaktadır.\n"
@@ -976,35 +1160,10 @@ class CoordinatorDashboard(QMainWindow):
     def load_seating_plans(self):
         """Oturma planlarını tabloya yükler."""
         try:
+            # Tüm sınavların oturma yerleri tek sorguda gelir
             planner = SeatingPlanner(self.department_id)
+            self.seating_model.set_rows(planner.get_department_seating())
             
-            # Tüm sınavları al
-            scheduler = ExamScheduler(self.department_id)
-            exams = scheduler.get_scheduled_exams()
-            
-            all_seating_data = []
-            for exam in exams:
-                seating_data = planner.get_seating_plan(exam['id'])
-                for seat in seating_data:
-                    all_seating_data.append({
-                        'exam': f"{exam['course_code']} - {exam['exam_type']}",
-                        'classroom': seat['classroom_code'],
-                        'row': seat['seat_row'],
-                        'col': seat['seat_col'],
-                        'student_no': seat['student_no'],
-                        'student_name': seat['full_name']
-                    })
-            
-            self.seating_table.setRowCount(len(all_seating_data))
-            
-            for row_num, data in enumerate(all_seating_data):
-                self.seating_table.setItem(row_num, 0, QTableWidgetItem(data['exam']))
-                self.seating_table.setItem(row_num, 1, QTableWidgetItem(data['classroom']))
-                self.seating_table.setItem(row_num, 2, QTableWidgetItem(str(data['row'])))
-                self.seating_table.setItem(row_num, 3, QTableWidgetItem(str(data['col'])))
-                self.seating_table.setItem(row_num, 4, QTableWidgetItem(data['student_no']))
-                self.seating_table.setItem(row_num, 5, QTableWidgetItem(data['student_name']))
-                
         except Exception as e:
             print(f"Oturma planları yüklenirken hata: {e}")
 
@@ -1060,15 +1219,14 @@ class CoordinatorDashboard(QMainWindow):
         self.clear_schedule_view()
         
         # Sınav programı tablosu
-        self.schedule_table = QTableWidget()
-        self.schedule_table.setColumnCount(8)
-        self.schedule_table.setHorizontalHeaderLabels([
-            "Tarih", "Saat", "Sınav Türü", "Ders Kodu", "Ders Adı", 
-            "Sınıf", "Öğretim Üyesi", "Derslikler"
-        ])
-        self.schedule_table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.schedule_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        
+        self.schedule_model = RowTableModel([
+            ("Tarih", 'exam_date'), ("Saat", 'start_time'), ("Sınav Türü", 'exam_type'),
+            ("Ders Kodu", 'course_code'), ("Ders Adı", 'course_name'), ("Sınıf", 'class_level'),
+            ("Öğretim Üyesi", 'instructor_name'), ("Derslikler", 'classrooms')
+        ], formatters={0: format_date, 1: format_time})
+        self.schedule_table = create_table_view(self.schedule_model)
+        
+        self.schedule_view_layout.addWidget(create_filter_edit(self.schedule_table))
         self.schedule_view_layout.addWidget(self.schedule_table)
         self.populate_schedule_table()
 
@@ -1107,17 +1265,14 @@ class CoordinatorDashboard(QMainWindow):
         self.date_range_label.setStyleSheet("color: #555; margin: 5px;")
         self.schedule_view_layout.addWidget(self.date_range_label)
         
-        # Takvim tablosu (7 gün x 4 saat)
+        # Takvim tablosu (7 gün x saat dilimleri)
         self.calendar_table = QTableWidget()
-        self.calendar_table.setRowCount(4)  # 4 saat dilimi
-        self.calendar_table.setColumnCount(7)  # 7 gün
+        self.calendar_table.setRowCount(len(TIME_SLOTS))
+        self.calendar_table.setColumnCount(len(DAY_NAMES))
         
         # Başlıkları ayarla
-        time_slots = ["09:00-11:00", "11:00-13:00", "13:00-15:00", "15:00-17:00"]
-        day_names = ["Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"]
-        
-        self.calendar_table.setVerticalHeaderLabels(time_slots)
-        self.calendar_table.setHorizontalHeaderLabels(day_names)
+        self.calendar_table.setVerticalHeaderLabels([label for _, label in TIME_SLOTS])
+        self.calendar_table.setHorizontalHeaderLabels(DAY_NAMES)
         self.calendar_table.setEditTriggers(QTableWidget.NoEditTriggers)
         self.calendar_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.calendar_table.verticalHeader().setSectionResizeMode(QHeaderView.Stretch)
@@ -1134,9 +1289,7 @@ class CoordinatorDashboard(QMainWindow):
         self.schedule_view_layout.addWidget(self.calendar_table)
         
         # Başlangıç haftası (bugün)
-        from datetime import datetime, timedelta
-        today = datetime.now().date()
-        self.current_week_start = today - timedelta(days=today.weekday())
+        self.current_week_start = week_start(datetime.now().date())
         
         self.populate_calendar_table()
 
@@ -1202,126 +1355,57 @@ class CoordinatorDashboard(QMainWindow):
         """Sınav programı tablosunu doldurur."""
         try:
             scheduler = ExamScheduler(self.department_id)
-            exams = scheduler.get_scheduled_exams()
+            # Derslikler sınavlarla aynı sorguda toplanır
+            self.schedule_model.set_rows(scheduler.get_scheduled_exams(include_classrooms=True))
             
-            self.schedule_table.setRowCount(len(exams))
-            
-            for row_num, exam in enumerate(exams):
-                # Derslik bilgilerini al
-                classroom_info = self.get_exam_classrooms(exam['id'])
-                classroom_text = ", ".join([f"{c['code']}({c['capacity']})" for c in classroom_info])
-                
-                self.schedule_table.setItem(row_num, 0, QTableWidgetItem(exam['exam_date'].strftime('%d.%m.%Y')))
-                self.schedule_table.setItem(row_num, 1, QTableWidgetItem(self._format_time(exam['start_time'])))
-                self.schedule_table.setItem(row_num, 2, QTableWidgetItem(exam['exam_type']))
-                self.schedule_table.setItem(row_num, 3, QTableWidgetItem(exam['course_code']))
-                self.schedule_table.setItem(row_num, 4, QTableWidgetItem(exam['course_name']))
-                self.schedule_table.setItem(row_num, 5, QTableWidgetItem(str(exam['class_level'])))
-                self.schedule_table.setItem(row_num, 6, QTableWidgetItem(exam['instructor_name']))
-                self.schedule_table.setItem(row_num, 7, QTableWidgetItem(classroom_text))
-                
         except Exception as e:
             print(f"Sınav programı yüklenirken hata: {e}")
 
     def show_previous_week(self):
         """Önceki haftayı gösterir."""
-        from datetime import timedelta
         self.current_week_start = self.current_week_start - timedelta(days=7)
         self.populate_calendar_table()
     
     def show_next_week(self):
         """Sonraki haftayı gösterir."""
-        from datetime import timedelta
         self.current_week_start = self.current_week_start + timedelta(days=7)
         self.populate_calendar_table()
     
     def show_current_week(self):
         """Bu haftayı gösterir."""
-        from datetime import datetime, timedelta
-        today = datetime.now().date()
-        self.current_week_start = today - timedelta(days=today.weekday())
+        self.current_week_start = week_start(datetime.now().date())
         self.populate_calendar_table()
     
     def populate_calendar_table(self):
-        """Takvim tablosunu doldurur."""
+        """Takvim tablosunu önbellekteki hafta kovalarından doldurur (hafta değişiminde sorgu yapılmaz)."""
         try:
-            scheduler = ExamScheduler(self.department_id)
-            exams = scheduler.get_scheduled_exams()
-            
-            from datetime import timedelta
-            
-            # Haftanın günlerini oluştur
-            week_days = [self.current_week_start + timedelta(days=i) for i in range(7)]
-            
             # Tarih aralığını göster
             week_start_str = self.current_week_start.strftime('%d.%m.%Y')
             week_end_str = (self.current_week_start + timedelta(days=6)).strftime('%d.%m.%Y')
             self.date_range_label.setText(f"📅 {week_start_str} - {week_end_str}")
             
-            # Sınavları günlere göre grupla
-            daily_exams = {}
-            for exam in exams:
-                exam_date = exam['exam_date']
-                if exam_date in week_days:
-                    day_index = week_days.index(exam_date)
-                    if day_index not in daily_exams:
-                        daily_exams[day_index] = []
-                    daily_exams[day_index].append(exam)
+            cells = self.calendar_model.week(self.current_week_start)
+            # Bugünün sütunu (bu hafta gösteriliyorsa)
+            today_index = (datetime.now().date() - self.current_week_start).days
             
-            # Saat dilimlerine göre yerleştir
-            time_slots = [
-                (9, 0), (11, 0), (13, 0), (15, 0)
-            ]
-            
-            # Tüm hücreleri temizle
-            self.calendar_table.clearContents()
-            
-            for time_index, (hour, minute) in enumerate(time_slots):
-                for day_index in range(7):
-                    cell_text = ""
-                    cell_color = QColor(255, 255, 255)  # Beyaz (boş)
-                    
-                    if day_index in daily_exams:
-                        for exam in daily_exams[day_index]:
-                            # start_time timedelta olabilir, saati al
-                            exam_hour = self._get_hour_from_time(exam['start_time'])
-                            if exam_hour == hour:
-                                cell_text += f"📚 {exam['course_code']}\n"
-                                cell_text += f"📝 {exam['exam_type']}\n"
-                                cell_text += f"👤 {exam['instructor_name']}\n"
-                                cell_color = QColor(220, 240, 255)  # Açık mavi
-                    
-                    item = QTableWidgetItem(cell_text.strip() if cell_text else "")
-                    item.setBackground(cell_color)
-                    
-                    # Bugünü vurgula
-                    from datetime import datetime
-                    if week_days[day_index] == datetime.now().date():
+            for time_index, row in enumerate(cells):
+                for day_index, cell_text in enumerate(row):
+                    item = QTableWidgetItem(cell_text)
+                    if day_index == today_index:
                         item.setBackground(QColor(255, 255, 220))  # Sarı tonu
-                    
+                    elif cell_text:
+                        item.setBackground(QColor(220, 240, 255))  # Açık mavi
+                    else:
+                        item.setBackground(QColor(255, 255, 255))  # Beyaz (boş)
                     self.calendar_table.setItem(time_index, day_index, item)
                 
         except Exception as e:
             print(f"Takvim görünümü yüklenirken hata: {e}")
             import traceback
             traceback.print_exc()
-    
-    def _get_hour_from_time(self, time_value):
-        """TIME alanından saat değerini çıkarır (timedelta veya time objesi olabilir)."""
-        try:
-            from datetime import timedelta
-            if isinstance(time_value, timedelta):
-                total_seconds = int(time_value.total_seconds())
-                hours = (total_seconds // 3600) % 24
-                return hours
-            elif hasattr(time_value, 'hour'):
-                return time_value.hour
-            return 0
-        except Exception:
-            return 0
 
     def populate_classroom_table(self):
-        """Derslik bazlı tabloyu doldurur."""
+        """Derslik bazlı tabloyu doluluk matrisinden doldurur."""
         try:
             # Seçili derslik filtresini al
             selected_classroom_id = None
@@ -1331,6 +1415,8 @@ class CoordinatorDashboard(QMainWindow):
             # Derslik atamalarını al
             classroom_assignments = self.get_classroom_assignments(selected_classroom_id)
             
+            # Doldururken sıralama kapalı tutulur (her setItem satırları yeniden sıralamasın)
+            self.classroom_table.setSortingEnabled(False)
             self.classroom_table.setRowCount(len(classroom_assignments))
             
             for row_num, assignment in enumerate(classroom_assignments):
@@ -1359,11 +1445,9 @@ class CoordinatorDashboard(QMainWindow):
                 self.classroom_table.setItem(row_num, 5, course_item)
                 
                 # Yerleştirilen öğrenci sayısı
-                student_count = assignment['student_count']
-                capacity = assignment['capacity']
-                usage_percent = (student_count / capacity * 100) if capacity > 0 else 0
-                
-                student_item = QTableWidgetItem(f"{student_count} / {capacity} ({usage_percent:.0f}%)")
+                usage_percent = assignment['utilization']
+                student_item = QTableWidgetItem(
+                    f"{assignment['student_count']} / {assignment['capacity']} ({usage_percent:.0f}%)")
                 
                 # Doluluk oranına göre renklendirme
                 if usage_percent > 90:
@@ -1374,87 +1458,23 @@ class CoordinatorDashboard(QMainWindow):
                     student_item.setBackground(QColor(200, 255, 200))  # Yeşilimsi (uygun)
                 
                 self.classroom_table.setItem(row_num, 6, student_item)
+            
+            self.classroom_table.setSortingEnabled(True)
                 
         except Exception as e:
             print(f"Derslik görünümü yüklenirken hata: {e}")
             import traceback
             traceback.print_exc()
 
-    def get_exam_classrooms(self, exam_id):
-        """Belirli bir sınavın derslik bilgilerini getirir."""
-        connection = get_db_connection()
-        if not connection:
-            return []
-        
-        try:
-            cursor = connection.cursor(dictionary=True)
-            query = """
-                SELECT cl.code, cl.name, cl.capacity
-                FROM exam_assignments ea
-                JOIN classrooms cl ON ea.classroom_id = cl.id
-                WHERE ea.exam_id = %s
-            """
-            cursor.execute(query, (exam_id,))
-            return cursor.fetchall()
-        except Exception as e:
-            print(f"Derslik bilgileri alınırken hata: {e}")
-            return []
-        finally:
-            connection.close()
-
     def get_classroom_assignments(self, classroom_id=None):
-        """Derslik atamalarını getirir."""
-        connection = get_db_connection()
-        if not connection:
-            return []
-        
-        try:
-            cursor = connection.cursor(dictionary=True)
-            
-            if classroom_id:
-                # Belirli bir derslik için
-                query = """
-                    SELECT e.exam_date, e.start_time, c.code as course_code, c.name as course_name,
-                           e.exam_type, cl.code as classroom_code, cl.capacity,
-                           COUNT(sa.student_id) as student_count
-                    FROM exams e
-                    JOIN courses c ON e.course_id = c.id
-                    JOIN exam_assignments ea ON e.id = ea.exam_id
-                    JOIN classrooms cl ON ea.classroom_id = cl.id
-                    LEFT JOIN seating_assignments sa ON e.id = sa.exam_id AND cl.id = sa.classroom_id
-                    WHERE c.department_id = %s AND cl.id = %s
-                    GROUP BY e.id, cl.id
-                    ORDER BY e.exam_date, e.start_time
-                """
-                cursor.execute(query, (self.department_id, classroom_id))
-            else:
-                # Tüm derslikler
-                query = """
-                    SELECT e.exam_date, e.start_time, c.code as course_code, c.name as course_name,
-                           e.exam_type, cl.code as classroom_code, cl.capacity,
-                           COUNT(sa.student_id) as student_count
-                    FROM exams e
-                    JOIN courses c ON e.course_id = c.id
-                    JOIN exam_assignments ea ON e.id = ea.exam_id
-                    JOIN classrooms cl ON ea.classroom_id = cl.id
-                    LEFT JOIN seating_assignments sa ON e.id = sa.exam_id AND cl.id = sa.classroom_id
-                    WHERE c.department_id = %s
-                    GROUP BY e.id, cl.id
-                    ORDER BY cl.code, e.exam_date, e.start_time
-                """
-                cursor.execute(query, (self.department_id,))
-            
-            return cursor.fetchall()
-        except Exception as e:
-            print(f"Derslik atamaları alınırken hata: {e}")
-            import traceback
-            traceback.print_exc()
-            return []
-        finally:
-            connection.close()
+        """Derslik atamalarını (doluluk matrisinden, program değişmediyse sorgusuz) getirir."""
+        return get_occupancy(self.department_id).assignments(classroom_id)
 
     def refresh_schedule_view(self):
         """Görünümü yeniler."""
+        # Program başka bir oturumda değişmiş olabilir; takvim ve doluluk önbellekleri yeniden yüklenir
+        self.calendar_model.invalidate()
+        schedule_changed(self.department_id)
         current_view = self.view_type_combo.currentText()
         if current_view == "Tablo Görünümü":
             self.load_table_view()
@@ -1493,6 +1513,10 @@ class CoordinatorDashboard(QMainWindow):
         excel_buttons_layout.addWidget(self.export_schedule_excel_button)
         excel_buttons_layout.addWidget(self.export_seating_excel_button)
         excel_buttons_layout.addWidget(self.export_comprehensive_excel_button)
+        self.export_changes_excel_button = QPushButton("Değişiklikleri Excel'e Aktar")
+        self.export_changes_excel_button.setToolTip("Son dışa aktarımdan bu yana değişen sınavları ayrı bir dosyaya yazar.")
+        self.export_changes_excel_button.clicked.connect(self.handle_export_changes_excel)
+        excel_buttons_layout.addWidget(self.export_changes_excel_button)
         excel_layout.addLayout(excel_buttons_layout)
         
         # PDF dışa aktarma
@@ -1507,12 +1531,27 @@ class CoordinatorDashboard(QMainWindow):
         pdf_buttons_layout = QHBoxLayout()
         self.export_pdf_button = QPushButton("Sınav Programını PDF'e Aktar")
         self.export_pdf_button.clicked.connect(self.handle_export_pdf)
+        self.export_student_cards_button = QPushButton("Öğrenci Sınav Kartları (PDF)")
+        self.export_student_cards_button.clicked.connect(lambda: self.handle_export_batch_pdf('students'))
+        self.export_room_sheets_button = QPushButton("Derslik Kapı Listeleri (PDF)")
+        self.export_room_sheets_button.clicked.connect(lambda: self.handle_export_batch_pdf('rooms'))
         pdf_buttons_layout.addWidget(self.export_pdf_button)
+        pdf_buttons_layout.addWidget(self.export_student_cards_button)
+        pdf_buttons_layout.addWidget(self.export_room_sheets_button)
+        self.export_feeds_button = QPushButton("Takvim (.ics) ve JSON Akışları")
+        self.export_feeds_button.setToolTip("Öğrenci başına .ics dosyaları ile JSON/NDJSON koltuk listesi üretir.")
+        self.export_feeds_button.clicked.connect(self.handle_export_feeds)
+        pdf_buttons_layout.addWidget(self.export_feeds_button)
         pdf_layout.addLayout(pdf_buttons_layout)
+        self.merge_pdf_checkbox = QCheckBox("Toplu belgeleri tek PDF dosyasında birleştir")
+        pdf_layout.addWidget(self.merge_pdf_checkbox)
         
-        # İlerleme çubuğu
+        # İlerleme çubuğu ve iptal
         self.export_progress = QProgressBar()
         self.export_progress.setVisible(False)
+        self.cancel_export_button = QPushButton("Dışa Aktarmayı İptal Et")
+        self.cancel_export_button.setVisible(False)
+        self.cancel_export_button.clicked.connect(lambda: self.cancel_task('export'))
         
         # Sonuç alanı
         self.export_result_text = QTextEdit()
@@ -1523,6 +1562,7 @@ class CoordinatorDashboard(QMainWindow):
         layout.addWidget(excel_group)
         layout.addWidget(pdf_group)
         layout.addWidget(self.export_progress)
+        layout.addWidget(self.cancel_export_button)
         layout.addWidget(QLabel("İşlem Sonuçları:"))
         layout.addWidget(self.export_result_text)
         
@@ -1534,24 +1574,7 @@ class CoordinatorDashboard(QMainWindow):
             self, "Sınav Programını Kaydet", "sinav_programi.xlsx", "Excel Dosyaları (*.xlsx)")
         
         if file_path:
-            self.export_progress.setVisible(True)
-            self.export_progress.setRange(0, 0)
-            
-            try:
-                export_manager = ExportManager(self.department_id)
-                success, message = export_manager.export_schedule_to_excel(file_path)
-                
-                self.export_result_text.setText(message)
-                
-                if success:
-                    QMessageBox.information(self, "Başarılı", message)
-                else:
-                    QMessageBox.critical(self, "Hata", message)
-                    
-            except Exception as e:
-                QMessageBox.critical(self, "Hata", f"Dışa aktarma sırasında hata: {str(e)}")
-            finally:
-                self.export_progress.setVisible(False)
+            self.run_export('export_schedule_to_excel', file_path)
 
     def handle_export_seating_excel(self):
         """Oturma planlarını Excel'e aktarır."""
@@ -1559,24 +1582,7 @@ class CoordinatorDashboard(QMainWindow):
             self, "Oturma Planlarını Kaydet", "oturma_planlari.xlsx", "Excel Dosyaları (*.xlsx)")
         
         if file_path:
-            self.export_progress.setVisible(True)
-            self.export_progress.setRange(0, 0)
-            
-            try:
-                export_manager = ExportManager(self.department_id)
-                success, message = export_manager.export_seating_plans_to_excel(file_path)
-                
-                self.export_result_text.setText(message)
-                
-                if success:
-                    QMessageBox.information(self, "Başarılı", message)
-                else:
-                    QMessageBox.critical(self, "Hata", message)
-                    
-            except Exception as e:
-                QMessageBox.critical(self, "Hata", f"Dışa aktarma sırasında hata: {str(e)}")
-            finally:
-                self.export_progress.setVisible(False)
+            self.run_export('export_seating_plans_to_excel', file_path)
 
     def handle_export_comprehensive_excel(self):
         """Kapsamlı raporu Excel'e aktarır."""
@@ -1584,24 +1590,37 @@ class CoordinatorDashboard(QMainWindow):
             self, "Kapsamlı Raporu Kaydet", "kapsamli_rapor.xlsx", "Excel Dosyaları (*.xlsx)")
         
         if file_path:
-            self.export_progress.setVisible(True)
-            self.export_progress.setRange(0, 0)
-            
-            try:
-                export_manager = ExportManager(self.department_id)
-                success, message = export_manager.export_comprehensive_report_to_excel(file_path)
-                
-                self.export_result_text.setText(message)
-                
-                if success:
-                    QMessageBox.information(self, "Başarılı", message)
-                else:
-                    QMessageBox.critical(self, "Hata", message)
-                    
-            except Exception as e:
-                QMessageBox.critical(self, "Hata", f"Dışa aktarma sırasında hata: {str(e)}")
-            finally:
-                self.export_progress.setVisible(False)
+            self.run_export('export_comprehensive_report_to_excel', file_path)
+
+    def handle_export_batch_pdf(self, kind):
+        """Öğrenci sınav kartlarını veya derslik kapı listelerini toplu PDF olarak üretir."""
+        merged = self.merge_pdf_checkbox.isChecked()
+        if merged:
+            default_name = "sinav_kartlari.pdf" if kind == 'students' else "kapi_listeleri.pdf"
+            output_path, _ = QFileDialog.getSaveFileName(
+                self, "Toplu PDF'i Kaydet", default_name, "PDF Dosyaları (*.pdf)")
+        else:
+            output_path = QFileDialog.getExistingDirectory(self, "PDF Dosyaları İçin Klasör Seç")
+        
+        if output_path:
+            self.run_export('generate_batch_pdfs', output_path, kind, merged)
+
+    def handle_export_changes_excel(self):
+        """Son dışa aktarımdan bu yana değişen sınavları Excel'e aktarır."""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Değişiklikleri Kaydet", "degisiklikler.xlsx", "Excel Dosyaları (*.xlsx)")
+        
+        if file_path:
+            # Değişiklik yoksa veya önceki rapor bulunamazsa bu bir hata değil, uyarıdır
+            self.run_export('export_changes_to_excel', file_path, failure_is_warning=True)
+
+    def handle_export_feeds(self):
+        """Öğrenci takvimlerini (.ics) ve JSON/NDJSON akışlarını dışa aktarır."""
+        output_dir = QFileDialog.getExistingDirectory(self, "Akış Dosyaları İçin Klasör Seç")
+        
+        if output_dir:
+            # Binlerce öğrenci için dosyalar öğrenci numarasının ilk 4 hanesine göre bölünür
+            self.run_export('export_feeds', output_dir, shard_prefix_length=4)
 
     def handle_export_pdf(self):
         """Sınav programını PDF'e aktarır."""
@@ -1609,66 +1628,170 @@ class CoordinatorDashboard(QMainWindow):
             self, "Sınav Programını PDF'e Kaydet", "sinav_programi.pdf", "PDF Dosyaları (*.pdf)")
         
         if file_path:
-            self.export_progress.setVisible(True)
-            self.export_progress.setRange(0, 0)
-            
-            try:
-                export_manager = ExportManager(self.department_id)
-                success, message = export_manager.generate_pdf_report(file_path)
-                
-                self.export_result_text.setText(message)
-                
-                if success:
-                    QMessageBox.information(self, "Başarılı", message)
-                else:
-                    QMessageBox.critical(self, "Hata", message)
-                    
-            except Exception as e:
-                QMessageBox.critical(self, "Hata", f"Dışa aktarma sırasında hata: {str(e)}")
-            finally:
-                self.export_progress.setVisible(False)
+            self.run_export('generate_pdf_report', file_path)
+
+    def _export_buttons(self):
+        return [self.export_schedule_excel_button, self.export_seating_excel_button,
+                self.export_comprehensive_excel_button, self.export_changes_excel_button,
+                self.export_pdf_button, self.export_student_cards_button,
+                self.export_room_sheets_button, self.export_feeds_button]
+
+    def run_export(self, method_name, *args, failure_is_warning=False, **kwargs):
+        """
+        ExportManager'ın verilen metodunu arka planda çalıştırır ve (başarı, mesaj) sonucunu
+        gösterir. Dışa aktarma sürerken diğer dışa aktarma düğmeleri devre dışıdır.
+        """
+        department_id = self.department_id
+        
+        def task(progress_callback, cancel_event):
+            export_manager = ExportManager(department_id, progress_callback=progress_callback,
+                                           cancel_event=cancel_event)
+            return getattr(export_manager, method_name)(*args, **kwargs)
+        
+        def on_finished(result):
+            success, message = result
+            self.export_result_text.setText(message)
+            if success:
+                QMessageBox.information(self, "Başarılı", message)
+            elif failure_is_warning:
+                QMessageBox.warning(self, "Uyarı", message)
+            else:
+                QMessageBox.critical(self, "Hata", message)
+        
+        self.start_task('export', task, on_finished, self.export_progress,
+                        self._export_buttons(), self.cancel_export_button)
+
+    def start_task(self, name, task, on_finished, progress_bar, buttons, cancel_button=None):
+        """
+        task(progress_callback=..., cancel_event=...) işini TaskWorker ile ayrı bir iş parçacığında
+        başlatır. İş sürerken düğmeler devre dışı kalır ve ilerleme çubuğu güncellenir;
+        iş bitince on_finished(sonuç) ana iş parçacığında çağrılır.
+        """
+        thread = QThread()
+        worker = TaskWorker(task)
+        worker.moveToThread(thread)
+        self.running_tasks[name] = (thread, worker, progress_bar, buttons, cancel_button)
+        
+        progress_bar.setVisible(True)
+        progress_bar.setRange(0, 0)
+        for button in buttons:
+            button.setEnabled(False)
+        if cancel_button:
+            cancel_button.setEnabled(True)
+            cancel_button.setVisible(True)
+        
+        thread.started.connect(worker.run)
+        worker.progress.connect(lambda info: self.update_task_progress(progress_bar, info))
+        worker.finished.connect(lambda result: self.end_task(name, result, on_finished))
+        worker.error.connect(lambda message: self.end_task(name, message))
+        thread.start()
+
+    def end_task(self, name, result, on_finished=None):
+        """Arka plan işini sonlandırır; on_finished yoksa sonuç bir hata mesajıdır."""
+        thread, worker, progress_bar, buttons, cancel_button = self.running_tasks.pop(name)
+        # İş bitti; olay döngüsü hemen kapanır. Nesneler bırakılmadan önce iş parçacığı beklenir.
+        thread.quit()
+        thread.wait()
+        progress_bar.setVisible(False)
+        # Hâlâ çalışan başka bir işin de kilitlediği düğmeler o iş bitene kadar kapalı kalır
+        busy = {button for task in self.running_tasks.values() for button in task[3]}
+        for button in buttons:
+            if button not in busy:
+                button.setEnabled(True)
+        if cancel_button:
+            cancel_button.setVisible(False)
+        
+        if on_finished is None:
+            QMessageBox.critical(self, "Hata", f"İşlem sırasında hata oluştu: {result}")
+        else:
+            on_finished(result)
+
+    def cancel_task(self, name):
+        """Çalışan işten bir sonraki kontrol noktasında durmasını ister."""
+        task = self.running_tasks.get(name)
+        if task:
+            task[1].cancel()
+            if task[4]:
+                task[4].setEnabled(False)
+
+    def update_task_progress(self, progress_bar, info):
+        """Arka plan işinin aşamasını, ilerlemesini ve geçen süreyi çubukta gösterir."""
+        text = TASK_PHASE_LABELS.get(info['phase'], info['phase'])
+        if info.get('total'):
+            progress_bar.setRange(0, info['total'])
+            progress_bar.setValue(info['current'])
+            text += " %v/%m"
+            if 'placed' in info:
+                text += f" (yerleşen: {info['placed']})"
+        else:
+            # Toplamı bilinmeyen aşamalar (ör. satır okuma) belirsiz çubukla gösterilir
+            progress_bar.setRange(0, 0)
+            if info.get('current'):
+                text += f" ({info['current']})"
+        progress_bar.setFormat(f"{text} - {int(info['elapsed'])} sn")
 
     def browse_course_file(self):
         """Ders listesi dosyası seçme dialogunu açar."""
-        file_path, _ = QFileDialog.getOpenFileName(
-            self, "Ders Listesi Excel Dosyası Seç", "", "Excel Dosyaları (*.xlsx *.xls)")
-        if file_path:
-            self.course_file_input.setText(file_path)
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self, "Ders Listesi Dosyaları Seç", "", IMPORT_FILE_FILTER)
+        if file_paths:
+            self.course_file_input.setText(IMPORT_PATH_SEPARATOR.join(file_paths))
 
     def browse_student_file(self):
         """Öğrenci listesi dosyası seçme dialogunu açar."""
-        file_path, _ = QFileDialog.getOpenFileName(
-            self, "Öğrenci Listesi Excel Dosyası Seç", "", "Excel Dosyaları (*.xlsx *.xls)")
-        if file_path:
-            self.student_file_input.setText(file_path)
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self, "Öğrenci Listesi Dosyaları Seç", "", IMPORT_FILE_FILTER)
+        if file_paths:
+            self.student_file_input.setText(IMPORT_PATH_SEPARATOR.join(file_paths))
 
     def handle_course_upload(self):
         """Ders listesi yükleme işlemini gerçekleştirir."""
-        file_path = self.course_file_input.text().strip()
-        if not file_path:
+        file_paths = [p.strip() for p in self.course_file_input.text().split(IMPORT_PATH_SEPARATOR.strip()) if p.strip()]
+        if not file_paths:
             QMessageBox.warning(self, "Dosya Seçilmedi", "Lütfen bir Excel dosyası seçin.")
             return
         
         self.course_progress.setVisible(True)
-        self.course_progress.setRange(0, 0)  # Belirsiz ilerleme
+        self.course_progress.setRange(0, 100)
+        self.course_progress.setValue(0)
+        self.course_progress.setFormat("%p%")
         self.course_upload_button.setEnabled(False)
         
         # QThread ile arka planda çalıştır
         self.course_thread = QThread()
-        self.course_worker = ExcelWorker('courses', file_path, self.department_id)
+        self.course_worker = ExcelWorker('courses', file_paths, self.department_id)
         self.course_worker.moveToThread(self.course_thread)
         self.course_thread.started.connect(self.course_worker.run)
         self.course_worker.finished.connect(self.on_course_finished)
         self.course_worker.error.connect(self.on_course_error)
+        self.course_worker.progress.connect(lambda info: self.update_import_progress(self.course_progress, info))
         # Temizlik
         self.course_worker.finished.connect(self.course_thread.quit)
         self.course_worker.finished.connect(self.course_worker.deleteLater)
         self.course_thread.finished.connect(self.course_thread.deleteLater)
         self.course_thread.start()
 
+    def update_import_progress(self, progress_bar, info):
+        """Aktarım ilerlemesini (satır sayıları ve tahmini kalan süre) çubukta gösterir."""
+        progress_bar.setValue(info['percent'])
+        if info['phase'] == 'parse':
+            text = f"%p% - {info['files_parsed']}/{info['files_total']} dosya, {info['rows_parsed']} satır okundu"
+        else:
+            text = f"%p% - {info['rows_written']}/{info['rows_total']} satır yazıldı"
+        if info['eta'] is not None and info['phase'] != 'done':
+            text += f", kalan ~{int(info['eta'])} sn"
+        progress_bar.setFormat(text)
+
     def on_course_finished(self, results):
         # Sonuçları göster
         result_text = f"✅ Başarılı: {results['success']} ders eklendi\n"
+        if results.get('timings'):
+            result_text += "⏱️ Süreler: " + ", ".join(
+                f"{phase} {seconds:.2f} sn" for phase, seconds in results['timings'].items()) + "\n"
+        if results.get('cache'):
+            cache = results['cache']
+            result_text += (f"🗂️ Önbellek: {'kullanıldı' if cache['hit'] else 'yeni dosya'}, "
+                            f"{cache['changed_rows']}/{cache['total_rows']} satır değişmiş\n")
         if results.get('warnings'):
             result_text += f"⚠️ Uyarılar:\n" + "\n".join(results['warnings'][:10]) + "\n"
         if results.get('errors'):
@@ -1686,22 +1809,28 @@ class CoordinatorDashboard(QMainWindow):
 
     def handle_student_upload(self):
         """Öğrenci listesi yükleme işlemini gerçekleştirir."""
-        file_path = self.student_file_input.text().strip()
-        if not file_path:
+        file_paths = [p.strip() for p in self.student_file_input.text().split(IMPORT_PATH_SEPARATOR.strip()) if p.strip()]
+        if not file_paths:
             QMessageBox.warning(self, "Dosya Seçilmedi", "Lütfen bir Excel dosyası seçin.")
             return
         
         self.student_progress.setVisible(True)
-        self.student_progress.setRange(0, 0)  # Belirsiz ilerleme
+        self.student_progress.setRange(0, 100)
+        self.student_progress.setValue(0)
+        self.student_progress.setFormat("%p%")
         self.student_upload_button.setEnabled(False)
         
         # QThread ile arka planda çalıştır
         self.student_thread = QThread()
-        self.student_worker = ExcelWorker('students', file_path)
+        self.student_worker = ExcelWorker('students', file_paths, self.department_id,
+                                          self.student_delta_checkbox.isChecked(),
+                                          self.student_delete_checkbox.isEnabled() and
+                                          self.student_delete_checkbox.isChecked())
         self.student_worker.moveToThread(self.student_thread)
         self.student_thread.started.connect(self.student_worker.run)
         self.student_worker.finished.connect(self.on_student_finished)
         self.student_worker.error.connect(self.on_student_error)
+        self.student_worker.progress.connect(lambda info: self.update_import_progress(self.student_progress, info))
         # Temizlik
         self.student_worker.finished.connect(self.student_thread.quit)
         self.student_worker.finished.connect(self.student_worker.deleteLater)
@@ -1709,8 +1838,47 @@ class CoordinatorDashboard(QMainWindow):
         self.student_thread.start()
 
     def on_student_finished(self, results):
+        self.student_progress.setVisible(False)
+        self.student_upload_button.setEnabled(True)
+        # Arama indeksi bir sonraki aramada yeni listeyle oluşturulur
+        self.student_index = None
+        delta = results.get('delta')
+        if delta and (delta['added'] or delta['removed']) and 'seating' in self.running_tasks:
+            # Tam oluşturma sürerken onarım aynı planları eşzamanlı değiştirirdi
+            results['warnings'] = results.get('warnings', []) + [
+                "Oturma planları şu anda yeniden oluşturulduğu için artımlı güncelleme yapılmadı; "
+                "oluşturma, aktarımdan önce başladıysa planları yeniden oluşturun"]
+            self.show_student_results(results)
+        elif delta and (delta['added'] or delta['removed']):
+            # Mevcut oturma planlarını yalnızca değişen kayıtlar için arka planda güncelle
+            planner = SeatingPlanner(self.department_id)
+            self.start_task('seating_repair',
+                            lambda **hooks: planner.repair_seating_plans(delta['added'], delta['removed']),
+                            lambda repair: self.show_student_results(results, repair),
+                            self.student_progress, [self.student_upload_button] + self._seating_buttons())
+            self.student_progress.setFormat("Oturma planları güncelleniyor...")
+        else:
+            self.show_student_results(results)
+
+    def show_student_results(self, results, repair=None):
+        """Öğrenci aktarımının (ve varsa oturma planı onarımının) sonucunu gösterir."""
         result_text = f"✅ Başarılı: {results['success']} öğrenci eklendi\n"
         result_text += f"📚 Kayıtlar: {results.get('enrollments', 0)} ders kaydı oluşturuldu\n"
+        delta = results.get('delta')
+        if delta:
+            result_text += f"🔁 Değişiklik: +{len(delta['added'])} / -{len(delta['removed'])} ders kaydı\n"
+        if repair:
+            result_text += (f"🪑 Oturma planı: {repair['success']} koltuk eklendi, "
+                            f"{repair['removed']} koltuk boşaltıldı\n")
+            results['warnings'] = results.get('warnings', []) + repair['warnings']
+            results['errors'] = results.get('errors', []) + repair['errors']
+        if results.get('timings'):
+            result_text += "⏱️ Süreler: " + ", ".join(
+                f"{phase} {seconds:.2f} sn" for phase, seconds in results['timings'].items()) + "\n"
+        if results.get('cache'):
+            cache = results['cache']
+            result_text += (f"🗂️ Önbellek: {'kullanıldı' if cache['hit'] else 'yeni dosya'}, "
+                            f"{cache['changed_rows']}/{cache['total_rows']} satır değişmiş\n")
         if results.get('warnings'):
             result_text += f"⚠️ Uyarılar:\n" + "\n".join(results['warnings'][:10]) + "\n"
         if results.get('errors'):
@@ -1719,8 +1887,6 @@ class CoordinatorDashboard(QMainWindow):
         if results.get('success', 0) > 0:
             QMessageBox.information(self, "Başarılı", 
                 f"{results['success']} öğrenci ve {results.get('enrollments', 0)} kayıt başarıyla yüklendi.")
-        self.student_progress.setVisible(False)
-        self.student_upload_button.setEnabled(True)
 
     def on_student_error(self, message):
         QMessageBox.critical(self, "Hata", f"Dosya işlenirken hata oluştu: {message}")
@@ -1808,6 +1974,8 @@ class CoordinatorDashboard(QMainWindow):
 
         if success:
             QMessageBox.information(self, "Başarılı", message)
+            # Kapasite değişikliği doluluk oranlarını etkiler
+            schedule_changed(self.department_id)
             self.load_classrooms_into_table()
             self.clear_form()
         else:
@@ -1827,6 +1995,7 @@ class CoordinatorDashboard(QMainWindow):
             success, message = delete_classroom(self.selected_classroom_id)
             if success:
                 QMessageBox.information(self, "Başarılı", message)
+                schedule_changed(self.department_id)
                 self.load_classrooms_into_table()
                 self.clear_form()
             else:
@@ -1883,87 +2052,36 @@ class ClassroomVisualizer(QDialog):
         line.setFrameStyle(QLabel.HLine | QLabel.Sunken)
         main_layout.addWidget(line)
         
-        # Sahne/Tahta gösterimi
-        stage_label = QLabel("🎓 TAHTA / SAHNE 🎓")
-        stage_label.setAlignment(Qt.AlignCenter)
-        stage_label.setStyleSheet("""
-            background-color: #2c3e50; 
-            color: white; 
-            padding: 10px; 
-            font-weight: bold; 
-            border-radius: 5px;
-            font-size: 14px;
-        """)
-        main_layout.addWidget(stage_label)
-        main_layout.addSpacing(20)
-        
-        # Koltuk düzeni için grid layout
-        grid_widget = QWidget()
-        layout = QGridLayout()
-        layout.setSpacing(3)
-        
-        rows = self.data['rows_count']
-        cols = self.data['cols_count']
-        seating_type = self.data['seating_type']
-        
-        # Sıralar ve boşluklar için kolon hesaplama
-        # Her seating_type kadar koltuğun ardından bir boşluk kolonu ekleriz
-        grid_col_position = 0
-        
-        for r in range(rows):
-            grid_col_position = 0  # Her satırda baştan başla
-            
-            for c in range(cols):
-                # Her sırayı bir grup olarak ele al
-                group_index = c // seating_type
-                position_in_group = c % seating_type
-                
-                # Grup rengini belirle
-                if group_index % 2 == 0:
-                    color = QColor("#87CEEB")  # Açık mavi
-                else:
-                    color = QColor("#98FB98")  # Açık yeşil
-                
-                seat = QLabel(f"💺\nS{r + 1}-K{c + 1}")
-                seat.setAlignment(Qt.AlignCenter)
-                seat.setMinimumSize(70, 55)
-                seat.setMaximumSize(70, 55)
-                seat.setAutoFillBackground(True)
-                
-                palette = seat.palette()
-                palette.setColor(seat.backgroundRole(), color)
-                seat.setPalette(palette)
-                
-                seat.setStyleSheet("""
-                    border: 2px solid #2c3e50; 
-                    border-radius: 8px;
-                    font-size: 9px;
-                    font-weight: bold;
-                """)
-                
-                # Grid'e ekle
-                layout.addWidget(seat, r, grid_col_position)
-                grid_col_position += 1
-                
-                # Grup sonu mu? (seating_type'a göre)
-                if (c + 1) % seating_type == 0 and c < cols - 1:
-                    # Boşluk kolonu ekle (koridor)
-                    spacer = QLabel()
-                    spacer.setMinimumWidth(25)
-                    spacer.setMaximumWidth(25)
-                    spacer.setStyleSheet("background-color: #ecf0f1;")
-                    layout.addWidget(spacer, r, grid_col_position)
-                    grid_col_position += 1
-        
-        grid_widget.setLayout(layout)
-        main_layout.addWidget(grid_widget, alignment=Qt.AlignCenter)
+        # Sınav seçimi: seçilen sınavın oturma planı koltukların üzerine yazılır
+        exam_layout = QHBoxLayout()
+        exam_layout.addWidget(QLabel("Sınav:"))
+        self.exam_combo = QComboBox()
+        self.exam_combo.addItem("Boş düzen", None)
+        for assignment in get_occupancy(self.data['department_id']).assignments(self.data['id']):
+            self.exam_combo.addItem(
+                f"{format_date(assignment['exam_date'])} {format_time(assignment['start_time'])} - "
+                f"{assignment['course_code']} {assignment['exam_type']} ({assignment['student_count']} öğr.)",
+                assignment['exam_id'])
+        self.exam_combo.currentIndexChanged.connect(self.load_exam_seating)
+        exam_layout.addWidget(self.exam_combo, 1)
+        
+        fit_button = QPushButton("Sığdır")
+        exam_layout.addWidget(fit_button)
+        main_layout.addLayout(exam_layout)
+        
+        # Koltuk düzeni: koltuk başına widget yerine tek sahne (tekerlek: yakınlaştır, sürükle: kaydır)
+        self.seat_scene = SeatMapScene(self)
+        self.seat_scene.set_layout(self.data['rows_count'], self.data['cols_count'], self.data['seating_type'])
+        self.seat_view = SeatMapView(self.seat_scene)
+        fit_button.clicked.connect(self.seat_view.fit)
+        main_layout.addWidget(self.seat_view)
         
         # Alt bilgi
-        main_layout.addSpacing(20)
-        footer_label = QLabel(f"Toplam {rows} sıra × {cols} koltuk = {rows * cols} kişilik kapasite")
-        footer_label.setAlignment(Qt.AlignCenter)
-        footer_label.setStyleSheet("color: #7f8c8d; font-style: italic;")
-        main_layout.addWidget(footer_label)
+        self.footer_label = QLabel()
+        self.footer_label.setAlignment(Qt.AlignCenter)
+        self.footer_label.setStyleSheet("color: #7f8c8d; font-style: italic;")
+        main_layout.addWidget(self.footer_label)
+        self.update_footer(0)
         
         # Renk açıklamaları
         legend_layout = QHBoxLayout()
@@ -1977,12 +2095,35 @@ class ClassroomVisualizer(QDialog):
         legend2.setStyleSheet("color: #2ecc71;")
         legend_layout.addWidget(legend2)
         
+        legend3 = QLabel("🟧 Dolu koltuk")
+        legend3.setStyleSheet("color: #e67e22;")
+        legend_layout.addWidget(legend3)
+        
         legend_layout.addStretch()
         main_layout.addLayout(legend_layout)
         
         self.setLayout(main_layout)
         self.setMinimumSize(800, 600)
 
+    def update_footer(self, seated):
+        rows = self.data['rows_count']
+        cols = self.data['cols_count']
+        text = f"Toplam {rows} sıra × {cols} koltuk = {rows * cols} kişilik kapasite"
+        if self.exam_combo.currentData() is not None:
+            text += f" · {seated} öğrenci yerleştirildi"
+        self.footer_label.setText(text)
+
+    def load_exam_seating(self):
+        """Seçili sınavın bu derslikteki oturma planını koltuklara yerleştirir."""
+        exam_id = self.exam_combo.currentData()
+        assignments = {}
+        if exam_id is not None:
+            planner = SeatingPlanner(self.data['department_id'])
+            for seat in planner.get_seating_plan(exam_id, self.data['id']):
+                assignments[(seat['seat_row'], seat['seat_col'])] = (seat['student_no'], seat['full_name'])
+        self.seat_scene.set_assignments(assignments)
+        self.update_footer(len(assignments))
+
     # def init_debug_ui(self):
     #     """Debug sekmesinin arayüzünü oluşturur."""
     #     pass  # Geçici olarak devre dışı
@@ -0,0 +1,242 @@
+# ui/seat_map.py
+# Derslik oturma düzeninin QGraphicsScene üzerinde çizimi (yakınlaştırma/kaydırma, ayrıntı düzeyi).
+
+from bisect import bisect_right
+from PyQt5.QtWidgets import QGraphicsItem, QGraphicsScene, QGraphicsView
+from PyQt5.QtGui import QColor, QPainter, QPen, QFont, QFontMetrics, QStaticText
+from PyQt5.QtCore import Qt, QRectF, QPointF
+
+# Sahne birimleriyle koltuk ölçüleri
+SEAT_WIDTH = 70
+SEAT_HEIGHT = 55
+SEAT_SPACING = 3
+AISLE_WIDTH = 25
+STAGE_HEIGHT = 40
+STAGE_GAP = 20
+
+# Ayrıntı düzeyi (görünüm ölçeği) eşikleri
+DETAIL_OUTLINE = 0.35   # altında koltuklar kenarsız, toplu dikdörtgen olarak çizilir
+DETAIL_LABEL = 0.6      # üstünde tek satır yazılır (öğrenci numarası, boş koltukta koltuk etiketi)
+DETAIL_FULL = 1.0       # üstünde koltuk etiketi ve öğrenci numarası birlikte yazılır
+DETAIL_NAME = 1.5       # üstünde öğrenci adı da yazılır
+
+# Fare tekerleği ile yakınlaştırma
+ZOOM_STEP = 1.15
+MIN_ZOOM = 0.05
+MAX_ZOOM = 8.0
+
+GROUP_COLORS = (QColor("#87CEEB"), QColor("#98FB98"))  # Açık mavi / açık yeşil sıra grupları
+OCCUPIED_COLOR = QColor("#F5B041")                      # Öğrenci yerleştirilmiş koltuk
+BORDER_COLOR = QColor("#2c3e50")
+
+
+class SeatMapItem(QGraphicsItem):
+    """
+    Tüm koltukları tek bir öğe olarak çizer. Koltuk başına widget veya öğe yoktur:
+    görünen satır/sütun aralığı açığa çıkan dikdörtgenden hesaplanır, uzaktan bakışta
+    koltuklar renk başına tek drawRects çağrısıyla çizilir, yazılar yalnızca yakın bakışta
+    görünen koltuklara yazılır. Düzen veya yerleşim değiştiğinde aynı öğe güncellenir.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+        self.setAcceptHoverEvents(True)
+        self.rows = 0
+        self.cols = 0
+        self.seating_type = 1
+        self.assignments = {}          # (sıra, sütun) 0 tabanlı -> (öğrenci no, ad soyad)
+        self._col_x = []               # sütun -> x konumu (koridorlar dahil)
+        self._bounds = QRectF()
+        self._batches = []             # (renk, koltuk dikdörtgenleri) uzak çizim için
+        self._label_font = QFont("Arial", 9, QFont.Bold)
+        self._number_font = QFont("Arial", 7)
+        self._name_font = QFont("Arial", 7)
+        self._texts = {}               # (metin, yazı tipi) -> QStaticText (yerleşimi bir kez hesaplanır)
+
+    def set_layout(self, rows, cols, seating_type):
+        """Koltuk düzenini değiştirir; ölçüler aynıysa hiçbir şey yeniden hesaplanmaz."""
+        seating_type = max(1, seating_type)
+        if (rows, cols, seating_type) == (self.rows, self.cols, self.seating_type):
+            return
+        self.prepareGeometryChange()
+        self.rows, self.cols, self.seating_type = rows, cols, seating_type
+        # Her seating_type kadar koltuğun ardından bir koridor bırakılır
+        self._col_x = [col * (SEAT_WIDTH + SEAT_SPACING) + (col // seating_type) * AISLE_WIDTH
+                       for col in range(cols)]
+        width = self._col_x[-1] + SEAT_WIDTH if cols else 0
+        height = rows * (SEAT_HEIGHT + SEAT_SPACING) - SEAT_SPACING if rows else 0
+        self._bounds = QRectF(0, 0, width, height)
+        self._rebuild_batches()
+
+    def set_assignments(self, assignments):
+        """Koltuklardaki öğrencileri gösterir; assignments: {(sıra, sütun) 1 tabanlı: (öğrenci no, ad soyad)}."""
+        self.assignments = {(row - 1, col - 1): student for (row, col), student in assignments.items()}
+        self._texts = {}
+        self._rebuild_batches()
+        self.update()
+
+    def _rebuild_batches(self):
+        free = ([], [])
+        occupied = []
+        for row in range(self.rows):
+            for col in range(self.cols):
+                rect = self.seat_rect(row, col)
+                if (row, col) in self.assignments:
+                    occupied.append(rect)
+                else:
+                    free[(col // self.seating_type) % 2].append(rect)
+        self._batches = [(GROUP_COLORS[0], free[0]), (GROUP_COLORS[1], free[1]), (OCCUPIED_COLOR, occupied)]
+
+    def seat_rect(self, row, col):
+        return QRectF(self._col_x[col], row * (SEAT_HEIGHT + SEAT_SPACING), SEAT_WIDTH, SEAT_HEIGHT)
+
+    def seat_color(self, row, col):
+        if (row, col) in self.assignments:
+            return OCCUPIED_COLOR
+        return GROUP_COLORS[(col // self.seating_type) % 2]
+
+    def seat_at(self, pos):
+        """Öğe koordinatındaki koltuğun (sıra, sütun) değeri; koridor/boşluktaysa None."""
+        if not self.cols or not self._bounds.contains(pos):
+            return None
+        row = int(pos.y() // (SEAT_HEIGHT + SEAT_SPACING))
+        col = bisect_right(self._col_x, pos.x()) - 1
+        if 0 <= row < self.rows and 0 <= col < self.cols and self.seat_rect(row, col).contains(pos):
+            return row, col
+        return None
+
+    def _visible_range(self, rect):
+        """Dikdörtgenle kesişen satır ve sütun aralıkları."""
+        pitch = SEAT_HEIGHT + SEAT_SPACING
+        first_row = max(0, int(rect.top() // pitch))
+        last_row = min(self.rows, int(rect.bottom() // pitch) + 1)
+        first_col = max(0, bisect_right(self._col_x, rect.left() - SEAT_WIDTH))
+        last_col = min(self.cols, bisect_right(self._col_x, rect.right()))
+        return range(first_row, last_row), range(first_col, last_col)
+
+    def boundingRect(self):
+        return self._bounds
+
+    def paint(self, painter, option, widget=None):
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+        if lod < DETAIL_OUTLINE:
+            # Uzaktan: renk başına tek çağrı, kenar ve yazı yok
+            painter.setPen(Qt.NoPen)
+            for color, rects in self._batches:
+                if rects:
+                    painter.setBrush(color)
+                    painter.drawRects(rects)
+            return
+
+        rows, cols = self._visible_range(option.exposedRect)
+        painter.setPen(QPen(BORDER_COLOR, 2))
+        for row in rows:
+            for col in cols:
+                painter.setBrush(self.seat_color(row, col))
+                painter.drawRoundedRect(self.seat_rect(row, col), 8, 8)
+
+        if lod < DETAIL_LABEL:
+            return
+        full = lod >= DETAIL_FULL
+        show_names = lod >= DETAIL_NAME
+        for row in rows:
+            for col in cols:
+                rect = self.seat_rect(row, col)
+                student = self.assignments.get((row, col))
+                if student and not full:
+                    lines = [(student[0], self._number_font)]
+                else:
+                    lines = [(f"S{row + 1}-K{col + 1}", self._label_font)]
+                    if student:
+                        lines.append((student[0], self._number_font))
+                        if show_names:
+                            lines.append((student[1], self._name_font))
+                texts = [self._static_text(text, font) for text, font in lines]
+                y = rect.center().y() - sum(text.size().height() for text in texts) / 2
+                for text, (_, font) in zip(texts, lines):
+                    painter.setFont(font)
+                    painter.drawStaticText(QPointF(rect.center().x() - text.size().width() / 2, y), text)
+                    y += text.size().height()
+
+    def _static_text(self, text, font):
+        """Koltuk yazısını önbellekten döndürür; koltuk genişliğine sığmayan metin kısaltılır."""
+        key = (text, id(font))
+        static = self._texts.get(key)
+        if static is None:
+            text = QFontMetrics(font).elidedText(text, Qt.ElideRight, SEAT_WIDTH - 6)
+            static = QStaticText(text)
+            static.setPerformanceHint(QStaticText.AggressiveCaching)
+            static.prepare(font=font)
+            self._texts[key] = static
+        return static
+
+    def hoverMoveEvent(self, event):
+        seat = self.seat_at(event.pos())
+        if seat is None:
+            self.setToolTip("")
+            return
+        row, col = seat
+        text = f"Sıra {row + 1}, Koltuk {col + 1}"
+        student = self.assignments.get(seat)
+        if student:
+            text += f"\n{student[0]} - {student[1]}"
+        self.setToolTip(text)
+
+
+class SeatMapScene(QGraphicsScene):
+    """Sahne/tahta şeridi ve koltuk katmanından oluşan sahne; öğeler düzen değişince yeniden kullanılır."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.seats = SeatMapItem()
+        self.addItem(self.seats)
+        self.stage = self.addRect(QRectF(), QPen(Qt.NoPen), BORDER_COLOR)
+        self.stage_text = self.addSimpleText("🎓 TAHTA / SAHNE 🎓", QFont("Arial", 12, QFont.Bold))
+        self.stage_text.setBrush(QColor("white"))
+
+    def set_layout(self, rows, cols, seating_type):
+        self.seats.set_layout(rows, cols, seating_type)
+        width = max(self.seats.boundingRect().width(), self.stage_text.boundingRect().width() + 20)
+        self.stage.setRect(QRectF(0, -STAGE_GAP - STAGE_HEIGHT, width, STAGE_HEIGHT))
+        text_rect = self.stage_text.boundingRect()
+        self.stage_text.setPos((width - text_rect.width()) / 2,
+                               -STAGE_GAP - (STAGE_HEIGHT + text_rect.height()) / 2)
+        self.setSceneRect(self.itemsBoundingRect().adjusted(-20, -20, 20, 20))
+
+    def set_assignments(self, assignments):
+        self.seats.set_assignments(assignments)
+
+
+class SeatMapView(QGraphicsView):
+    """Tekerlekle imleç altına yakınlaştıran, sürükleyerek kaydırılan koltuk planı görünümü."""
+
+    def __init__(self, scene, parent=None):
+        super().__init__(scene, parent)
+        self.setRenderHint(QPainter.Antialiasing)
+        self.setOptimizationFlag(QGraphicsView.DontAdjustForAntialiasing)
+        self.setDragMode(QGraphicsView.ScrollHandDrag)
+        self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
+        self.setViewportUpdateMode(QGraphicsView.SmartViewportUpdate)
+        self.setBackgroundBrush(QColor("#ecf0f1"))
+        self._fitted = False
+
+    def zoom(self, factor):
+        """Ölçeği MIN_ZOOM-MAX_ZOOM aralığında kalacak şekilde değiştirir."""
+        current = self.transform().m11()
+        factor = max(MIN_ZOOM / current, min(MAX_ZOOM / current, factor))
+        self.scale(factor, factor)
+
+    def fit(self):
+        """Tüm düzeni görünüme sığdırır."""
+        self.fitInView(self.sceneRect(), Qt.KeepAspectRatio)
+
+    def wheelEvent(self, event):
+        self.zoom(ZOOM_STEP ** (event.angleDelta().y() / 120))
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # İlk gösterimde pencere boyutu belli olduktan sonra sığdır
+        if not self._fitted:
+            self._fitted = True
+            self.fit()
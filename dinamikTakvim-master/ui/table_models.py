@@ -0,0 +1,258 @@
+# ui/table_models.py
+# Büyük tablolar için satır dizisi tabanlı model/görünüm yardımcılarını içerir.
+
+from PyQt5.QtWidgets import QTableView, QHeaderView, QAbstractItemView, QLineEdit
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+
+# Görünüme bir seferde açılan satır sayısı (kaydırdıkça fetchMore ile artar)
+FETCH_BATCH_SIZE = 500
+
+
+def format_date(value):
+    """Tarih değerini GG.AA.YYYY biçiminde döndürür."""
+    return value.strftime('%d.%m.%Y') if hasattr(value, 'strftime') else str(value)
+
+
+def format_time(value):
+    """MySQL TIME alanı timedelta olarak dönebilir; SS:DD biçiminde döndürür."""
+    if hasattr(value, 'strftime'):
+        return value.strftime('%H:%M')
+    if hasattr(value, 'total_seconds'):
+        total_seconds = int(value.total_seconds())
+        return f"{(total_seconds // 3600) % 24:02d}:{(total_seconds % 3600) // 60:02d}"
+    return str(value)
+
+
+def _sort_key(value):
+    """Sıralama anahtarı: boş değerler sona, metinler büyük/küçük harften bağımsız."""
+    if value is None:
+        return (1, '')
+    if isinstance(value, str):
+        return (0, value.casefold())
+    return (0, value)
+
+
+class RowTableModel(QAbstractTableModel):
+    """
+    Satır dizileri (tuple, list veya sözlük) üzerinde salt okunur tablo modeli.
+    Hücre metinleri yalnızca görünüm istediğinde biçimlendirilir ve satırlar görünüme
+    batch_size'lık parçalar halinde açılır; büyük tablolar anında açılır.
+
+    columns: (başlık, anahtar) listesi; anahtar satırdaki indeks veya sözlük anahtarıdır
+    formatters: {sütun_indeksi: fonksiyon} ham değeri görüntü metnine çevirir
+    """
+
+    def __init__(self, columns, formatters=None, batch_size=FETCH_BATCH_SIZE, parent=None):
+        super().__init__(parent)
+        self.headers = [header for header, _ in columns]
+        self.keys = [key for _, key in columns]
+        self.formatters = formatters or {}
+        self.batch_size = batch_size
+        self.rows = []
+        self.loaded = 0
+        self._texts = None
+
+    def set_rows(self, rows):
+        """Modelin satırlarını değiştirir; yalnızca ilk parça görünüme açılır."""
+        self.beginResetModel()
+        self.rows = rows if isinstance(rows, list) else list(rows)
+        self.loaded = min(len(self.rows), self.batch_size)
+        self._texts = None
+        self.endResetModel()
+
+    def clear(self):
+        self.set_rows([])
+
+    def total_count(self):
+        """Görünüme henüz açılmamış olanlar dahil toplam satır sayısı."""
+        return len(self.rows)
+
+    def row_at(self, row):
+        return self.rows[row]
+
+    def value(self, row, column):
+        return self.rows[row][self.keys[column]]
+
+    def display(self, row, column):
+        value = self.value(row, column)
+        formatter = self.formatters.get(column)
+        if formatter:
+            return formatter(value)
+        return '' if value is None else str(value)
+
+    def row_text(self, row):
+        """Satırın tüm hücrelerinin küçük harfli metni (filtreleme için ilk kullanımda hesaplanır)."""
+        if self._texts is None:
+            columns = range(len(self.keys))
+            self._texts = ['\t'.join(self.display(index, column) for column in columns).casefold()
+                           for index in range(len(self.rows))]
+        return self._texts[row]
+
+    def fetch_all(self):
+        """Kalan tüm satırları görünüme açar (filtreleme/sıralama tüm veride çalışsın diye)."""
+        self._fetch(len(self.rows) - self.loaded)
+
+    def _fetch(self, count):
+        count = min(count, len(self.rows) - self.loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Tüm satırları (görünüme açılmamışlar dahil) ham değerlere göre sıralar."""
+        if column < 0:
+            return
+        self.layoutAboutToBeChanged.emit()
+        key = self.keys[column]
+        self.rows.sort(key=lambda row: _sort_key(row[key]), reverse=order == Qt.DescendingOrder)
+        self._texts = None
+        self.layoutChanged.emit()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.loaded < len(self.rows)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not parent.isValid():
+            self._fetch(self.batch_size)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        return self.display(index.row(), index.column())
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section]
+        return section + 1
+
+
+class QueryTableModel(RowTableModel):
+    """
+    Satırları sunucudan anahtar kümesi (keyset) sayfalamasıyla, görünüm kaydırıldıkça çeken model.
+    Filtreleme ve sıralama sunucuda yapılır; bellekte yalnızca görüntülenen sayfalar tutulur.
+
+    fetch_page(after=, limit=, sort=, descending=, **filters) -> (satırlar, sonraki_imleç)
+    sortable: sunucuda sıralanabilen satır anahtarları (diğer sütunlara tıklamak etkisizdir)
+    """
+
+    def __init__(self, columns, fetch_page, sortable=(), default_sort=None, formatters=None,
+                 page_size=FETCH_BATCH_SIZE, parent=None):
+        super().__init__(columns, formatters, page_size, parent)
+        self.fetch_page = fetch_page
+        self.sortable = set(sortable)
+        self.filters = {}
+        self.sort_key = default_sort
+        self.descending = False
+        self.next_cursor = None
+
+    def _page(self, after):
+        return self.fetch_page(after=after, limit=self.batch_size, sort=self.sort_key,
+                               descending=self.descending, **self.filters)
+
+    def reload(self, filters=None):
+        """İlk sayfayı (yeni filtrelerle) yeniden çeker."""
+        if filters is not None:
+            self.filters = filters
+        rows, self.next_cursor = self._page(None)
+        self.set_rows(rows)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        key = self.keys[column] if column >= 0 else None
+        descending = order == Qt.DescendingOrder
+        if key not in self.sortable or (key, descending) == (self.sort_key, self.descending):
+            return
+        self.sort_key, self.descending = key, descending
+        self.reload()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.next_cursor is not None
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.next_cursor is None:
+            return
+        after, self.next_cursor = self.next_cursor, None
+        rows, next_cursor = self._page(after)
+        if rows:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(rows) - 1)
+            self.rows.extend(rows)
+            self.loaded = len(self.rows)
+            self._texts = None
+            self.endInsertRows()
+        self.next_cursor = next_cursor
+
+
+class RowFilterProxyModel(QSortFilterProxyModel):
+    """
+    RowTableModel için filtreleme katmanı. Sıralama kaynak modele bırakılır (tüm satırlar
+    Python'da tek seferde sıralanır ve yeni yüklenen satırlara da uygulanır); filtre etkinse
+    kaynak modelin tüm satırları görünüme açılır, böylece sonuç yüklenmiş parçayla sınırlı kalmaz.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.filter_text = ''
+        self.sort_order = (-1, Qt.AscendingOrder)
+
+    def setSourceModel(self, model):
+        super().setSourceModel(model)
+        model.modelReset.connect(self._source_reset)
+
+    def _source_reset(self):
+        if self.sort_order[0] >= 0:
+            self.sourceModel().sort(*self.sort_order)
+        self._fetch_if_needed()
+
+    def _fetch_if_needed(self):
+        if self.filter_text:
+            self.sourceModel().fetch_all()
+
+    def set_filter_text(self, text):
+        self.filter_text = text.strip().casefold()
+        self._fetch_if_needed()
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return not self.filter_text or self.filter_text in self.sourceModel().row_text(source_row)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sort_order = (column, order)
+        self.sourceModel().sort(column, order)
+
+
+def create_table_view(model):
+    """Model için filtrelenebilir, sıralanabilir ve salt okunur bir tablo görünümü oluşturur."""
+    view = QTableView()
+    proxy = RowFilterProxyModel(view)
+    proxy.setSourceModel(model)
+    view.setModel(proxy)
+    view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    view.setSelectionBehavior(QAbstractItemView.SelectRows)
+    view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    # Başlangıçta sıralama yok; başlığa tıklanınca sıralanır
+    view.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+    view.setSortingEnabled(True)
+    return view
+
+
+def create_filter_edit(view, placeholder="Tabloda ara..."):
+    """Görünümün satırlarını yazılan metne göre süzen bir arama kutusu oluşturur."""
+    filter_edit = QLineEdit()
+    filter_edit.setPlaceholderText(placeholder)
+    filter_edit.textChanged.connect(view.model().set_filter_text)
+    return filter_edit
+
+
+def source_row(view, index):
+    """Görünümdeki (süzülmüş/sıralanmış) indeksin kaynak modeldeki satırını döndürür."""
+    proxy = view.model()
+    return proxy.sourceModel().row_at(proxy.mapToSource(index).row())